@@ -1,44 +1,295 @@
 # app_logger.py
+"""
+Log de auditoria (JSON, uma linha por ação) em logs/app_YYYY-MM-DD.log.
+
+log_action só enfileira o evento: uma thread de background grava em lotes (por
+quantidade ou tempo), rotaciona por dia ou tamanho e comprime os arquivos fechados
+com gzip. Se a fila encher, o evento é descartado e contado (back-pressure), sem
+bloquear a requisição.
+"""
 import os
+import re
+import gzip
 import json
-from datetime import datetime
+import queue
+import atexit
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+import log_setup
+
+log = log_setup.get_logger(__name__)
+
 # Diretório de logs
-LOGS_DIR = Path(__file__).parent / "logs"
-LOGS_DIR.mkdir(exist_ok=True)
+LOGS_DIR = Path(os.getenv("AUDIT_LOGS_DIR", str(Path(__file__).parent / "logs")))
+LOGS_DIR.mkdir(parents=True, exist_ok=True)
+
+# Eventos aguardando gravação; acima disso log_action descarta e conta em 'dropped'
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+# Grava quando juntar este tanto de eventos...
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "256"))
+# ...ou quando o evento mais antigo do lote tiver esperado isso (s)
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+# Rotaciona o arquivo do dia ao passar deste tamanho
+AUDIT_MAX_FILE_BYTES = int(os.getenv("AUDIT_MAX_FILE_BYTES", str(100 * 1024 * 1024)))
+# Comprime (gzip) os arquivos rotacionados
+AUDIT_COMPRESS = os.getenv("AUDIT_COMPRESS", "true").lower() in ("1", "true", "yes")
+
+_STOP = object()
+_DAY_FILE = re.compile(r"^app_(\d{4}-\d{2}-\d{2})\.log$")
+_ROTATED_FILE = re.compile(r"^app_\d{4}-\d{2}-\d{2}\.\d+\.log$")
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class AuditWriter:
+    def __init__(self, logs_dir: Path = LOGS_DIR, queue_size: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 max_file_bytes: int = AUDIT_MAX_FILE_BYTES, compress: bool = AUDIT_COMPRESS):
+        self.logs_dir = Path(logs_dir)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.compress = compress
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # submit() roda em várias threads (workers do uvicorn / threadpool)
+        self._stats_lock = threading.Lock()
+        self._file = None
+        self._file_day = None
+        self._file_size = 0
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self.queue_high_water = 0
+        self._last_drop_warning = 0.0
+        # objetos com on_write(path) / on_rotate(old, new), ex: audit_index.AUDIT_INDEX
+        self.listeners = []
+
+    # ====== PRODUTOR ======
+    def submit(self, entry: dict, day: str) -> bool:
+        """Enfileira sem bloquear. Retorna False (e conta em 'dropped') se a fila estiver cheia."""
+        self.start()
+        try:
+            self._queue.put_nowait((day, entry))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+                dropped = self.dropped
+                now = time.monotonic()
+                warn = now - self._last_drop_warning > 10
+                if warn:
+                    self._last_drop_warning = now
+            if warn:
+                log.warning("⚠️ Fila de auditoria cheia: %s evento(s) descartado(s) até agora", dropped)
+            return False
+        size = self._queue.qsize()
+        with self._stats_lock:
+            self.enqueued += 1
+            if size > self.queue_high_water:
+                self.queue_high_water = size
+        return True
+
+    # ====== THREAD DE GRAVAÇÃO ======
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        self._sweep_previous_days()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+            if batch:
+                self._write_batch(batch)
+            for _ in range(len(batch) + (1 if stopping else 0)):
+                self._queue.task_done()
+        self._close_file()
+
+    def _write_batch(self, batch: list):
+        try:
+            for day, entry in batch:
+                line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+                self._ensure_file(day, len(line))
+                self._file.write(line)
+                self._file_size += len(line)
+            self._file.flush()
+            self.written += len(batch)
+            self.batches += 1
+            self._notify("on_write", self._path(self._file_day))
+        except Exception as e:
+            # Se houver erro ao escrever o log, imprime mas não quebra a aplicação
+            self.write_errors += 1
+            log.warning("⚠️ Erro ao escrever log: %s", e)
+            self._close_file()
+
+    def _ensure_file(self, day: str, incoming: int):
+        if self._file is not None and day != self._file_day:
+            # virou o dia: fecha e arquiva o arquivo do dia anterior
+            previous = self._file_day
+            self._close_file()
+            self._rotate(previous)
+        if self._file is not None and self._file_size + incoming > self.max_file_bytes and self._file_size > 0:
+            self._close_file()
+            self._rotate(day)
+        if self._file is None:
+            path = self._path(day)
+            self._file = open(path, "ab")
+            self._file_day = day
+            self._file_size = self._file.tell()
 
+    def _path(self, day: str) -> Path:
+        return self.logs_dir / f"app_{day}.log"
 
-def log_action(action: str, user: str, details: Optional[dict] = None):
+    def _rotate(self, day: str):
+        """Renomeia o arquivo do dia para app_<dia>.<n>.log (próximo n livre) e o comprime."""
+        current = self._path(day)
+        if not current.exists():
+            return
+        n = 1
+        while any((self.logs_dir / f"app_{day}.{n}.log{ext}").exists() for ext in ("", ".gz")):
+            n += 1
+        rotated = self.logs_dir / f"app_{day}.{n}.log"
+        self._notify("on_rotate", current, rotated)
+        os.replace(current, rotated)
+        self._archive(rotated)
+
+    def _sweep_previous_days(self):
+        """
+        Na partida, arquiva os arquivos de dias anteriores que ficaram abertos (processo parado
+        antes da virada do dia) e comprime rotacionados que ficaram sem gzip (queda no meio).
+        """
+        today = _utc_now().strftime("%Y-%m-%d")
+        try:
+            names = sorted(p.name for p in self.logs_dir.iterdir())
+        except OSError as e:
+            log.warning("⚠️ Erro ao listar %s: %s", self.logs_dir, e)
+            return
+        for name in names:
+            match = _DAY_FILE.match(name)
+            try:
+                if match and match.group(1) != today:
+                    self._rotate(match.group(1))
+                elif self.compress and _ROTATED_FILE.match(name):
+                    self._compress(self.logs_dir / name)
+            except OSError as e:
+                log.warning("⚠️ Erro ao arquivar %s: %s", name, e)
+
+    def _archive(self, path: Path):
+        self.rotations += 1
+        if self.compress:
+            self._compress(path)
+
+    def _compress(self, path: Path):
+        if not path.exists():
+            return
+        try:
+            with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            path.unlink()
+        except OSError as e:
+            log.warning("⚠️ Erro ao comprimir %s: %s", path, e)
+
+    def _notify(self, event: str, *paths: Path):
+        for listener in self.listeners:
+            try:
+                getattr(listener, event)(*paths)
+            except Exception as e:
+                log.warning("⚠️ Erro no listener de auditoria (%s): %s", event, e)
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._file_day = None
+        self._file_size = 0
+
+    # ====== CONTROLE ======
+    def flush(self):
+        """Bloqueia até todos os eventos já enfileirados estarem gravados."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=10)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "queue_high_water": self.queue_high_water,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors,
+        }
+
+
+AUDIT_WRITER = AuditWriter()
+atexit.register(AUDIT_WRITER.close)
+
+
+def log_action(action: str, user: str, details: Optional[dict] = None) -> bool:
     """
-    Registra uma ação do usuário em um arquivo de log.
-    
+    Registra uma ação do usuário no log de auditoria (assíncrono: apenas enfileira).
+
     Args:
         action: Tipo de ação (ex: "login", "create_bucket", "delete_bucket")
         user: Email do usuário que realizou a ação
         details: Dicionário com informações adicionais (ex: nome do bucket, compartment, etc.)
+    Returns:
+        False se o evento foi descartado por fila cheia.
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+    # um único instante (UTC) define o timestamp e o arquivo do dia
+    now = _utc_now()
+
     log_entry = {
-        "timestamp": timestamp,
+        "timestamp": now.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
         "action": action,
         "user": user,
         "details": details or {}
     }
-    
-    # Nome do arquivo de log baseado na data (um arquivo por dia)
-    log_filename = f"app_{datetime.now().strftime('%Y-%m-%d')}.log"
-    log_path = LOGS_DIR / log_filename
-    
-    # Escreve o log em formato JSON (uma linha por entrada)
-    try:
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
-    except Exception as e:
-        # Se houver erro ao escrever o log, imprime mas não quebra a aplicação
-        print(f"⚠️ Erro ao escrever log: {e}")
+    return AUDIT_WRITER.submit(log_entry, now.strftime("%Y-%m-%d"))
 
 
 def log_login(user: str):
@@ -59,3 +310,73 @@ def log_delete_bucket(user: str, bucket_name: str):
     log_action("delete_bucket", user, {
         "bucket_name": bucket_name
     })
+
+
+def log_delete_objects(user: str, bucket_name: str, deleted: int, prefix: Optional[str] = None,
+                       purge: bool = False):
+    """Registra uma exclusão em lote (lista, prefixo ou purge do bucket)."""
+    log_action("delete_objects", user, {
+        "bucket_name": bucket_name,
+        "prefix": prefix,
+        "deleted": deleted,
+        "purge": purge
+    })
+
+
+def log_upload_object(user: str, bucket_name: str, object_name: str, size: Optional[int] = None):
+    """Registra o upload de um objeto."""
+    log_action("upload_object", user, {
+        "bucket_name": bucket_name,
+        "object_name": object_name,
+        "size": size
+    })
+
+
+def log_delete_object(user: str, bucket_name: str, object_name: str):
+    """Registra a deleção de um objeto."""
+    log_action("delete_object", user, {
+        "bucket_name": bucket_name,
+        "object_name": object_name
+    })
+
+
+def log_create_par(user: str, bucket_name: str, target: Optional[str], access_type: str, par_id: str,
+                   expires_at: Optional[str], cached: bool = False):
+    """Registra a emissão de uma URL pré-autenticada (PAR)."""
+    log_action("create_par", user, {
+        "bucket_name": bucket_name,
+        "object_name": target,
+        "access_type": access_type,
+        "par_id": par_id,
+        "expires_at": expires_at,
+        "cached": cached
+    })
+
+
+def log_revoke_par(user: str, bucket_name: str, par_id: str):
+    """Registra a revogação de uma URL pré-autenticada (PAR)."""
+    log_action("revoke_par", user, {
+        "bucket_name": bucket_name,
+        "par_id": par_id
+    })
+
+
+def log_copy_object(user: str, bucket_name: str, object_name: str, destination_bucket: str,
+                    destination_object: str, work_request_id: Optional[str] = None):
+    """Registra uma cópia de objeto no servidor."""
+    log_action("copy_object", user, {
+        "bucket_name": bucket_name,
+        "object_name": object_name,
+        "destination_bucket": destination_bucket,
+        "destination_object": destination_object,
+        "work_request_id": work_request_id
+    })
+
+
+def log_rename_object(user: str, bucket_name: str, object_name: str, new_name: str):
+    """Registra a renomeação de um objeto."""
+    log_action("rename_object", user, {
+        "bucket_name": bucket_name,
+        "object_name": object_name,
+        "new_name": new_name
+    })
@@ -0,0 +1,332 @@
+# audit_index.py
+"""
+Índice SQLite do log de auditoria (logs/app_*.log), para consultas por usuário,
+ação, bucket e período sem varrer os arquivos.
+
+A ingestão é incremental: para cada arquivo guardamos quantas linhas (e bytes) já
+foram indexados e lemos só o que veio depois. O AuditWriter avisa quando grava
+(on_write) e antes de rotacionar um arquivo (on_rotate); na subida, os arquivos
+existentes (inclusive os .gz rotacionados) são conferidos e completados.
+"""
+import os
+import re
+import gzip
+import json
+import base64
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import app_logger
+import log_setup
+
+log = log_setup.get_logger(__name__)
+
+AUDIT_INDEX_PATH = os.getenv("AUDIT_INDEX_PATH", str(app_logger.LOGS_DIR / "audit_index.sqlite3"))
+# Máximo de eventos por página em query()
+AUDIT_QUERY_MAX_LIMIT = 1000
+
+_LOG_FILE = re.compile(r"^app_\d{4}-\d{2}-\d{2}(\.\d+)?\.log(\.gz)?$")
+
+# Suba quando mudar o que é gravado no índice: a base antiga é descartada e reindexada dos logs
+# (2: timestamps antigos sem fuso convertidos do horário local para UTC)
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY,
+    ts      TEXT NOT NULL,
+    action  TEXT,
+    user    TEXT,
+    bucket  TEXT,
+    object  TEXT,
+    details TEXT,
+    source  TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts, id);
+CREATE INDEX IF NOT EXISTS events_user_ts ON events (user, ts, id);
+CREATE INDEX IF NOT EXISTS events_action_ts ON events (action, ts, id);
+CREATE INDEX IF NOT EXISTS events_bucket_ts ON events (bucket, ts, id);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    name     TEXT PRIMARY KEY,
+    lines    INTEGER NOT NULL,
+    offset   INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def _format_ts(moment: datetime) -> str:
+    """Formato gravado pelo app_logger: ISO UTC com milissegundos e 'Z'."""
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _parse_iso(value: str) -> datetime:
+    # fromisoformat só aceita o sufixo 'Z' a partir do Python 3.11
+    value = value.strip()
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _normalize_ts(ts: str) -> str:
+    """
+    Timestamp de uma linha do log no formato gravado. Linhas antigas ('YYYY-MM-DD HH:MM:SS',
+    sem fuso) foram escritas no horário local do servidor e são convertidas para UTC.
+    """
+    if not ts:
+        return ""
+    try:
+        moment = _parse_iso(ts)
+    except ValueError:
+        return ts
+    # sem fuso, astimezone() assume o horário local
+    return _format_ts(moment)
+
+
+def _query_bound(name: str, value: str) -> str:
+    """since/until da consulta (ISO 8601; sem fuso = UTC) no formato gravado; ValueError se inválido."""
+    try:
+        moment = _parse_iso(value)
+    except ValueError:
+        raise ValueError(f"{name} inválido: use ISO 8601, ex: 2024-05-01T00:00:00Z")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return _format_ts(moment)
+
+
+def _logical_name(path: Path) -> str:
+    # app_D.N.log e app_D.N.log.gz são o mesmo arquivo para o índice
+    name = path.name
+    return name[:-3] if name.endswith(".gz") else name
+
+
+def _encode_cursor(ts: str, event_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{ts}|{event_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        ts, _, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().rpartition("|")
+        return ts, int(event_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("cursor inválido")
+
+
+class AuditIndex:
+    def __init__(self, db_path: str = AUDIT_INDEX_PATH, logs_dir: Path = app_logger.LOGS_DIR):
+        self.db_path = db_path
+        self.logs_dir = Path(logs_dir)
+        self._lock = threading.Lock()          # uma ingestão por vez
+        self._local = threading.local()        # conexão de leitura por thread
+        self._dirty = set()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+        self.ingested = 0
+        self.errors = 0
+
+    # ====== CONEXÕES ======
+    def _writer(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                self._conn.executescript("DROP TABLE IF EXISTS events; DROP TABLE IF EXISTS ingested_files;")
+                self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._writer()  # garante o schema
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    # ====== INGESTÃO ======
+    def _ingest(self, path: Path, rotated: bool = False):
+        """Indexa as linhas de 'path' ainda não vistas. Chamar com self._lock."""
+        conn = self._writer()
+        name = _logical_name(path)
+        row = conn.execute("SELECT lines, offset, complete FROM ingested_files WHERE name = ?", (name,)).fetchone()
+        lines, offset, complete = row if row else (0, 0, 0)
+        if complete or not path.exists():
+            return
+
+        rows = []
+        try:
+            if path.suffix == ".gz":
+                # offsets não valem no arquivo comprimido: pula pelas linhas já indexadas
+                with gzip.open(path, "rb") as f:
+                    for i, raw in enumerate(f):
+                        if i >= lines:
+                            rows.append(raw)
+                new_offset = offset
+            else:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                # só linhas completas: a última pode estar sendo escrita
+                end = data.rfind(b"\n") + 1
+                rows = data[:end].splitlines()
+                new_offset = offset + end
+        except OSError as e:
+            self.errors += 1
+            log.warning("⚠️ Erro ao indexar %s: %s", path, e)
+            return
+
+        events = []
+        for raw in rows:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            details = entry.get("details") or {}
+            events.append((
+                _normalize_ts(entry.get("timestamp", "")),
+                entry.get("action"),
+                entry.get("user"),
+                details.get("bucket_name"),
+                details.get("object_name"),
+                json.dumps(details, ensure_ascii=False),
+                name,
+            ))
+
+        with conn:
+            conn.executemany(
+                "INSERT INTO events (ts, action, user, bucket, object, details, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                events,
+            )
+            conn.execute(
+                "INSERT INTO ingested_files (name, lines, offset, complete) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET lines = excluded.lines, offset = excluded.offset, "
+                "complete = excluded.complete",
+                (name, lines + len(rows), new_offset, 1 if rotated or path.suffix == ".gz" else 0),
+            )
+        self.ingested += len(events)
+
+    def catch_up(self):
+        """Indexa o que estiver pendente em todos os arquivos do diretório de logs."""
+        with self._lock:
+            for path in sorted(self.logs_dir.iterdir()):
+                if _LOG_FILE.match(path.name):
+                    rotated = path.name.count(".") > 1  # app_D.N.log / .gz nunca mais crescem
+                    self._ingest(path, rotated=rotated)
+
+    # ====== HOOKS DO AuditWriter ======
+    def on_write(self, path: Path):
+        self._dirty.add(Path(path))
+        self._wake.set()
+
+    def on_rotate(self, old_path: Path, new_path: Path):
+        """Chamado antes de 'old_path' ser renomeado: termina de indexá-lo e move o registro."""
+        old_path, new_path = Path(old_path), Path(new_path)
+        with self._lock:
+            self._dirty.discard(old_path)
+            self._ingest(old_path)
+            conn = self._writer()
+            with conn:
+                conn.execute(
+                    "UPDATE ingested_files SET name = ?, complete = 1 WHERE name = ?",
+                    (_logical_name(new_path), _logical_name(old_path)),
+                )
+                conn.execute("UPDATE events SET source = ? WHERE source = ?",
+                             (_logical_name(new_path), _logical_name(old_path)))
+
+    def _run(self):
+        try:
+            self.catch_up()
+        except Exception as e:
+            self.errors += 1
+            log.warning("⚠️ Falha na indexação inicial da auditoria: %s", e)
+        while not self._stop.is_set():
+            self._wake.wait(timeout=5)
+            self._wake.clear()
+            with self._lock:
+                pending, self._dirty = self._dirty, set()
+                for path in pending:
+                    try:
+                        self._ingest(path)
+                    except Exception as e:
+                        self.errors += 1
+                        log.warning("⚠️ Erro ao indexar %s: %s", path, e)
+
+    def start(self, writer: Optional["app_logger.AuditWriter"] = None):
+        """Conecta ao AuditWriter e inicia a thread de indexação (idempotente)."""
+        writer = writer or app_logger.AUDIT_WRITER
+        if self not in writer.listeners:
+            writer.listeners.append(self)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # ====== CONSULTA ======
+    def query(self, user: Optional[str] = None, action: Optional[str] = None, bucket: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None, limit: int = 100,
+              cursor: Optional[str] = None) -> dict:
+        """
+        Eventos mais recentes primeiro. 'since'/'until' são ISO 8601 (sem fuso = UTC), 'until'
+        exclusivo; ValueError se forem inválidos.
+        Retorna {"events": [...], "next_cursor": "..."|None}; repita com cursor=next_cursor.
+        """
+        where, params = [], []
+        for column, value in (("user", user), ("action", action), ("bucket", bucket)):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("ts >= ?")
+            params.append(_query_bound("since", since))
+        if until:
+            where.append("ts < ?")
+            params.append(_query_bound("until", until))
+        if cursor:
+            ts, event_id = _decode_cursor(cursor)
+            where.append("(ts < ? OR (ts = ? AND id < ?))")
+            params.extend([ts, ts, event_id])
+
+        limit = max(1, min(limit, AUDIT_QUERY_MAX_LIMIT))
+        sql = "SELECT id, ts, action, user, bucket, object, details FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        rows = self._reader().execute(sql, params + [limit + 1]).fetchall()
+
+        events = [
+            {
+                "timestamp": r["ts"],
+                "action": r["action"],
+                "user": r["user"],
+                "bucket": r["bucket"],
+                "object": r["object"],
+                "details": json.loads(r["details"] or "{}"),
+            }
+            for r in rows[:limit]
+        ]
+        next_cursor = _encode_cursor(rows[limit - 1]["ts"], rows[limit - 1]["id"]) if len(rows) > limit else None
+        return {"events": events, "next_cursor": next_cursor}
+
+    def stats(self) -> dict:
+        try:
+            conn = self._reader()
+            total = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            files = conn.execute("SELECT COUNT(*) FROM ingested_files").fetchone()[0]
+        except sqlite3.Error:
+            total = files = None
+        return {"events": total, "files": files, "ingested": self.ingested, "errors": self.errors}
+
+
+AUDIT_INDEX = AuditIndex()
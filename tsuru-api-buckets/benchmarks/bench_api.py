@@ -0,0 +1,420 @@
+# benchmarks/bench_api.py
+"""
+Benchmark ponta a ponta das rotas da API (main.py) contra o fake local da OCI/Graph
+(benchmarks/fake_oci_server.py), para comparar versões do código entre si.
+
+A API e o fake sobem como processos uvicorn separados (a API com os endpoints apontando
+para o fake), e o benchmark dispara requisições HTTP concorrentes contra a API. Para cada
+cenário são medidos p50/p95/p99/média da latência, requisições/s, MB/s (uploads) e o pico
+de RSS do processo da API durante o cenário.
+
+Cenários (--scenarios, separados por vírgula; padrão: todos):
+    buckets_list, buckets_create        GET/POST /buckets
+    objects_list_10k, objects_list_100k GET /buckets/{bucket}/objects (listagem completa em ndjson)
+    objects_page_100k                   GET /buckets/{bucket}/objects (uma página de 1000)
+    upload_form, upload_json, upload_raw
+                                        POST /buckets/{bucket}/upload para cada --sizes
+                                        (form-data, JSON com base64 e corpo binário)
+    user_groups_warm, user_groups_cold  GET /user/groups (mesmo usuário / um usuário por requisição)
+
+Uso:
+    python benchmarks/bench_api.py --json resultados.json
+    python benchmarks/bench_api.py --scenarios upload_raw,upload_form --sizes 1K,1M,64M,1G --concurrency 4
+    python benchmarks/bench_api.py --upstream-latency-ms 20 --compare resultados.json
+
+Uploads de 1G ocupam esse tanto de memória no processo do fake (o conteúdo é guardado).
+"""
+import os
+import sys
+import math
+import base64
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+import httpx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+UPLOAD_MODES = ("form", "json", "raw")
+SCENARIOS = (
+    "buckets_list", "buckets_create",
+    "objects_list_10k", "objects_list_100k", "objects_page_100k",
+    *(f"upload_{mode}" for mode in UPLOAD_MODES),
+    "user_groups_warm", "user_groups_cold",
+)
+# Cenários pesados rodam menos requisições (fração de --requests, mínimo 5)
+HEAVY_FRACTION = {"objects_list_10k": 10, "objects_list_100k": 50}
+# JSON com base64 acima disso não faz sentido (o corpo inteiro é decodificado em memória)
+JSON_UPLOAD_MAX = 16 * 1024 * 1024
+LIST_BUCKETS = {"objects_list_10k": ("bench-list-10k", 10_000), "objects_list_100k": ("bench-list-100k", 100_000),
+                "objects_page_100k": ("bench-list-100k", 100_000)}
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def _parse_size(text: str) -> int:
+    text = text.strip().upper().removesuffix("B")
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def _size_label(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+class RssSampler:
+    """Amostra o VmRSS (/proc/<pid>/status) do processo da API em background; só Linux."""
+
+    def __init__(self, pid: int, interval: float = 0.02):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current_kb(self) -> int:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self.current_kb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_kb = self.current_kb()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# ====== PROCESSOS ======
+def _start(cmd: list, env: dict, health_url: str, verbose: bool) -> subprocess.Popen:
+    out = None if verbose else subprocess.DEVNULL
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=out, stderr=out)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"processo terminou na subida: {' '.join(cmd)}")
+        try:
+            if httpx.get(health_url, timeout=1).status_code < 500:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"processo não respondeu em {health_url}")
+
+
+def start_servers(args, workdir: str):
+    fake_port, api_port = _free_port(), _free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    fake_cmd = [sys.executable, "benchmarks/fake_oci_server.py", "--port", str(fake_port),
+                "--latency-ms", str(args.upstream_latency_ms), "--jitter-ms", str(args.upstream_jitter_ms)]
+    if args.no_verify:
+        fake_cmd.append("--no-verify")
+    fake = _start(fake_cmd, dict(os.environ), f"{fake_url}/_fake/stats", args.verbose)
+
+    env = dict(os.environ)
+    env.update({
+        "OCI_OBJECT_STORAGE_ENDPOINT": fake_url,
+        "OCI_IDENTITY_ENDPOINT": fake_url,
+        "GRAPH_BASE_URL": f"{fake_url}/v1.0",
+        "GRAPH_TOKEN_URL": f"{fake_url}/oauth2/v2.0/token",
+        "AUDIT_LOGS_DIR": os.path.join(workdir, "logs"),
+        "AUDIT_INDEX_PATH": os.path.join(workdir, "audit_index.sqlite3"),
+    })
+    os.makedirs(env["AUDIT_LOGS_DIR"], exist_ok=True)
+    api_cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(api_port),
+               "--log-level", "warning", "--no-access-log"]
+    try:
+        api = _start(api_cmd, env, f"http://127.0.0.1:{api_port}/health", args.verbose)
+    except Exception:
+        fake.terminate()
+        raise
+    return fake, fake_url, api, f"http://127.0.0.1:{api_port}"
+
+
+# ====== EXECUÇÃO ======
+async def run_scenario(name: str, client: httpx.AsyncClient, make_request, total: int, concurrency: int,
+                       sampler: RssSampler, payload_bytes: int = 0) -> dict:
+    """Dispara 'total' requisições (make_request(i) -> coroutine de httpx.Response) com 'concurrency' em voo."""
+    latencies, statuses, errors = [], {}, []
+    counter = iter(range(total))
+
+    async def _worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(i)
+                status = response.status_code
+                if status >= 400 and len(errors) < 5:
+                    errors.append(f"HTTP {status}: {response.text[:200]}")
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+                if len(errors) < 5:
+                    errors.append(f"{status}: {e}")
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    with sampler:
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(_worker() for _ in range(max(1, min(concurrency, total)))))
+        wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    ok = sum(n for s, n in statuses.items() if s.isdigit() and int(s) < 400)
+    result = {
+        "scenario": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": total - ok,
+        "status_codes": statuses,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "rps": round(total / wall, 2) if wall else 0.0,
+        "seconds": round(wall, 3),
+        "peak_rss_mb": round(sampler.peak_kb / 1024, 1),
+    }
+    if payload_bytes:
+        result["bytes"] = payload_bytes
+        result["mb_per_s"] = round(payload_bytes * ok / (1024 * 1024) / wall, 2) if wall else 0.0
+    if errors:
+        result["sample_errors"] = errors
+    return result
+
+
+def _payload_file(workdir: str, size: int) -> str:
+    path = os.path.join(workdir, f"payload-{size}.bin")
+    if not os.path.exists(path):
+        block = os.urandom(min(size, 1024 * 1024)) if size else b""
+        with open(path, "wb") as f:
+            written = 0
+            while written < size:
+                chunk = block[:size - written]
+                f.write(chunk)
+                written += len(chunk)
+    return path
+
+
+def _upload_requests(client, mode: str, path: str, size: int, headers: dict, bucket: str):
+    name = f"bench/{mode}-{_size_label(size)}"
+    params = {"skip_unchanged": "false", "object_name": name}
+
+    async def _raw_body():
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                yield chunk
+
+    if mode == "json":
+        with open(path, "rb") as f:
+            body = {"content_b64": base64.b64encode(f.read()).decode(), "object_name": name}
+        return lambda i: client.post(f"/buckets/{bucket}/upload", params={"skip_unchanged": "false"},
+                                     json=body, headers=headers)
+
+    if mode == "form":
+        async def _form(i):
+            with open(path, "rb") as f:
+                return await client.post(f"/buckets/{bucket}/upload", params=params, headers=headers,
+                                         files={"file": (os.path.basename(name), f, "application/octet-stream")})
+        return _form
+
+    raw_headers = {**headers, "Content-Type": "application/octet-stream", "Content-Length": str(size)}
+    return lambda i: client.post(f"/buckets/{bucket}/upload", params=params, headers=raw_headers,
+                                 content=_raw_body())
+
+
+async def run_all(args, api_url: str, fake_url: str, api_pid: int, workdir: str) -> list:
+    headers = {"Authorization": "Bearer dev-token-for-bench@example.com"}
+    run_id = datetime.now(timezone.utc).strftime("%H%M%S")
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=api_url, timeout=args.timeout, limits=limits) as client:
+        # bucket dos uploads e das listagens (criados direto no fake)
+        async with httpx.AsyncClient(base_url=fake_url, timeout=300) as fake:
+            for scenario, (bucket, count) in LIST_BUCKETS.items():
+                if scenario in args.scenarios:
+                    await fake.post("/_fake/buckets", json={"name": bucket, "objects": count})
+            await fake.post("/_fake/buckets", json={"name": "bench-upload"})
+
+        # aquece (token do Graph, compartments, cache de bucket) fora da medição
+        await client.get("/user/groups", headers=headers)
+        await client.get("/buckets/bench-upload/objects", params={"limit": 1}, headers=headers)
+
+        def _total(name):
+            fraction = HEAVY_FRACTION.get(name, 1)
+            return max(5, args.requests // fraction) if fraction > 1 else args.requests
+
+        for name in args.scenarios:
+            sampler = RssSampler(api_pid)
+            if name == "buckets_list":
+                make = lambda i: client.get("/buckets", params={"compartments": "cp-infra-ddw3-dev,cp-infra-ddw3-prd"},
+                                            headers=headers)
+                results.append(await run_scenario(name, client, make, _total(name), args.concurrency, sampler))
+            elif name == "buckets_create":
+                make = lambda i: client.post("/buckets", params={"name": f"bench-{run_id}-{i}",
+                                                                 "child": "cp-infra-ddw3-dev"}, headers=headers)
+                results.append(await run_scenario(name, client, make, _total(name), args.concurrency, sampler))
+            elif name in LIST_BUCKETS:
+                bucket = LIST_BUCKETS[name][0]
+                params = {"limit": 1000} if name == "objects_page_100k" else {"format": "ndjson", "fields": "name,size"}
+                make = lambda i, b=bucket, p=params: client.get(f"/buckets/{b}/objects", params=p, headers=headers)
+                results.append(await run_scenario(name, client, make, _total(name), args.concurrency, sampler))
+            elif name.startswith("upload_"):
+                mode = name.removeprefix("upload_")
+                for size in args.sizes:
+                    if mode == "json" and size > JSON_UPLOAD_MAX:
+                        print(f"⏭️  {name} {_size_label(size)} pulado (JSON/base64 acima de {_size_label(JSON_UPLOAD_MAX)})")
+                        continue
+                    path = _payload_file(workdir, size)
+                    # uploads grandes: menos repetições (ao menos 3)
+                    total = max(3, min(args.requests, int(args.requests * 1024 * 1024 / max(size, 1024 * 1024))))
+                    make = _upload_requests(client, mode, path, size, headers, "bench-upload")
+                    label = f"{name}_{_size_label(size)}"
+                    results.append(await run_scenario(label, client, make, total, args.concurrency,
+                                                      RssSampler(api_pid), payload_bytes=size))
+                    print(_row(results[-1]))
+                continue
+            elif name == "user_groups_warm":
+                make = lambda i: client.get("/user/groups", headers=headers)
+                results.append(await run_scenario(name, client, make, _total(name), args.concurrency, sampler))
+            elif name == "user_groups_cold":
+                make = lambda i: client.get("/user/groups",
+                                            headers={"Authorization": f"Bearer dev-token-for-cold-{run_id}-{i}@example.com"})
+                results.append(await run_scenario(name, client, make, _total(name), args.concurrency, sampler))
+            print(_row(results[-1]))
+    return results
+
+
+# ====== RELATÓRIO ======
+def _row(r: dict) -> str:
+    extra = f" {r['mb_per_s']:8.2f} MB/s" if "mb_per_s" in r else ""
+    return (f"{r['scenario']:<26} n={r['requests']:<5} err={r['errors']:<4} p50={r['p50_ms']:9.2f}ms "
+            f"p95={r['p95_ms']:9.2f}ms p99={r['p99_ms']:9.2f}ms {r['rps']:9.2f} req/s "
+            f"rss={r['peak_rss_mb']:7.1f}MB{extra}")
+
+
+def _compare(results: list, path: str):
+    with open(path) as f:
+        previous = {r["scenario"]: r for r in json.load(f).get("results", [])}
+    print(f"\n📊 Comparação com {path} (negativo = mais rápido / menos memória)")
+    for r in results:
+        old = previous.get(r["scenario"])
+        if not old:
+            continue
+
+        def _delta(key):
+            return (r[key] - old[key]) / old[key] * 100 if old.get(key) else 0.0
+
+        print(f"{r['scenario']:<26} p50 {_delta('p50_ms'):+7.1f}%  p95 {_delta('p95_ms'):+7.1f}%  "
+              f"p99 {_delta('p99_ms'):+7.1f}%  req/s {_delta('rps'):+7.1f}%  rss {_delta('peak_rss_mb'):+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta da API contra o fake da OCI/Graph")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)})")
+    parser.add_argument("--sizes", default="1K,1M,16M,128M", help="Tamanhos dos uploads, ex: 1K,1M,64M,1G")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="Latência injetada no fake")
+    parser.add_argument("--upstream-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--no-verify", action="store_true", help="Fake sem conferir as assinaturas da OCI")
+    parser.add_argument("--json", dest="json_out", help="Grava os resultados neste arquivo")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--verbose", action="store_true", help="Mostra a saída da API e do fake")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        sys.exit(f"❌ Cenário(s) desconhecido(s): {', '.join(sorted(unknown))}")
+    args.sizes = [_parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="bench-api-") as workdir:
+        fake, fake_url, api, api_url = start_servers(args, workdir)
+        try:
+            print(f"🏁 API em {api_url} (pid {api.pid}), fake em {fake_url}")
+            results = asyncio.run(run_all(args, api_url, fake_url, api.pid, workdir))
+            fake_stats = httpx.get(f"{fake_url}/_fake/stats", timeout=30).json()
+        finally:
+            for proc in (api, fake):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "upstream_jitter_ms": args.upstream_jitter_ms,
+            "upstream_calls": fake_stats.get("calls"),
+        },
+        "results": results,
+    }
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Resultados gravados em {args.json_out}")
+    if args.compare:
+        _compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_multipart.py
+"""
+Compara a vazão do PUT único (upload_file) com o multipart upload paralelo
+(upload_file_multipart) para um mesmo arquivo gerado aleatoriamente.
+
+Uso:
+    python benchmarks/bench_multipart.py <bucket> --env DEV --size-mb 256 \\
+        --part-size-mb 16 --parallel 1 4 8
+
+Os objetos enviados são removidos ao final (use --keep para mantê-los).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import oci_client as oc  # noqa: E402
+
+
+def _make_file(size_mb: int) -> str:
+    tmp = tempfile.NamedTemporaryFile(prefix="bench-multipart-", suffix=".bin", delete=False)
+    block = 1024 * 1024
+    with tmp:
+        for _ in range(size_mb):
+            tmp.write(os.urandom(block))
+    return tmp.name
+
+
+def _run(label, fn, size_bytes):
+    start = time.perf_counter()
+    ok = fn()
+    elapsed = time.perf_counter() - start
+    mb_s = (size_bytes / (1024 * 1024)) / elapsed if elapsed else 0.0
+    print(f"{label:<28} ok={bool(ok)!s:<5} {elapsed:8.2f}s {mb_s:8.2f} MB/s")
+    return {"mode": label, "ok": bool(ok), "seconds": round(elapsed, 3), "mb_per_s": round(mb_s, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PUT único x multipart upload")
+    parser.add_argument("bucket")
+    parser.add_argument("--env", default="DEV", choices=sorted(oc.OCI_ENVIRONMENTS))
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--part-size-mb", type=int, default=oc.MULTIPART_PART_SIZE // (1024 * 1024))
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--json", dest="json_out", help="Grava os resultados neste arquivo")
+    parser.add_argument("--keep", action="store_true", help="Não remove os objetos enviados")
+    args = parser.parse_args()
+
+    oc.apply_oci_environment(args.env)
+    if not oc.get_namespace():
+        sys.exit("❌ Namespace não encontrado.")
+
+    path = _make_file(args.size_mb)
+    size = os.path.getsize(path)
+    results = []
+    objects = []
+    try:
+        name = f"bench/single-put-{args.size_mb}mb.bin"
+        objects.append(name)
+        results.append(_run("single PUT", lambda: oc.upload_file(args.bucket, path, name), size))
+
+        for parallel in args.parallel:
+            name = f"bench/multipart-p{parallel}-{args.size_mb}mb.bin"
+            objects.append(name)
+            results.append(_run(
+                f"multipart x{parallel}",
+                lambda: oc.upload_file_multipart(
+                    args.bucket, path, name,
+                    part_size=args.part_size_mb * 1024 * 1024,
+                    parallel=parallel,
+                ),
+                size,
+            ))
+    finally:
+        os.unlink(path)
+        if not args.keep:
+            for name in objects:
+                oc.delete_object(args.bucket, name)
+
+    report = {
+        "size_mb": args.size_mb,
+        "part_size_mb": args.part_size_mb,
+        "results": results,
+    }
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
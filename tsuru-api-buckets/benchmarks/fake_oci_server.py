@@ -0,0 +1,975 @@
+# benchmarks/fake_oci_server.py
+"""
+Servidor local que imita o subconjunto da OCI e do Microsoft Graph usado pela API,
+para benchmarks e testes sem rede (e sem depender da latência/limites reais).
+
+Implementa:
+  - Object Storage: namespace, buckets (list/create/get/delete), objetos (put/get/head/
+    delete, Range, If-None-Match, Content-MD5), ListObjects paginado (prefix/start/
+    delimiter/fields), ListObjectVersions, multipart upload, PARs, copyObject/renameObject
+    e workRequests;
+  - Identity: ListCompartments (compartmentId, compartmentIdInSubtree, name, paginação);
+  - Graph: token client_credentials, /users/{id}/memberOf (com @odata.nextLink) e $batch.
+
+As requisições à OCI têm a assinatura (rsa-sha256) conferida com as chaves públicas das
+credenciais de oci_client.CREDENTIALS; o ambiente da chave (DEV/PRD) só enxerga os buckets
+dos compartments do mesmo ambiente, como na OCI real. Latência, erros 503 e throttling
+(429 + Retry-After) podem ser injetados na subida ou em /_fake/config.
+
+Uso:
+    python benchmarks/fake_oci_server.py --port 8787 --latency-ms 20 --error-rate 0.01 --seed-objects 5000
+
+    export OCI_OBJECT_STORAGE_ENDPOINT=http://127.0.0.1:8787
+    export OCI_IDENTITY_ENDPOINT=http://127.0.0.1:8787
+    export GRAPH_BASE_URL=http://127.0.0.1:8787/v1.0
+    export GRAPH_TOKEN_URL=http://127.0.0.1:8787/oauth2/v2.0/token
+    uvicorn main:app
+"""
+import os
+import re
+import sys
+import json
+import uuid
+import base64
+import random
+import asyncio
+import hashlib
+import argparse
+import bisect
+from dataclasses import dataclass, field, asdict, fields
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import parse_qs, quote, unquote
+
+from fastapi import FastAPI, Request, Response
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import padding
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import oci_client as oc  # noqa: E402
+from oci_signer import content_sha256  # noqa: E402
+
+# Diferença máxima aceita entre o header Date e o relógio local (a OCI usa 5 min)
+MAX_CLOCK_SKEW = 300
+# Tamanho de página quando o cliente não informa 'limit'
+DEFAULT_PAGE_LIMIT = 1000
+
+
+@dataclass
+class FakeConfig:
+    namespace: str = oc.NAMESPACE
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0             # fração das requisições respondidas com 503
+    throttle_rate: float = 0.0          # fração respondida com 429 + Retry-After
+    retry_after: int = 1
+    fail_next: int = 0                  # as próximas N requisições respondem 503 (falha determinística, p/ testes)
+    verify_signatures: bool = True
+    seed_objects: int = 0               # objetos criados em cada bucket de bench na subida
+    seed_object_size: int = 1024
+    graph_groups_per_user: int = 0      # grupos extras no memberOf (para exercitar a paginação)
+    graph_page_size: int = 100          # teto do $top no memberOf
+
+    def update(self, values: dict):
+        known = {f.name for f in fields(self)}
+        for name, value in values.items():
+            if name not in known:
+                raise ValueError(f"opção desconhecida: {name}")
+            current = getattr(self, name)
+            if isinstance(current, bool) and isinstance(value, str):
+                value = value.lower() in ("1", "true", "yes")
+            setattr(self, name, type(current)(value))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _fake_ocid(kind: str, name: str) -> str:
+    return f"ocid1.{kind}.oc1..fake{hashlib.sha1(name.encode()).hexdigest()[:24]}"
+
+
+def _oci_error(status: int, code: str, message: str, headers: Optional[dict] = None) -> Response:
+    return Response(json.dumps({"code": code, "message": message}), status_code=status,
+                    media_type="application/json", headers=headers)
+
+
+def _json(payload, status: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(json.dumps(payload), status_code=status, media_type="application/json", headers=headers)
+
+
+@dataclass
+class FakeObject:
+    name: str
+    data: bytes
+    content_type: str = "application/octet-stream"
+    metadata: dict = field(default_factory=dict)
+    etag: str = field(default_factory=lambda: str(uuid.uuid4()))
+    version_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    md5: str = ""
+    multipart_md5: Optional[str] = None
+    time_created: datetime = field(default_factory=_now)
+
+    def __post_init__(self):
+        if not self.md5:
+            self.md5 = base64.b64encode(hashlib.md5(self.data).digest()).decode()
+
+    def summary(self, wanted: set) -> dict:
+        values = {
+            "name": self.name,
+            "size": len(self.data),
+            "md5": self.multipart_md5 or self.md5,
+            "etag": self.etag,
+            "timeCreated": _iso(self.time_created),
+            "timeModified": _iso(self.time_created),
+            "storageTier": "Standard",
+        }
+        return {k: v for k, v in values.items() if k in wanted}
+
+    def headers(self) -> dict:
+        headers = {
+            "etag": self.etag,
+            "content-type": self.content_type,
+            "last-modified": formatdate(self.time_created.timestamp(), usegmt=True),
+            "accept-ranges": "bytes",
+            "version-id": self.version_id,
+        }
+        if self.multipart_md5:
+            headers["opc-multipart-md5"] = self.multipart_md5
+        else:
+            headers["opc-content-md5"] = self.md5
+        for key, value in self.metadata.items():
+            headers[f"opc-meta-{key}"] = value
+        return headers
+
+
+class ObjectIndex(dict):
+    """nome -> FakeObject, com a lista ordenada de nomes em cache (listagens paginadas com bisect)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sorted = None
+
+    def __setitem__(self, name, obj):
+        if name not in self:
+            self._sorted = None
+        super().__setitem__(name, obj)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self._sorted = None
+
+    def names_from(self, start: str) -> list:
+        """Nomes ordenados a partir de 'start' (inclusive)."""
+        if self._sorted is None:
+            self._sorted = sorted(self)
+        return self._sorted[bisect.bisect_left(self._sorted, start):]
+
+
+@dataclass
+class FakeBucket:
+    name: str
+    compartment_id: str
+    env: Optional[str]
+    objects: ObjectIndex = field(default_factory=ObjectIndex)
+    uploads: dict = field(default_factory=dict)      # uploadId -> {"object", "parts", ...}
+    pars: dict = field(default_factory=dict)         # id -> PAR
+    etag: str = field(default_factory=lambda: str(uuid.uuid4()))
+    time_created: datetime = field(default_factory=_now)
+
+    def view(self, namespace: str) -> dict:
+        return {
+            "namespace": namespace,
+            "name": self.name,
+            "compartmentId": self.compartment_id,
+            "createdBy": "fake",
+            "timeCreated": _iso(self.time_created),
+            "etag": self.etag,
+            "publicAccessType": "NoPublicAccess",
+            "storageTier": "Standard",
+            "versioning": "Disabled",
+            "approximateCount": len(self.objects),
+            "approximateSize": sum(len(o.data) for o in self.objects.values()),
+        }
+
+
+class FakeOCI:
+    """Estado em memória (compartments, buckets, work requests, tokens) e as rotas que o servem."""
+
+    def __init__(self, config: Optional[FakeConfig] = None):
+        self.config = config or FakeConfig()
+        self.compartments = {}       # ocid -> {"id", "name", "compartmentId", ...}
+        self.buckets = {}            # nome -> FakeBucket
+        self.work_requests = {}      # id -> work request
+        self.tokens = set()
+        self.graph_users = {}        # email (minúsculo) -> lista de grupos do memberOf
+        self.calls = {}
+        self.injected_errors = 0
+        self.injected_throttles = 0
+        self.signature_failures = 0
+        self._public_keys = {}
+        self._routes = self._build_routes()
+        self.seed()
+
+    # ====== DADOS INICIAIS ======
+    def seed(self):
+        root = oc.TENANCY_OCID
+        for name in ("cp-infra-ddw3-dev", "cp-infra-ddw3-prd"):
+            self.add_compartment(name, root)
+        for env in ("dev", "prd"):
+            compartment = _fake_ocid("compartment", f"cp-infra-ddw3-{env}")
+            self.fill_bucket(self.add_bucket(f"bench-{env}", compartment),
+                             self.config.seed_objects, self.config.seed_object_size)
+
+    @staticmethod
+    def fill_bucket(bucket: "FakeBucket", count: int, size: int, prefix: str = "seed/"):
+        for i in range(count):
+            name = f"{prefix}{i:08d}.bin"
+            payload = (f"{i:08d}".encode() * (size // 8 + 1))[:size]
+            bucket.objects[name] = FakeObject(name, payload)
+
+    def add_compartment(self, name: str, parent: str) -> str:
+        ocid = _fake_ocid("compartment", name)
+        self.compartments[ocid] = {
+            "id": ocid,
+            "name": name,
+            "compartmentId": parent,
+            "description": name,
+            "lifecycleState": "ACTIVE",
+            "timeCreated": _iso(_now()),
+        }
+        return ocid
+
+    def add_bucket(self, name: str, compartment_id: str) -> FakeBucket:
+        bucket = FakeBucket(name=name, compartment_id=compartment_id, env=self._compartment_env(compartment_id))
+        self.buckets[name] = bucket
+        return bucket
+
+    def _compartment_env(self, compartment_id: str) -> Optional[str]:
+        comp = self.compartments.get(compartment_id)
+        try:
+            return oc.resolve_environment_from_compartment_name(comp["name"]) if comp else None
+        except ValueError:
+            return None
+
+    def member_of(self, user: str) -> list:
+        groups = self.graph_users.get(user.lower())
+        if groups is None:
+            groups = [
+                {"@odata.type": "#microsoft.graph.group", "id": _fake_ocid("group", c["name"]),
+                 "displayName": f"OCI-Administrators-{c['name']}"}
+                for c in self.compartments.values()
+            ]
+        extra = [
+            {"@odata.type": "#microsoft.graph.group", "id": _fake_ocid("group", f"extra-{i}"),
+             "displayName": f"Grupo-Extra-{i:05d}"}
+            for i in range(self.config.graph_groups_per_user)
+        ]
+        return groups + extra
+
+    # ====== INJEÇÃO DE FALHAS / ASSINATURA ======
+    async def _inject(self) -> Optional[Response]:
+        cfg = self.config
+        if cfg.latency_ms or cfg.jitter_ms:
+            delay = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+        if cfg.fail_next > 0:
+            cfg.fail_next -= 1
+            self.injected_errors += 1
+            return _oci_error(503, "ServiceUnavailable", "Service unavailable (injetado)")
+        roll = random.random()
+        if roll < cfg.throttle_rate:
+            self.injected_throttles += 1
+            return _oci_error(429, "TooManyRequests", "Too many requests (injetado)",
+                              headers={"Retry-After": str(cfg.retry_after)})
+        if roll < cfg.throttle_rate + cfg.error_rate:
+            self.injected_errors += 1
+            return _oci_error(503, "ServiceUnavailable", "Service unavailable (injetado)")
+        return None
+
+    def _public_key(self, key_id: str):
+        if key_id not in self._public_keys:
+            creds = next((c for c in oc.CREDENTIALS.values() if c.key_id == key_id), None)
+            if creds is None:
+                return None, None
+            self._public_keys[key_id] = (creds.env, oc.SIGNER.get_key(creds.private_key_path).public_key())
+        return self._public_keys[key_id]
+
+    def _verify(self, request: Request, body: bytes):
+        """Confere a HTTP Signature. Retorna (env, None) ou (None, resposta 401)."""
+        auth = request.headers.get("authorization", "")
+        if not auth.startswith("Signature "):
+            return None, _oci_error(401, "NotAuthenticated", "Authorization ausente ou não é Signature")
+        params = dict(re.findall(r'(\w+)="([^"]*)"', auth))
+        env, public_key = self._public_key(params.get("keyId", ""))
+        if public_key is None:
+            return None, _oci_error(401, "NotAuthenticated", f"keyId desconhecido: {params.get('keyId')}")
+
+        signed = params.get("headers", "date").split()
+        method = request.method.lower()
+        if method in ("post", "put", "patch") and "x-content-sha256" not in signed and not self._unsigned_body_ok(request):
+            return None, _oci_error(401, "NotAuthenticated", "corpo não assinado (x-content-sha256)")
+        if "x-content-sha256" in signed and request.headers.get("x-content-sha256") != content_sha256(body):
+            return None, _oci_error(401, "NotAuthenticated", "x-content-sha256 não confere com o corpo")
+
+        try:
+            skew = abs((_now() - parsedate_to_datetime(request.headers.get("date", ""))).total_seconds())
+        except (TypeError, ValueError):
+            skew = None
+        if skew is None or skew > MAX_CLOCK_SKEW:
+            return None, _oci_error(401, "NotAuthenticated", "header Date ausente ou fora da janela")
+
+        target = request.scope.get("raw_path", b"").decode()
+        if request.scope.get("query_string"):
+            target += "?" + request.scope["query_string"].decode()
+        lines = []
+        for name in signed:
+            if name == "(request-target)":
+                lines.append(f"(request-target): {method} {target}")
+            else:
+                lines.append(f"{name}: {request.headers.get(name, '')}")
+        try:
+            public_key.verify(base64.b64decode(params.get("signature", "")), "\n".join(lines).encode(),
+                              padding.PKCS1v15(), hashes.SHA256())
+        except (InvalidSignature, ValueError):
+            return None, _oci_error(401, "NotAuthenticated", "assinatura inválida")
+        return env, None
+
+    @staticmethod
+    def _unsigned_body_ok(request: Request) -> bool:
+        # PutObject e UploadPart dispensam assinar o corpo
+        return request.method == "PUT" and ("/o/" in request.url.path or "/u/" in request.url.path)
+
+    # ====== ROTEAMENTO ======
+    def _build_routes(self):
+        ns = r"/n/(?P<ns>[^/]+)"
+        b = ns + r"/b/(?P<bucket>[^/]+)"
+        return [
+            ("GET", r"/n/?", self.get_namespace),
+            ("GET", ns + r"/b/?", self.list_buckets),
+            ("POST", ns + r"/b/?", self.create_bucket),
+            ("GET", b + r"/?", self.get_bucket),
+            ("DELETE", b + r"/?", self.delete_bucket),
+            ("GET", b + r"/o/?", self.list_objects),
+            ("PUT", b + r"/o/(?P<obj>.+)", self.put_object),
+            ("GET", b + r"/o/(?P<obj>.+)", self.get_object),
+            ("HEAD", b + r"/o/(?P<obj>.+)", self.get_object),
+            ("DELETE", b + r"/o/(?P<obj>.+)", self.delete_object),
+            ("GET", b + r"/objectversions/?", self.list_object_versions),
+            ("POST", b + r"/u/?", self.create_multipart),
+            ("GET", b + r"/u/?", self.list_multipart_uploads),
+            ("PUT", b + r"/u/(?P<obj>.+)", self.upload_part),
+            ("GET", b + r"/u/(?P<obj>.+)", self.list_parts),
+            ("POST", b + r"/u/(?P<obj>.+)", self.commit_multipart),
+            ("DELETE", b + r"/u/(?P<obj>.+)", self.abort_multipart),
+            ("POST", b + r"/p/?", self.create_par),
+            ("DELETE", b + r"/p/(?P<par>[^/]+)", self.delete_par),
+            ("POST", b + r"/actions/copyObject", self.copy_object),
+            ("POST", b + r"/actions/renameObject", self.rename_object),
+            ("GET", r"/workRequests/(?P<wr>[^/]+)", self.get_work_request),
+            ("GET", r"/workRequests/(?P<wr>[^/]+)/errors", self.get_work_request_errors),
+            ("GET", r"/20160918/compartments", self.list_compartments),
+        ]
+
+    async def dispatch(self, request: Request) -> Response:
+        path = request.scope.get("raw_path", request.url.path.encode()).decode().split("?", 1)[0]
+        for method, pattern, handler in self._routes:
+            if request.method != method:
+                continue
+            match = re.fullmatch(pattern, path)
+            if not match:
+                continue
+            self.calls[handler.__name__] = self.calls.get(handler.__name__, 0) + 1
+            injected = await self._inject()
+            if injected is not None:
+                return injected
+            body = await request.body()
+            env = None
+            if self.config.verify_signatures:
+                env, denied = self._verify(request, body)
+                if denied is not None:
+                    self.signature_failures += 1
+                    return denied
+            args = {k: unquote(v) for k, v in match.groupdict().items()}
+            ns = args.pop("ns", None)
+            if ns is not None and ns != self.config.namespace:
+                return _oci_error(404, "NamespaceNotFound", f"namespace '{ns}' não existe")
+            bucket_name = args.pop("bucket", None)
+            if bucket_name is not None:
+                bucket = self.buckets.get(bucket_name)
+                if bucket is None or (env and bucket.env and bucket.env != env):
+                    return _oci_error(404, "BucketNotFound", f"bucket '{bucket_name}' não existe ou sem acesso")
+                args["bucket"] = bucket
+            return await handler(request, body, env=env, **args)
+        return _oci_error(404, "NotFound", f"rota não implementada no fake: {request.method} {path}")
+
+    @staticmethod
+    def _query(request: Request) -> dict:
+        return {k: v[0] for k, v in parse_qs(request.url.query, keep_blank_values=True).items()}
+
+    @staticmethod
+    def _page(items: list, request: Request, key):
+        """
+        Paginação das listagens com opc-next-page. Como na OCI, o token aponta para a chave
+        do próximo item (não um índice): apagar itens entre as páginas não pula nenhum.
+        """
+        query = FakeOCI._query(request)
+        limit = min(int(query.get("limit") or DEFAULT_PAGE_LIMIT), DEFAULT_PAGE_LIMIT)
+        token = query.get("page")
+        remaining = [i for i in items if token is None or key(i) >= token]
+        headers = {"opc-next-page": key(remaining[limit])} if len(remaining) > limit else {}
+        return remaining[:limit], headers
+
+    # ====== NAMESPACE / BUCKETS ======
+    async def get_namespace(self, request, body, env):
+        return _json(self.config.namespace)
+
+    async def list_buckets(self, request, body, env):
+        compartment_id = self._query(request).get("compartmentId")
+        buckets = sorted(
+            (b for b in self.buckets.values()
+             if b.compartment_id == compartment_id and (not env or not b.env or b.env == env)),
+            key=lambda b: b.name,
+        )
+        page, headers = self._page(buckets, request, key=lambda b: b.name)
+        summaries = [{k: v for k, v in b.view(self.config.namespace).items()
+                      if k in ("namespace", "name", "compartmentId", "createdBy", "timeCreated", "etag")}
+                     for b in page]
+        return _json(summaries, headers=headers)
+
+    async def create_bucket(self, request, body, env):
+        payload = json.loads(body or b"{}")
+        name, compartment_id = payload.get("name"), payload.get("compartmentId")
+        if not name or not compartment_id:
+            return _oci_error(400, "InvalidParameter", "name e compartmentId são obrigatórios")
+        if compartment_id not in self.compartments and compartment_id != oc.TENANCY_OCID:
+            return _oci_error(404, "CompartmentNotFound", f"compartment '{compartment_id}' não existe")
+        if env and self._compartment_env(compartment_id) not in (None, env):
+            return _oci_error(404, "CompartmentNotFound", "compartment de outro ambiente")
+        if name in self.buckets:
+            return _oci_error(409, "BucketAlreadyExists", f"bucket '{name}' já existe")
+        bucket = self.add_bucket(name, compartment_id)
+        return _json(bucket.view(self.config.namespace), headers={"etag": bucket.etag})
+
+    async def get_bucket(self, request, body, env, bucket):
+        return _json(bucket.view(self.config.namespace), headers={"etag": bucket.etag})
+
+    async def delete_bucket(self, request, body, env, bucket):
+        if bucket.objects or bucket.uploads:
+            return _oci_error(409, "BucketNotEmpty", f"bucket '{bucket.name}' não está vazio")
+        del self.buckets[bucket.name]
+        return Response(status_code=204)
+
+    # ====== OBJETOS ======
+    async def list_objects(self, request, body, env, bucket):
+        query = self._query(request)
+        prefix = query.get("prefix") or ""
+        start = query.get("start") or ""
+        end = query.get("end")
+        delimiter = query.get("delimiter")
+        limit = min(int(query.get("limit") or DEFAULT_PAGE_LIMIT), DEFAULT_PAGE_LIMIT)
+        wanted = {"name"} | set(filter(None, (query.get("fields") or "size,md5,timeCreated").split(",")))
+
+        objects, prefixes, next_start = [], [], None
+        for name in bucket.objects.names_from(max(start, prefix)):
+            if not name.startswith(prefix) or (end and name >= end):
+                break
+            if delimiter:
+                cut = name.find(delimiter, len(prefix))
+                if cut >= 0:
+                    common = name[:cut + len(delimiter)]
+                    if common not in prefixes:
+                        prefixes.append(common)
+                    continue
+            if len(objects) == limit:
+                next_start = name
+                break
+            objects.append(bucket.objects[name].summary(wanted))
+
+        payload = {"objects": objects}
+        if delimiter:
+            payload["prefixes"] = prefixes
+        if next_start:
+            payload["nextStartWith"] = next_start
+        return _json(payload)
+
+    @staticmethod
+    def _precondition_failed(request: Request, current: Optional[FakeObject]) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match == "*" and current is not None:
+            return True
+        if_match = request.headers.get("if-match")
+        if if_match and (current is None or if_match.strip('"') != current.etag):
+            return True
+        return False
+
+    async def put_object(self, request, body, env, bucket, obj):
+        current = bucket.objects.get(obj)
+        if self._precondition_failed(request, current):
+            return _oci_error(412, "IfNoneMatchFailed" if current else "IfMatchFailed", "pré-condição falhou")
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode()
+        expected = request.headers.get("content-md5")
+        if expected and expected != md5:
+            return _oci_error(422, "UnmatchedContentMD5", f"Content-MD5 {expected} != {md5}")
+        metadata = {k[len("opc-meta-"):]: v for k, v in request.headers.items() if k.startswith("opc-meta-")}
+        new = FakeObject(obj, body, content_type=request.headers.get("content-type") or "application/octet-stream",
+                         metadata=metadata, md5=md5)
+        bucket.objects[obj] = new
+        return Response(status_code=200, headers={
+            "etag": new.etag, "opc-content-md5": md5, "last-modified": new.headers()["last-modified"],
+            "version-id": new.version_id,
+        })
+
+    async def get_object(self, request, body, env, bucket, obj):
+        current = bucket.objects.get(obj)
+        if current is None:
+            return _oci_error(404, "ObjectNotFound", f"objeto '{obj}' não existe")
+        headers = current.headers()
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and current.etag in {t.strip().strip('"') for t in if_none_match.split(",")}:
+            return Response(status_code=304, headers={"etag": current.etag})
+
+        data, status = current.data, 200
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", request.headers.get("range", "").strip())
+        if match and (match.group(1) or match.group(2)):
+            size = len(data)
+            if match.group(1):
+                first = int(match.group(1))
+                last = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                first, last = max(0, size - int(match.group(2))), size - 1
+            if first >= size or first > last:
+                return _oci_error(416, "InvalidRange", "range fora do objeto",
+                                  headers={"content-range": f"bytes */{size}"})
+            data, status = data[first:last + 1], 206
+            headers["content-range"] = f"bytes {first}-{last}/{size}"
+        headers["content-length"] = str(len(data))
+        if request.method == "HEAD":
+            return Response(status_code=status, headers=headers)
+        return Response(data, status_code=status, headers=headers, media_type=current.content_type)
+
+    async def delete_object(self, request, body, env, bucket, obj):
+        current = bucket.objects.get(obj)
+        version_id = self._query(request).get("versionId")
+        if current is None or (version_id and version_id != current.version_id):
+            return _oci_error(404, "ObjectNotFound", f"objeto '{obj}' não existe")
+        del bucket.objects[obj]
+        return Response(status_code=204)
+
+    async def list_object_versions(self, request, body, env, bucket):
+        query = self._query(request)
+        prefix = query.get("prefix") or ""
+        limit = min(int(query.get("limit") or DEFAULT_PAGE_LIMIT), DEFAULT_PAGE_LIMIT)
+        page, headers = [], {}
+        for name in bucket.objects.names_from(max(query.get("page") or "", prefix)):
+            if not name.startswith(prefix):
+                break
+            if len(page) == limit:
+                headers["opc-next-page"] = name
+                break
+            page.append(bucket.objects[name])
+        return _json({"items": [
+            {**o.summary({"name", "size", "md5", "etag", "timeCreated", "timeModified"}),
+             "versionId": o.version_id, "isDeleteMarker": False}
+            for o in page
+        ]}, headers=headers)
+
+    # ====== MULTIPART ======
+    def _upload(self, request, bucket, obj):
+        upload_id = self._query(request).get("uploadId")
+        upload = bucket.uploads.get(upload_id)
+        if upload is None or upload["object"] != obj:
+            return None, _oci_error(404, "NoSuchUpload", f"upload '{upload_id}' não existe")
+        return upload, None
+
+    async def create_multipart(self, request, body, env, bucket):
+        payload = json.loads(body or b"{}")
+        if not payload.get("object"):
+            return _oci_error(400, "InvalidParameter", "object é obrigatório")
+        upload_id = str(uuid.uuid4())
+        bucket.uploads[upload_id] = {
+            "object": payload["object"],
+            "contentType": payload.get("contentType") or "application/octet-stream",
+            "metadata": {k.removeprefix("opc-meta-"): v for k, v in (payload.get("metadata") or {}).items()},
+            "parts": {},
+            "timeCreated": _iso(_now()),
+        }
+        return _json({"namespace": self.config.namespace, "bucket": bucket.name, "object": payload["object"],
+                      "uploadId": upload_id, "timeCreated": bucket.uploads[upload_id]["timeCreated"],
+                      "storageTier": "Standard"})
+
+    async def list_multipart_uploads(self, request, body, env, bucket):
+        items = [{"namespace": self.config.namespace, "bucket": bucket.name, "object": u["object"],
+                  "uploadId": upload_id, "timeCreated": u["timeCreated"], "storageTier": "Standard"}
+                 for upload_id, u in bucket.uploads.items()]
+        items.sort(key=lambda u: (u["object"], u["uploadId"]))
+        page, headers = self._page(items, request, key=lambda u: f"{u['object']}\0{u['uploadId']}")
+        return _json(page, headers=headers)
+
+    async def upload_part(self, request, body, env, bucket, obj):
+        upload, error = self._upload(request, bucket, obj)
+        if error:
+            return error
+        part_num = int(self._query(request).get("uploadPartNum") or 0)
+        if not 1 <= part_num <= oc.MULTIPART_MAX_PARTS:
+            return _oci_error(400, "InvalidParameter", f"uploadPartNum inválido: {part_num}")
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode()
+        expected = request.headers.get("content-md5")
+        if expected and expected != md5:
+            return _oci_error(422, "UnmatchedContentMD5", f"Content-MD5 {expected} != {md5}")
+        etag = str(uuid.uuid4())
+        upload["parts"][part_num] = {"data": body, "etag": etag, "md5": md5}
+        return Response(status_code=200, headers={"etag": etag, "opc-content-md5": md5})
+
+    async def list_parts(self, request, body, env, bucket, obj):
+        upload, error = self._upload(request, bucket, obj)
+        if error:
+            return error
+        items = [{"partNumber": n, "etag": p["etag"], "md5": p["md5"], "size": len(p["data"])}
+                 for n, p in sorted(upload["parts"].items())]
+        page, headers = self._page(items, request, key=lambda p: f"{p['partNumber']:05d}")
+        return _json(page, headers=headers)
+
+    async def commit_multipart(self, request, body, env, bucket, obj):
+        upload, error = self._upload(request, bucket, obj)
+        if error:
+            return error
+        wanted = json.loads(body or b"{}").get("partsToCommit") or []
+        chunks, digests = [], b""
+        for item in sorted(wanted, key=lambda p: p["partNum"]):
+            part = upload["parts"].get(item["partNum"])
+            if part is None or part["etag"] != item.get("etag"):
+                return _oci_error(400, "InvalidPart", f"parte {item['partNum']} ausente ou com etag diferente")
+            chunks.append(part["data"])
+            digests += base64.b64decode(part["md5"])
+        multipart_md5 = f"{base64.b64encode(hashlib.md5(digests).digest()).decode()}-{len(chunks)}"
+        new = FakeObject(obj, b"".join(chunks), content_type=upload["contentType"], metadata=upload["metadata"],
+                         multipart_md5=multipart_md5)
+        bucket.objects[obj] = new
+        del bucket.uploads[self._query(request)["uploadId"]]
+        return Response(status_code=200, headers={"etag": new.etag, "opc-multipart-md5": multipart_md5})
+
+    async def abort_multipart(self, request, body, env, bucket, obj):
+        upload, error = self._upload(request, bucket, obj)
+        if error:
+            return error
+        del bucket.uploads[self._query(request)["uploadId"]]
+        return Response(status_code=204)
+
+    # ====== PAR ======
+    async def create_par(self, request, body, env, bucket):
+        payload = json.loads(body or b"{}")
+        par_id = base64.urlsafe_b64encode(os.urandom(18)).decode()
+        token = base64.urlsafe_b64encode(os.urandom(24)).decode()
+        object_name = payload.get("objectName")
+        access_uri = f"/p/{token}/n/{self.config.namespace}/b/{bucket.name}/o/{object_name or ''}"
+        par = {
+            "id": par_id,
+            "name": payload.get("name"),
+            "accessUri": access_uri,
+            "objectName": object_name,
+            "accessType": payload.get("accessType"),
+            "timeExpires": payload.get("timeExpires"),
+            "timeCreated": _iso(_now()),
+        }
+        bucket.pars[par_id] = par
+        return _json(par)
+
+    async def par_access(self, request: Request, token: str, obj: str) -> Response:
+        """GET/HEAD/PUT por URL pré-autenticada: sem assinatura, valem o tipo de acesso e a validade."""
+        for bucket in self.buckets.values():
+            for par in bucket.pars.values():
+                if not par["accessUri"].startswith(f"/p/{token}/"):
+                    continue
+                expires = par.get("timeExpires")
+                if expires and datetime.fromisoformat(expires.replace("Z", "+00:00")) < _now():
+                    break
+                access = par["accessType"]
+                target = par.get("objectName") or ""
+                if access.startswith("Any") and not obj.startswith(target):
+                    break
+                if not access.startswith("Any") and obj != target:
+                    break
+                writing = request.method == "PUT"
+                if ("Write" if writing else "Read") not in access:
+                    break
+                handler = self.put_object if writing else self.get_object
+                return await handler(request, await request.body(), None, bucket, obj)
+        return _oci_error(404, "NotFound", "PAR inexistente, expirado ou sem esse acesso")
+
+    async def delete_par(self, request, body, env, bucket, par):
+        if bucket.pars.pop(par, None) is None:
+            return _oci_error(404, "PreauthenticatedRequestNotFound", f"PAR '{par}' não existe")
+        return Response(status_code=204)
+
+    # ====== CÓPIA / RENOMEAÇÃO ======
+    def _finish_work_request(self, operation: str, error: Optional[tuple] = None,
+                             resources: Optional[list] = None) -> str:
+        now = _iso(_now())
+        wr_id = f"ocid1.objectstorageworkrequest.oc1..fake{uuid.uuid4().hex}"
+        self.work_requests[wr_id] = {
+            "id": wr_id,
+            "operationType": operation,
+            "resources": resources or [],
+            "status": "FAILED" if error else "COMPLETED",
+            "percentComplete": 100.0,
+            "timeAccepted": now,
+            "timeStarted": now,
+            "timeFinished": now,
+            "_errors": [{"code": error[0], "message": error[1], "timestamp": now}] if error else [],
+        }
+        return wr_id
+
+    def _object_resource(self, action: str, bucket: str, name: str) -> dict:
+        namespace = self.config.namespace
+        return {
+            "actionType": action,
+            "entityType": "object",
+            "identifier": name,
+            "entityUri": f"/n/{namespace}/b/{bucket}/o/{quote(name, safe='')}",
+            "metadata": {"NAMESPACE": namespace, "BUCKET": bucket, "OBJECT": name},
+        }
+
+    async def copy_object(self, request, body, env, bucket):
+        payload = json.loads(body or b"{}")
+        source = bucket.objects.get(payload.get("sourceObjectName"))
+        if source is None:
+            return _oci_error(404, "ObjectNotFound", f"objeto '{payload.get('sourceObjectName')}' não existe")
+        destination = self.buckets.get(payload.get("destinationBucket"))
+        dest_name = payload.get("destinationObjectName") or source.name
+        error = None
+        if destination is None or (env and destination.env and destination.env != env):
+            error = ("BucketNotFound", f"bucket '{payload.get('destinationBucket')}' não existe ou sem acesso")
+        elif payload.get("destinationObjectIfNoneMatchETag") == "*" and dest_name in destination.objects:
+            error = ("IfNoneMatchFailed", f"objeto '{dest_name}' já existe no destino")
+        else:
+            destination.objects[dest_name] = FakeObject(dest_name, source.data, content_type=source.content_type,
+                                                        metadata=dict(source.metadata), md5=source.md5,
+                                                        multipart_md5=source.multipart_md5)
+        resources = [self._object_resource("READ", bucket.name, source.name),
+                     self._object_resource("WRITTEN", payload.get("destinationBucket"), dest_name)]
+        wr_id = self._finish_work_request("COPY_OBJECT", error, resources=resources)
+        return Response(status_code=202, headers={"opc-work-request-id": wr_id})
+
+    async def rename_object(self, request, body, env, bucket):
+        payload = json.loads(body or b"{}")
+        source = bucket.objects.get(payload.get("sourceName"))
+        if source is None:
+            return _oci_error(404, "ObjectNotFound", f"objeto '{payload.get('sourceName')}' não existe")
+        new_name = payload.get("newName")
+        if not new_name:
+            return _oci_error(400, "InvalidParameter", "newName é obrigatório")
+        if payload.get("newObjIfNoneMatchETag") == "*" and new_name in bucket.objects:
+            return _oci_error(412, "IfNoneMatchFailed", f"objeto '{new_name}' já existe")
+        del bucket.objects[source.name]
+        source.name = new_name
+        bucket.objects[new_name] = source
+        return Response(status_code=200)
+
+    async def get_work_request(self, request, body, env, wr):
+        work_request = self.work_requests.get(wr)
+        if work_request is None:
+            return _oci_error(404, "WorkRequestNotFound", f"work request '{wr}' não existe")
+        return _json({k: v for k, v in work_request.items() if not k.startswith("_")})
+
+    async def get_work_request_errors(self, request, body, env, wr):
+        work_request = self.work_requests.get(wr)
+        if work_request is None:
+            return _oci_error(404, "WorkRequestNotFound", f"work request '{wr}' não existe")
+        return _json(work_request["_errors"])
+
+    # ====== IDENTITY ======
+    async def list_compartments(self, request, body, env):
+        query = self._query(request)
+        parent = query.get("compartmentId")
+        subtree = query.get("compartmentIdInSubtree") == "true"
+        name = query.get("name")
+        state = query.get("lifecycleState")
+
+        def _descends(comp):
+            current = comp
+            while current is not None:
+                if current["compartmentId"] == parent:
+                    return True
+                if not subtree:
+                    return False
+                current = self.compartments.get(current["compartmentId"])
+            return False
+
+        items = [c for c in sorted(self.compartments.values(), key=lambda c: c["name"])
+                 if _descends(c) and (not name or c["name"] == name)
+                 and (not state or c["lifecycleState"] == state)]
+        page, headers = self._page(items, request, key=lambda c: c["name"])
+        return _json(page, headers=headers)
+
+    # ====== CONTROLE ======
+    def stats(self) -> dict:
+        return {
+            "config": asdict(self.config),
+            "calls": dict(sorted(self.calls.items())),
+            "injected_errors": self.injected_errors,
+            "injected_throttles": self.injected_throttles,
+            "signature_failures": self.signature_failures,
+            "buckets": {name: len(b.objects) for name, b in sorted(self.buckets.items())},
+            "work_requests": len(self.work_requests),
+        }
+
+
+def create_app(config: Optional[FakeConfig] = None) -> FastAPI:
+    fake = FakeOCI(config)
+    app = FastAPI(title="fake-oci", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.fake = fake
+
+    # ---------- controle do fake ----------
+    @app.get("/_fake/stats")
+    def fake_stats():
+        return fake.stats()
+
+    @app.post("/_fake/config")
+    async def fake_config(request: Request):
+        """Altera a configuração em execução, ex: {"latency_ms": 50, "error_rate": 0.05}."""
+        try:
+            fake.config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return _json({"error": str(e)}, status=422)
+        return asdict(fake.config)
+
+    @app.post("/_fake/buckets")
+    async def fake_bucket(request: Request):
+        """Cria (ou completa) um bucket com objetos, ex: {"name": "lista-100k", "objects": 100000}."""
+        payload = await request.json()
+        compartment = payload.get("compartment", "cp-infra-ddw3-dev")
+        compartment_id = compartment if compartment in fake.compartments else _fake_ocid("compartment", compartment)
+        if compartment_id not in fake.compartments:
+            return _json({"error": f"compartment '{compartment}' não existe"}, status=422)
+        bucket = fake.buckets.get(payload["name"]) or fake.add_bucket(payload["name"], compartment_id)
+        fake.fill_bucket(bucket, int(payload.get("objects", 0)), int(payload.get("object_size", 0)),
+                         payload.get("prefix", "seed/"))
+        return {"bucket": bucket.name, "objects": len(bucket.objects)}
+
+    @app.put("/_fake/graph/users/{user}")
+    async def fake_graph_user(user: str, request: Request):
+        """Define o memberOf de um usuário: lista de {"displayName", "id", "@odata.type"}."""
+        fake.graph_users[user.lower()] = await request.json()
+        return {"user": user, "groups": len(fake.graph_users[user.lower()])}
+
+    # ---------- Graph ----------
+    @app.post("/oauth2/v2.0/token")
+    @app.post("/{tenant}/oauth2/v2.0/token")
+    async def graph_token(request: Request, tenant: Optional[str] = None):
+        injected = await fake._inject()
+        if injected is not None:
+            return injected
+        form = await request.form()
+        if form.get("grant_type") != "client_credentials" or not form.get("client_id"):
+            return _json({"error": "invalid_request", "error_description": "client_credentials esperado"}, 400)
+        token = f"fake-graph-{uuid.uuid4().hex}"
+        fake.tokens.add(token)
+        fake.calls["graph_token"] = fake.calls.get("graph_token", 0) + 1
+        return {"token_type": "Bearer", "expires_in": 3599, "access_token": token}
+
+    def _graph_auth(request: Request) -> bool:
+        auth = request.headers.get("authorization", "")
+        return auth.startswith("Bearer ") and auth[len("Bearer "):] in fake.tokens
+
+    def _member_of_page(user: str, top: int, skip: int, base_url: str) -> dict:
+        groups = fake.member_of(user)
+        top = max(1, min(top, fake.config.graph_page_size))
+        page = {"value": groups[skip:skip + top]}
+        if skip + top < len(groups):
+            page["@odata.nextLink"] = (f"{base_url}/v1.0/users/{user}/memberOf"
+                                       f"?$select=id,displayName&$top={top}&$skiptoken={skip + top}")
+        return page
+
+    @app.get("/v1.0/users/{user}/memberOf")
+    async def graph_member_of(user: str, request: Request):
+        fake.calls["graph_member_of"] = fake.calls.get("graph_member_of", 0) + 1
+        injected = await fake._inject()
+        if injected is not None:
+            return injected
+        if not _graph_auth(request):
+            return _json({"error": {"code": "InvalidAuthenticationToken", "message": "token inválido"}}, 401)
+        query = fake._query(request)
+        base_url = str(request.base_url).rstrip("/")
+        return _member_of_page(user, int(query.get("$top") or 100), int(query.get("$skiptoken") or 0), base_url)
+
+    @app.post("/v1.0/$batch")
+    async def graph_batch(request: Request):
+        fake.calls["graph_batch"] = fake.calls.get("graph_batch", 0) + 1
+        injected = await fake._inject()
+        if injected is not None:
+            return injected
+        if not _graph_auth(request):
+            return _json({"error": {"code": "InvalidAuthenticationToken", "message": "token inválido"}}, 401)
+        base_url = str(request.base_url).rstrip("/")
+        responses = []
+        for item in (await request.json()).get("requests", [])[:20]:
+            match = re.fullmatch(r"/users/([^/?]+)/memberOf(?:\?(.*))?", item.get("url", ""))
+            if not match:
+                responses.append({"id": item.get("id"), "status": 400,
+                                  "body": {"error": {"code": "BadRequest", "message": "url não suportada"}}})
+                continue
+            query = {k: v[0] for k, v in parse_qs(match.group(2) or "").items()}
+            user = unquote(match.group(1))
+            responses.append({"id": item.get("id"), "status": 200,
+                              "body": _member_of_page(user, int(query.get("$top") or 100), 0, base_url)})
+        return {"responses": responses}
+
+    # ---------- OCI (Object Storage + Identity) ----------
+    @app.api_route("/p/{token}/n/{namespace}/b/{bucket}/o/{obj:path}", methods=["GET", "HEAD", "PUT"])
+    async def oci_par(request: Request, token: str, obj: str):
+        fake.calls["par_access"] = fake.calls.get("par_access", 0) + 1
+        injected = await fake._inject()
+        if injected is not None:
+            return injected
+        return await fake.par_access(request, token, obj)
+
+    @app.api_route("/{path:path}", methods=["GET", "HEAD", "POST", "PUT", "DELETE"])
+    async def oci(request: Request, path: str):
+        return await fake.dispatch(request)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake local da OCI (Object Storage/Identity) e do Graph")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--seed-objects", type=int, default=0, help="objetos em bench-dev / bench-prd")
+    parser.add_argument("--seed-object-size", type=int, default=1024)
+    parser.add_argument("--graph-groups", type=int, default=0, help="grupos extras no memberOf de cada usuário")
+    parser.add_argument("--no-verify", action="store_true", help="não confere as assinaturas da OCI")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        verify_signatures=not args.no_verify,
+        seed_objects=args.seed_objects,
+        seed_object_size=args.seed_object_size,
+        graph_groups_per_user=args.graph_groups,
+    )
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 Fake OCI/Graph em {base}")
+    print(f"   export OCI_OBJECT_STORAGE_ENDPOINT={base} OCI_IDENTITY_ENDPOINT={base}")
+    print(f"   export GRAPH_BASE_URL={base}/v1.0 GRAPH_TOKEN_URL={base}/oauth2/v2.0/token")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
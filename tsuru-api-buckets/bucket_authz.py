@@ -0,0 +1,148 @@
+# bucket_authz.py
+"""
+Autorização "usuário X pode mexer no bucket Y?".
+
+O group_to_buckets.json (groups_by_name / groups_by_id / default) é compilado num
+índice em memória, recarregado quando o arquivo muda. Os grupos do usuário (memberOf
+do Graph, já em cache) viram um UserGrants com:
+  - buckets liberados explicitamente pelo mapeamento;
+  - compartments cp-* extraídos das labels dos grupos (ex: OCI-Administrators-cp-infra-ddw3-dev),
+    que liberam todos os buckets daquele compartment.
+A checagem em si é feita só com lookups em sets, sem chamadas de rede.
+"""
+import os
+import re
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import log_setup
+
+log = log_setup.get_logger(__name__)
+
+MAPPING_PATH = os.getenv(
+    "GROUP_TO_BUCKETS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "group_to_buckets.json"),
+)
+# Intervalo mínimo (s) entre verificações do mtime do arquivo de mapeamento
+RELOAD_CHECK_INTERVAL = float(os.getenv("AUTHZ_RELOAD_CHECK_INTERVAL", "5"))
+# AUTHZ_ENABLED=false desliga a checagem (ambiente local)
+AUTHZ_ENABLED = os.getenv("AUTHZ_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# extrai token cp-... de uma label/group (retorna None se não achar); o cp- precisa começar
+# a label ou vir depois de um separador, senão "scp-..."/"xcp_..." concederiam um compartment
+_RE_CP_TOKEN = re.compile(r"(?<![A-Za-z0-9])(cp[-_][A-Za-z0-9\-_]+)", re.I)
+def extract_child_from_group_label(label: str):
+    """
+    OCI-Administrators-cp-infra-ddw3-dev -> cp-infra-ddw3-dev
+    cp_infra_ddw3_prd                    -> cp_infra_ddw3_prd
+    Grupo-scp-infra / xcp_infra          -> None
+    """
+    if not label:
+        return None
+    m = _RE_CP_TOKEN.search(label)
+    return m.group(1) if m else None
+
+
+@dataclass(frozen=True)
+class UserGrants:
+    buckets: frozenset = frozenset()
+    compartments: frozenset = frozenset()       # nomes cp-* (minúsculos)
+    compartment_ids: frozenset = frozenset()    # OCIDs dos compartments acima, quando já resolvidos
+
+    def allows_bucket(self, bucket: str, compartment_id: Optional[str] = None) -> bool:
+        return bucket in self.buckets or (compartment_id is not None and compartment_id in self.compartment_ids)
+
+    def allows_compartment(self, compartment: str) -> bool:
+        return compartment.lower() in self.compartments or compartment in self.compartment_ids
+
+
+@dataclass
+class AuthzIndex:
+    by_name: dict = field(default_factory=dict)   # displayName (minúsculo) -> frozenset de buckets
+    by_id: dict = field(default_factory=dict)     # id do grupo -> frozenset de buckets
+    default: frozenset = frozenset()
+    version: int = 0
+    mtime: Optional[float] = None
+
+    @classmethod
+    def compile(cls, data: dict, version: int = 0, mtime: Optional[float] = None) -> "AuthzIndex":
+        return cls(
+            by_name={k.lower(): frozenset(v) for k, v in (data.get("groups_by_name") or {}).items()},
+            by_id={k: frozenset(v) for k, v in (data.get("groups_by_id") or {}).items()},
+            default=frozenset(data.get("default") or []),
+            version=version,
+            mtime=mtime,
+        )
+
+    def grants_for(self, member_of: list) -> UserGrants:
+        """Compila os grupos do usuário (itens do memberOf) em um UserGrants (sem compartment_ids)."""
+        buckets = set(self.default)
+        compartments = set()
+        for item in member_of:
+            name = item.get("displayName") or ""
+            buckets.update(self.by_name.get(name.lower(), ()))
+            buckets.update(self.by_id.get(item.get("id"), ()))
+            child = extract_child_from_group_label(name)
+            if child:
+                compartments.add(child.lower())
+        return UserGrants(buckets=frozenset(buckets), compartments=frozenset(compartments))
+
+
+class AuthzIndexLoader:
+    """Mantém o AuthzIndex atual e o recarrega quando o mtime do arquivo muda."""
+
+    def __init__(self, path: str = MAPPING_PATH, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._index = AuthzIndex()
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self.reloads = 0
+        self.errors = 0
+
+    def _load(self, mtime: Optional[float]):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # mantém o índice anterior: um arquivo quebrado não derruba a autorização
+            self.errors += 1
+            log.warning("⚠️ Falha ao carregar %s: %s", self.path, e)
+            return
+        self._index = AuthzIndex.compile(data, version=self._index.version + 1, mtime=mtime)
+        self.reloads += 1
+        log.info("🔐 Índice de autorização carregado (v%s): %s grupo(s) por nome, %s por id",
+                 self._index.version, len(self._index.by_name), len(self._index.by_id))
+
+    def current(self) -> AuthzIndex:
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._index
+        with self._lock:
+            if now >= self._next_check:
+                self._next_check = now + self.check_interval
+                try:
+                    mtime = os.stat(self.path).st_mtime
+                except OSError:
+                    mtime = None
+                if mtime != self._index.mtime or self._index.version == 0:
+                    self._load(mtime)
+        return self._index
+
+    def stats(self) -> dict:
+        index = self._index
+        return {
+            "enabled": AUTHZ_ENABLED,
+            "path": self.path,
+            "version": index.version,
+            "groups_by_name": len(index.by_name),
+            "groups_by_id": len(index.by_id),
+            "reloads": self.reloads,
+            "errors": self.errors,
+        }
+
+
+AUTHZ_INDEX = AuthzIndexLoader()
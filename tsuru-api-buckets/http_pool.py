@@ -0,0 +1,334 @@
+# http_pool.py
+import os
+import time
+import asyncio
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import log_setup
+import metrics
+import resilience
+
+# Quantidade de hosts distintos mantidos em cache por adapter
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+# Conexões keep-alive mantidas por host (dimensione pelo nº de threads do worker uvicorn)
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+# Bloqueia (em vez de abrir conexão extra descartável) quando o pool do host está cheio
+POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+# Overrides por host, ex: "graph.microsoft.com=5,objectstorage.sa-saopaulo-1.oraclecloud.com=50"
+POOL_SIZES = os.getenv("HTTP_POOL_SIZES", "")
+
+# Cliente assíncrono (rotas FastAPI): limite total de conexões simultâneas
+ASYNC_MAX_CONNECTIONS = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "200"))
+ASYNC_MAX_KEEPALIVE = int(os.getenv("HTTP_ASYNC_MAX_KEEPALIVE", str(POOL_MAXSIZE)))
+ASYNC_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_ASYNC_KEEPALIVE_EXPIRY", "30"))
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+# Correlation ID da requisição repassado à OCI (aparece nos logs/chamados de suporte da Oracle)
+OPC_CLIENT_REQUEST_ID = "opc-client-request-id"
+
+_log = log_setup.TRACE
+log = log_setup.get_logger(__name__)
+
+
+class CircuitOpen(resilience.CircuitOpenError, requests.exceptions.ConnectionError):
+    """CircuitOpenError no cliente síncrono: quem já trata ConnectionError (CLI, Graph) segue funcionando."""
+
+
+def _log_retry(method: str, url, attempt: int, delay: float, outcome, headers=None):
+    log.info("🔁 %s %s -> %s; tentativa %s/%s em %.2fs (opc-request-id: %s)",
+             method.upper(), urlsplit(str(url)).path, outcome, attempt + 1, resilience.RETRY_MAX_ATTEMPTS, delay,
+             headers.get("opc-request-id") if headers is not None else None)
+
+
+def _replayable_body(kwargs: dict):
+    """(pode reenviar?, posição para voltar o arquivo) do corpo de uma chamada requests."""
+    data = kwargs.get("data")
+    if data is None or isinstance(data, (bytes, str, dict, list, tuple)):
+        return True, None
+    try:
+        return True, data.tell()
+    except (AttributeError, OSError):
+        return False, None
+
+
+def _connect_failed(error: requests.exceptions.RequestException) -> bool:
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _trace(method: str, url, status, elapsed: float, headers):
+    """Trace DEBUG (amostrado) de uma chamada externa: sem query string, que pode trazer tokens/OCIDs."""
+    parts = urlsplit(str(url))
+    _log.debug("%s %s://%s%s -> %s (%.1f ms)", method.upper(), parts.scheme, parts.netloc, parts.path,
+               status, elapsed * 1000,
+               extra={"upstream_status": status, "elapsed_ms": round(elapsed * 1000, 1),
+                      "opc_request_id": headers.get("opc-request-id") if headers is not None else None})
+
+
+def _parse_pool_sizes(raw: str) -> dict:
+    sizes = {}
+    for item in raw.split(","):
+        host, sep, size = item.strip().partition("=")
+        if sep and host and size.strip().isdigit():
+            sizes[host.strip().lower()] = int(size)
+    return sizes
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session com pool de conexões keep-alive por host e timeout padrão
+    (connect, read) aplicado a toda chamada que não informar 'timeout'.
+    """
+
+    def __init__(self, pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                 pool_sizes: Optional[dict] = None, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=POOL_BLOCK)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        # hosts com tamanho de pool próprio ganham um adapter dedicado
+        for host, size in (pool_sizes or {}).items():
+            dedicated = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=POOL_BLOCK)
+            self.mount(f"https://{host}", dedicated)
+            self.mount(f"http://{host}", dedicated)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        request_id = log_setup.current_request_id()
+        if request_id:
+            kwargs["headers"] = {OPC_CLIENT_REQUEST_ID: request_id, **(kwargs.get("headers") or {})}
+        upstream, operation = metrics.classify_upstream(method, url)
+        circuit = resilience.breaker(upstream)
+        replayable, position = _replayable_body(kwargs)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                circuit.before_call()
+            except resilience.CircuitOpenError as e:
+                raise CircuitOpen(e.upstream, e.retry_after) from None
+            if position is not None and attempt > 1:
+                kwargs["data"].seek(position)
+
+            start = time.perf_counter()
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                elapsed = time.perf_counter() - start
+                metrics.observe_upstream(upstream, operation, "error", elapsed)
+                if log_setup.trace_enabled():
+                    _trace(method, url, "error", elapsed, None)
+                circuit.record(failed=True)
+                # timeout de leitura não é repetido: a chamada já prendeu este worker o suficiente
+                delay = None if isinstance(e, requests.exceptions.ReadTimeout) else resilience.retry_delay(
+                    method, attempt, started, connect_error=_connect_failed(e), replayable=replayable)
+                if delay is None:
+                    raise
+                _log_retry(method, url, attempt, delay, type(e).__name__)
+                circuit.record_retry()
+                time.sleep(delay)
+                continue
+            except BaseException:
+                circuit.release_probe()
+                raise
+
+            elapsed = time.perf_counter() - start
+            metrics.observe_upstream(upstream, operation, response.status_code, elapsed)
+            if log_setup.trace_enabled():
+                _trace(method, url, response.status_code, elapsed, response.headers)
+            circuit.record(failed=resilience.is_failure_status(response.status_code))
+            delay = resilience.retry_delay(
+                method, attempt, started, status=response.status_code,
+                retry_after=response.headers.get("retry-after"), replayable=replayable,
+            ) if response.status_code in resilience.RETRYABLE_STATUS else None
+            if delay is None:
+                return response
+            response.close()
+            _log_retry(method, url, attempt, delay, response.status_code, response.headers)
+            circuit.record_retry()
+            time.sleep(delay)
+
+    def pool_stats(self) -> list:
+        """Uso dos pools por host: conexões criadas, ociosas, requisições e tamanho máximo."""
+        stats = []
+        seen = set()
+        for adapter in self.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+                stats.append({
+                    "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                    "maxsize": pool.pool.maxsize if pool.pool else 0,
+                    "connections_created": pool.num_connections,
+                    "idle_connections": idle,
+                    "requests": pool.num_requests,
+                })
+        return stats
+
+
+_session: Optional[PooledSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Sessão HTTP compartilhada pelo processo (OCI Object Storage, Identity e Graph)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession(pool_sizes=_parse_pool_sizes(POOL_SIZES))
+    return _session
+
+
+# Extensão de requisição do httpx para chamadas de limpeza (ex: AbortMultipartUpload) que devem
+# ser tentadas mesmo com o circuito aberto: deixar o upload órfão na OCI é pior que uma chamada a mais
+BYPASS_CIRCUIT = "tsuru.bypass_circuit"
+
+
+class _MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte httpx que aplica retry/circuit breaker (resilience) e registra latência
+    (até os headers) e status de cada tentativa.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._wrapped = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request_id = log_setup.current_request_id()
+        if request_id and OPC_CLIENT_REQUEST_ID not in request.headers:
+            request.headers[OPC_CLIENT_REQUEST_ID] = request_id
+        method = request.method
+        upstream, operation = metrics.classify_upstream(method, str(request.url))
+        circuit = resilience.breaker(upstream)
+        # corpos em stream (uploads) não podem ser reenviados
+        replayable = isinstance(request.stream, httpx.ByteStream)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            if not request.extensions.get(BYPASS_CIRCUIT):
+                circuit.before_call()
+
+            start = time.perf_counter()
+            try:
+                response = await self._wrapped.handle_async_request(request)
+            except (httpx.NetworkError, httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+                elapsed = time.perf_counter() - start
+                metrics.observe_upstream(upstream, operation, "error", elapsed)
+                if log_setup.trace_enabled():
+                    _trace(method, request.url, "error", elapsed, None)
+                if isinstance(e, httpx.PoolTimeout):
+                    # falta de conexão livre no nosso pool: não é falha do upstream
+                    circuit.release_probe()
+                    raise
+                circuit.record(failed=True)
+                connect_error = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                delay = None if isinstance(e, httpx.TimeoutException) and not connect_error else resilience.retry_delay(
+                    method, attempt, started, connect_error=connect_error, replayable=replayable)
+                if delay is None:
+                    raise
+                _log_retry(method, request.url, attempt, delay, type(e).__name__)
+                circuit.record_retry()
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                circuit.release_probe()
+                raise
+
+            elapsed = time.perf_counter() - start
+            metrics.observe_upstream(upstream, operation, response.status_code, elapsed)
+            if log_setup.trace_enabled():
+                _trace(method, request.url, response.status_code, elapsed, response.headers)
+            circuit.record(failed=resilience.is_failure_status(response.status_code))
+            delay = resilience.retry_delay(
+                method, attempt, started, status=response.status_code,
+                retry_after=response.headers.get("retry-after"), replayable=replayable,
+            ) if response.status_code in resilience.RETRYABLE_STATUS else None
+            if delay is None:
+                return response
+            await response.aclose()
+            _log_retry(method, request.url, attempt, delay, response.status_code, response.headers)
+            circuit.record_retry()
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._wrapped.aclose()
+
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Cliente HTTP assíncrono compartilhado pelo event loop do worker."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_KEEPALIVE,
+            keepalive_expiry=ASYNC_KEEPALIVE_EXPIRY,
+        ))
+        _async_client = httpx.AsyncClient(
+            transport=_MeteredTransport(transport),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+    return _async_client
+
+
+async def aclose_async_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _async_pool_stats() -> dict:
+    stats = {
+        "max_connections": ASYNC_MAX_CONNECTIONS,
+        "max_keepalive": ASYNC_MAX_KEEPALIVE,
+        "connections": 0,
+        "idle_connections": 0,
+    }
+    if _async_client is None:
+        return stats
+    # httpcore não expõe estatísticas do pool via httpx; lemos as conexões do transporte padrão
+    transport = getattr(_async_client, "_transport", None)
+    transport = getattr(transport, "_wrapped", transport)
+    pool = getattr(transport, "_pool", None)
+    for conn in list(getattr(pool, "connections", [])):
+        stats["connections"] += 1
+        if conn.is_idle():
+            stats["idle_connections"] += 1
+    return stats
+
+
+def pool_stats() -> dict:
+    session = get_session()
+    return {
+        "pool_maxsize": session.pool_maxsize,
+        "timeout": {"connect": session.timeout[0], "read": session.timeout[1]},
+        "hosts": session.pool_stats(),
+        "async": _async_pool_stats(),
+    }
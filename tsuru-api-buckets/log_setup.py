@@ -0,0 +1,222 @@
+# log_setup.py
+"""
+Logs da aplicação (operacionais — a auditoria continua em app_logger.py).
+
+- níveis via LOG_LEVEL (DEBUG, INFO, WARNING, ERROR) e saída JSON (uma linha por evento)
+  ou texto (LOG_FORMAT=text);
+- correlation ID por requisição (RequestIdMiddleware): vem do header X-Request-ID ou é
+  gerado, volta na resposta, entra em todo log da requisição e segue para a OCI como
+  opc-client-request-id;
+- a requisição só enfileira o registro (QueueHandler): uma thread escreve no stdout.
+  Se a fila encher, o registro é descartado e contado, sem bloquear a requisição;
+- traces de chamadas externas (logger "tsuru.trace", DEBUG) são amostrados por requisição
+  (LOG_TRACE_SAMPLE_RATE). Com DEBUG desligado, o custo é um isEnabledFor().
+
+Nos módulos: log = log_setup.get_logger(__name__); log.debug("... %s", valor) — use
+argumentos em vez de f-string para não formatar mensagens que serão descartadas.
+"""
+import os
+import re
+import sys
+import json
+import uuid
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json (padrão, para o pipeline de logs do Tsuru) ou text (leitura humana)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Registros aguardando escrita; acima disso são descartados e contados em 'dropped'
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fração das requisições que registram os traces DEBUG das chamadas externas
+LOG_TRACE_SAMPLE_RATE = float(os.getenv("LOG_TRACE_SAMPLE_RATE", "0.01"))
+REQUEST_ID_HEADER = os.getenv("REQUEST_ID_HEADER", "X-Request-ID")
+
+ROOT_LOGGER = "tsuru"
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_trace_sampled: ContextVar[Optional[bool]] = ContextVar("trace_sampled", default=None)
+# aceita IDs de clientes/proxies só se forem curtos e sem caracteres de controle
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:\-]{1,128}")
+
+# atributos padrão do LogRecord; o resto veio de extra={...} e vai para o JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger da aplicação ('tsuru.<módulo>'), configurado pelo setup()."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+TRACE = get_logger("trace")
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def trace_enabled() -> bool:
+    """True se os traces DEBUG das chamadas externas devem ser registrados nesta requisição."""
+    if not TRACE.isEnabledFor(logging.DEBUG):
+        return False
+    sampled = _trace_sampled.get()
+    if sampled is None:
+        # fora de uma requisição (CLI, threads de background): amostra por chamada
+        return random.random() < LOG_TRACE_SAMPLE_RATE
+    return sampled
+
+
+# ====== FORMATAÇÃO ======
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [{request_id}]" if request_id else line
+
+
+# ====== FILA ======
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enfileira sem bloquear; guarda o request_id do contexto antes de trocar de thread."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # a mensagem é montada aqui (os args podem mudar depois) e a exceção vira texto
+        record.request_id = _request_id.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[_QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def setup(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """Configura os loggers da aplicação (idempotente). Chamado na importação do main."""
+    global _handler, _listener
+    with _setup_lock:
+        if _handler is not None:
+            return
+        output = logging.StreamHandler(sys.stdout)
+        output.setFormatter(TextFormatter() if fmt == "text" else JsonFormatter())
+        _handler = _QueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown)
+
+        app = logging.getLogger(ROOT_LOGGER)
+        app.setLevel(getattr(logging, level, logging.INFO))
+        app.addHandler(_handler)
+        app.propagate = False
+
+
+def setup_cli(level: str = os.getenv("LOG_LEVEL", "INFO")):
+    """CLI: mensagens como texto simples no terminal, sem fila nem JSON."""
+    app = logging.getLogger(ROOT_LOGGER)
+    if app.handlers:
+        return
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    app.setLevel(getattr(logging, level.upper(), logging.INFO))
+    app.addHandler(output)
+    app.propagate = False
+
+
+def shutdown():
+    """Escreve o que ainda estiver na fila."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stats() -> dict:
+    return {
+        "level": logging.getLevelName(logging.getLogger(ROOT_LOGGER).getEffectiveLevel()),
+        "format": LOG_FORMAT,
+        "trace_sample_rate": LOG_TRACE_SAMPLE_RATE,
+        "queued": _handler.queue.qsize() if _handler else 0,
+        "enqueued": _handler.enqueued if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+    }
+
+
+# ====== MIDDLEWARE ======
+class RequestIdMiddleware:
+    """Define o correlation ID (e a amostragem de traces) da requisição e o devolve no header."""
+
+    def __init__(self, app):
+        self.app = app
+        self._header = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self._header:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.fullmatch(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+        id_token = _request_id.set(request_id)
+        trace_token = _trace_sampled.set(
+            TRACE.isEnabledFor(logging.DEBUG) and random.random() < LOG_TRACE_SAMPLE_RATE)
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(self._header, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _request_id.reset(id_token)
+            _trace_sampled.reset(trace_token)
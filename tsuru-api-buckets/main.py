@@ -1,22 +1,41 @@
 # main.py
-import tempfile
+import os
+import json
+import asyncio
+import dataclasses
 import oci
 import base64
 from pathlib import Path
 from typing import Optional
-from fastapi import Request, FastAPI, UploadFile, Query, File, Form, Body, HTTPException, Header
+from fastapi import Request, FastAPI, Query, Body, HTTPException, Header
 from fastapi.responses import JSONResponse
 from requests import request
 import oci_client as oc
-import re
+import oci_async_client as aoc
+from upload_source import UploadSource
+import http_pool
+import app_logger
+import log_setup
+import metrics
+import resilience
+from audit_index import AUDIT_INDEX
+import bucket_authz
+from bucket_authz import AUTHZ_INDEX, UserGrants, extract_child_from_group_label
+from ttl_cache import TTLCache
 from fastapi import Body, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import Header, HTTPException, Depends
 from typing import List, Dict, Any
-from get_user_groups_and_roles import get_user_member_of, get_access_token
+from get_user_groups_and_roles import (
+    get_cached_member_of, get_members_of_batch, TOKEN_PROVIDER, MEMBERSHIP_CACHE,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse, PlainTextResponse
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile as StarletteUploadFile
 
+log_setup.setup()
+log = log_setup.get_logger(__name__)
 
 FRONT_ORIGINS = [
     "http://localhost:5173",
@@ -38,14 +57,6 @@ def sanitize_input(val):
         return v
     return val
 
-# extrai token cp-... de uma label/group (retorna None se não achar)
-_RE_CP_TOKEN = re.compile(r"(cp[-_][A-Za-z0-9\-_]+)", re.I)
-def extract_child_from_group_label(label: str):
-    if not label:
-        return None
-    m = _RE_CP_TOKEN.search(label)
-    return m.group(1) if m else None
-
 app = FastAPI(
     title="ddw3-tsuru-api-s3",
     version="1.0.0",
@@ -61,6 +72,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# por fora do CORS: mede também as respostas de preflight e os erros
+app.add_middleware(metrics.MetricsMiddleware)
+# o mais externo: o correlation ID vale para tudo que roda na requisição (inclusive os middlewares)
+app.add_middleware(log_setup.RequestIdMiddleware)
+@app.exception_handler(resilience.CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: resilience.CircuitOpenError):
+    # upstream degradado: falha na hora, sem prender a requisição em timeouts
+    return JSONResponse(status_code=503, content={"detail": str(exc), "upstream": exc.upstream},
+                        headers={"Retry-After": str(int(exc.retry_after) + 1)})
+
 @app.get("/__routes")
 def show_routes():
     return [{"path": r.path, "methods": list(r.methods)} for r in app.routes]
@@ -85,6 +106,7 @@ def login(payload: dict = Body(...)):
 
     # Token de desenvolvimento — substitua por JWT / OAuth2 em produção.
     token = f"dev-token-for-{email}"
+    app_logger.log_login(email)
     return {"access_token": token, "token_type": "bearer"}
 
 def get_current_email_from_auth(authorization: Optional[str] = Header(None)):
@@ -99,30 +121,75 @@ def get_current_email_from_auth(authorization: Optional[str] = Header(None)):
     # TODO: decode JWT here in prod
     raise HTTPException(401, "Unsupported token")
 
+def _audit_user(authorization: Optional[str]) -> str:
+    """Email para o log de auditoria ('anonymous' se a requisição não trouxer token válido)."""
+    try:
+        return get_current_email_from_auth(authorization)
+    except HTTPException:
+        return "anonymous"
+
+def _simplify_member_of(member_of):
+    return [
+        {
+            "id": item.get("id"),
+            "displayName": item.get("displayName"),
+            "odata_type": item.get("@odata.type"),
+        }
+        for item in member_of
+    ]
+
 @app.get("/user/groups")
-def api_user_groups(current_email: str = Depends(get_current_email_from_auth),
-                    token: str = Depends(get_access_token),):
+def api_user_groups(current_email: str = Depends(get_current_email_from_auth)):
     """
     Retorna a lista completa de 'memberOf' do usuário identificado por current_email.
     Resposta: {"email":"...","memberOf":[{"id":"...", "displayName":"...", "@odata.type":"..."} , ...]}
+    A consulta ao Graph fica em cache por usuário (GRAPH_MEMBERSHIP_CACHE_TTL).
     """
     try:
-        member_of = get_user_member_of(current_email, token)  # retorna lista já paginada
+        member_of = get_cached_member_of(current_email)  # retorna lista já paginada
+    except resilience.CircuitOpenError:
+        raise
     except Exception as e:
-        # log opcional
-        print(f"[ERROR] get_user_member_of({current_email}): {e}")
+        log.error("get_cached_member_of(%s) falhou: %s", current_email, e)
         raise HTTPException(status_code=502, detail=f"Erro ao consultar Graph: {e}")
 
     # Filtrar/formatar a resposta para o front (evita expor chaves indesejadas)
-    simplified = []
-    for item in member_of:
-        simplified.append({
-            "id": item.get("id"),
-            "displayName": item.get("displayName"),
-            "odata_type": item.get("@odata.type")
-        })
-
-    return {"email": current_email, "memberOf": simplified}
+    return {"email": current_email, "memberOf": _simplify_member_of(member_of)}
+
+# Emails (separados por vírgula) que podem consultar os grupos de outros usuários em POST /users/groups;
+# sem a variável, vale a lista de AUDIT_ADMINS
+USERS_GROUPS_ADMINS = {
+    e.strip().lower()
+    for e in os.getenv("USERS_GROUPS_ADMINS", os.getenv("AUDIT_ADMINS", "")).split(",")
+    if e.strip()
+}
+
+@app.post("/users/groups")
+def api_users_groups(payload: dict = Body(...), current_email: str = Depends(get_current_email_from_auth)):
+    """
+    memberOf de vários usuários numa só chamada (Graph $batch), para telas administrativas
+    ou pré-aquecimento do cache. Recebe JSON: {"users": ["a@dominio.com", ...]}
+    Resposta: {"users": {"a@dominio.com": [...] | null}} (null = falha ao consultar o usuário)
+    Só para quem está em USERS_GROUPS_ADMINS (403 para os demais).
+    """
+    if current_email.lower() not in USERS_GROUPS_ADMINS:
+        raise HTTPException(status_code=403, detail="Sem permissão para consultar grupos de outros usuários")
+    users = (payload or {}).get("users")
+    if not isinstance(users, list) or not all(isinstance(u, str) for u in users):
+        raise HTTPException(status_code=422, detail="Envie 'users' (lista de emails/ids)")
+    try:
+        results = get_members_of_batch(users)
+    except resilience.CircuitOpenError:
+        raise
+    except Exception as e:
+        log.error("get_members_of_batch(%s usuários) falhou: %s", len(users), e)
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar Graph: {e}")
+    return {
+        "users": {
+            uid: None if member_of is None else _simplify_member_of(member_of)
+            for uid, member_of in results.items()
+        }
+    }
 
 @app.get("/")
 def root():
@@ -137,10 +204,155 @@ def root():
 def health():
     return {"ok": True}
 
+@app.on_event("startup")
+def preload_oci_keys():
+    # parseia as chaves DEV/PRD uma única vez, antes do primeiro request
+    oc.preload_keys()
+
+@app.on_event("startup")
+async def preload_compartment_cache():
+    # opcional: evita a busca no Identity (compartmentIdInSubtree) no primeiro uso de cada compartment
+    if os.getenv("COMPARTMENT_CACHE_PRELOAD", "false").lower() in ("1", "true", "yes"):
+        await aoc.preload_compartments()
+
+@app.on_event("startup")
+def load_authz_index():
+    # compila o group_to_buckets.json antes do primeiro request (recarregado depois se o arquivo mudar)
+    AUTHZ_INDEX.current()
+
+@app.on_event("startup")
+def start_graph_token_refresh():
+    # token do Graph obtido e renovado em background: /user/groups não paga a ida ao login.microsoftonline.com
+    if os.getenv("GRAPH_TOKEN_BACKGROUND_REFRESH", "true").lower() in ("1", "true", "yes"):
+        TOKEN_PROVIDER.start()
+
+@app.on_event("startup")
+def start_audit_writer():
+    # indexa os logs existentes em background e passa a acompanhar o writer (GET /audit);
+    # conecta antes de iniciar o writer para ver o arquivamento dos dias anteriores na partida
+    AUDIT_INDEX.start(app_logger.AUDIT_WRITER)
+    app_logger.AUDIT_WRITER.start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    TOKEN_PROVIDER.stop()
+    await http_pool.aclose_async_client()
+
+@app.on_event("shutdown")
+async def close_audit_writer():
+    # grava o que ainda estiver na fila antes de encerrar
+    await asyncio.to_thread(app_logger.AUDIT_WRITER.close)
+    AUDIT_INDEX.stop()
+
+@app.get("/stats")
+def stats():
+    return {
+        "signer": oc.SIGNER.stats(),
+        "http_pool": http_pool.pool_stats(),
+        "compartment_cache": oc.COMPARTMENT_CACHE.stats(),
+        "bucket_cache": oc.BUCKET_CACHE.stats(),
+        "graph_token": TOKEN_PROVIDER.stats(),
+        "membership_cache": MEMBERSHIP_CACHE.stats(),
+        "authz": AUTHZ_INDEX.stats(),
+        "user_grants_cache": _USER_GRANTS.stats(),
+        "audit": app_logger.AUDIT_WRITER.stats(),
+        "audit_index": AUDIT_INDEX.stats(),
+        "upload_dedup": aoc.DEDUP_STATS.stats(),
+        "par_cache": aoc.PAR_CACHE.stats(),
+        "work_requests": aoc.WORK_REQUESTS.stats(),
+        "logging": log_setup.stats(),
+        "resilience": resilience.stats(),
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Métricas no formato texto do Prometheus (rotas, chamadas externas, bytes e caches)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# ---------- Autorização ----------
+# UserGrants compilados por usuário; recompilados quando o memberOf em cache ou o índice mudam
+_USER_GRANTS = TTLCache(ttl=float(os.getenv("AUTHZ_GRANTS_CACHE_TTL", "300")), max_size=10000)
+
+# ---------- Métricas coletadas no scrape ----------
+metrics.REGISTRY.add_collector(metrics.cache_collector({
+    "compartment": oc.COMPARTMENT_CACHE,
+    "bucket": oc.BUCKET_CACHE,
+    "membership": MEMBERSHIP_CACHE,
+    "user_grants": _USER_GRANTS,
+    "par": aoc.PAR_CACHE,
+    "work_requests": aoc.WORK_REQUESTS,
+}))
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "tsuru_signer", "Assinador OCI", oc.SIGNER.stats, counters=("cache_hits", "key_loads")))
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "tsuru_graph_token", "Token do Graph", TOKEN_PROVIDER.stats, counters=("hits", "acquisitions", "failures")))
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "tsuru_upload_dedup", "Deduplicação de uploads", aoc.DEDUP_STATS.stats,
+    counters=("checked", "skipped", "bytes_saved")))
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "tsuru_audit", "Fila de auditoria", app_logger.AUDIT_WRITER.stats,
+    counters=("enqueued", "written", "dropped", "write_errors"), gauges=("queued", "queue_high_water")))
+metrics.REGISTRY.add_collector(resilience.metrics_collector)
+metrics.REGISTRY.add_collector(metrics.stats_collector(
+    "tsuru_log", "Fila de logs", log_setup.stats, counters=("enqueued", "dropped"), gauges=("queued",)))
+
+async def _resolve_compartment_quiet(name: str) -> Optional[str]:
+    try:
+        return await aoc.resolve_compartment_ocid(name)
+    except ValueError:
+        return None
+
+async def current_user_grants(authorization: Optional[str] = Header(None)) -> Optional[UserGrants]:
+    """Dependency: permissões do usuário autenticado (None se AUTHZ_ENABLED=false)."""
+    if not bucket_authz.AUTHZ_ENABLED:
+        return None
+    email = get_current_email_from_auth(authorization)
+    try:
+        member_of = await asyncio.to_thread(get_cached_member_of, email)
+    except resilience.CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar Graph: {e}")
+
+    index = AUTHZ_INDEX.current()
+    key = (email.lower(), index.version)
+    hit, cached = _USER_GRANTS.lookup(key)
+    if hit and cached[0] is member_of:
+        return cached[1]
+
+    grants = index.grants_for(member_of)
+    ocids = await asyncio.gather(*(_resolve_compartment_quiet(c) for c in grants.compartments))
+    grants = dataclasses.replace(grants, compartment_ids=frozenset(o for o in ocids if o))
+    _USER_GRANTS.set(key, (member_of, grants))
+    return grants
+
+def _allowed_buckets(buckets: list, grants: Optional[UserGrants]) -> list:
+    if grants is None:
+        return buckets
+    return [b for b in buckets if grants.allows_bucket(b.get("name"), b.get("compartmentId"))]
+
+# ---------- Credenciais OCI por requisição ----------
+def compartment_credentials(compartment: str) -> oc.OCICredentials:
+    """Credenciais do ambiente (DEV/PRD) do compartment; 422 se o nome não indicar o ambiente."""
+    try:
+        return oc.credentials_for_compartment(compartment)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+async def bucket_credentials(bucket: str, grants: Optional[UserGrants] = Depends(current_user_grants)) -> oc.OCICredentials:
+    """
+    Dependency das rotas /buckets/{bucket}/...: confere se o usuário pode acessar o bucket
+    e devolve as credenciais do ambiente dono dele.
+    """
+    info = await aoc.bucket_info(bucket)
+    if grants is not None and not grants.allows_bucket(bucket, info and info.get("compartment_id")):
+        raise HTTPException(status_code=403, detail=f"Sem permissão para o bucket '{bucket}'")
+    return oc.credentials_for_env(info["env"]) if info else oc.default_credentials()
+
 # ---------- Namespace ----------
 @app.get("/namespace")
-def get_ns():
-    ns = oc.get_namespace()
+async def get_ns():
+    ns = await aoc.get_namespace()
     if not ns:
         return JSONResponse({"error": "namespace not found"}, status_code=500)
     return {"namespace": ns}
@@ -152,9 +364,11 @@ async def api_create_bucket(
     request: Request,
     name: Optional[str] = Query(None, description="Nome do bucket (required)"),
     child: Optional[str] = Query(None, description="Child OCID ou nome (optional)"),
-    group: Optional[str] = Query(None, description="Label de grupo (ex: OCI-Administrators-cp-... ) (optional)")
+    group: Optional[str] = Query(None, description="Label de grupo (ex: OCI-Administrators-cp-... ) (optional)"),
+    grants: Optional[UserGrants] = Depends(current_user_grants),
+    authorization: Optional[str] = Header(None),
 ):
-    print("DEBUG RAW QUERY:", request.url)
+    log.debug("Criação de bucket - query: %s", request.url.query)
     # ler body/form também (prioridade query > form > json)
     try:
         form = await request.form()
@@ -179,158 +393,615 @@ async def api_create_bucket(
     # se o front enviou a label do grupo, extraímos o token cp-...
     if not child and group:
         child = extract_child_from_group_label(group)
-        print(f"DEBUG: extracted child from group '{group}' -> {child}")
+        log.debug("Compartment extraído do grupo '%s' -> %s", group, child)
 
     if not child:
         raise HTTPException(status_code=422, detail="Envie 'child' (OCID or name) ou 'group' (label)")
 
+    if grants is not None and not grants.allows_compartment(child):
+        raise HTTPException(status_code=403, detail=f"Sem permissão para criar buckets em '{child}'")
+
+    creds = compartment_credentials(child)
+
     # se já for OCID, usamos direto; senão resolvemos para OCID via oci_client
     if child.startswith("ocid1.compartment"):
         child_ocid = child
     else:
-        child_ocid = oc.resolve_compartment_ocid(child)
+        child_ocid = await aoc.resolve_compartment_ocid(child)
         if not child_ocid:
             raise HTTPException(status_code=404, detail=f"Compartment '{child}' não encontrado (resolve failed)")
 
-    print(f"DEBUG: creating bucket '{bucket_name}' in compartment {child_ocid}")
+    log.debug("Criando bucket '%s' no compartment %s (%s)", bucket_name, child_ocid, creds.env)
 
-    result = oc.create_bucket(bucket_name, child_ocid)
+    result = await aoc.create_bucket(bucket_name, child_ocid, creds=creds)
     if not result.get("ok"):
         # repassa erro da camada oc com status
         err = result.get("error") or result
         status_code = result.get("status_code", 400)
         raise HTTPException(status_code=status_code, detail=f"Erro criando bucket: {err}")
 
+    app_logger.log_create_bucket(_audit_user(authorization), bucket_name, result.get("compartment_id") or child_ocid)
     return {
         "created": True,
         "bucket": bucket_name,
         "compartment_ocid": result.get("compartment_id") or child_ocid
     }
 
+async def _compartments_from_user_groups(authorization: Optional[str]) -> List[str]:
+    """Compartments cp-* extraídos das labels dos grupos (Graph memberOf) do usuário autenticado."""
+    email = get_current_email_from_auth(authorization)
+    try:
+        member_of = await asyncio.to_thread(get_cached_member_of, email)
+    except resilience.CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar Graph: {e}")
+    names = (extract_child_from_group_label(item.get("displayName")) for item in member_of)
+    return sorted({n for n in names if n})
+
 @app.get("/buckets")
-def api_list_buckets(child: Optional[str] = Query(None, description="Child OCID ou nome (ex: cp-infra-ddw3-dev)"),
-                     group: Optional[str] = Query(None, description="Label de grupo (opcional)")):
+async def api_list_buckets(child: Optional[str] = Query(None, description="Child OCID ou nome (ex: cp-infra-ddw3-dev)"),
+                     group: Optional[str] = Query(None, description="Label de grupo (opcional)"),
+                     compartments: Optional[str] = Query(None, description="Vários compartments (nomes/OCIDs) separados por vírgula"),
+                     subtree: Optional[str] = Query(None, description="Compartment (nome/OCID) cujos descendentes também serão listados"),
+                     scope: Optional[str] = Query(None, pattern="^groups$", description="'groups' = todos os cp-* dos grupos do usuário"),
+                     authorization: Optional[str] = Header(None),
+                     grants: Optional[UserGrants] = Depends(current_user_grants)):
     # sanitize
     child = sanitize_input(child)
     group = sanitize_input(group)
+    compartments = sanitize_input(compartments)
+    subtree = sanitize_input(subtree)
+
+    # modos em lote: vários compartments consultados em paralelo e mesclados numa resposta
+    if compartments or subtree or scope:
+        targets = [c.strip() for c in (compartments or "").split(",") if c.strip()]
+        if scope == "groups":
+            targets.extend(await _compartments_from_user_groups(authorization))
+        if subtree:
+            subtree_ocids = await aoc.list_compartment_subtree(subtree, creds=compartment_credentials(subtree))
+            if subtree_ocids is None:
+                raise HTTPException(status_code=404, detail=f"Compartment '{subtree}' não encontrado")
+            targets.extend(subtree_ocids)
+        result = await aoc.list_buckets_in(targets)
+        return {"buckets": _allowed_buckets(result["buckets"], grants), "compartments": len(targets), "errors": result["errors"]}
 
     # se enviaram group, extrair token cp-...
     if not child and group:
         child = extract_child_from_group_label(group)
-        print(f"DEBUG: extracted child from group '{group}' -> {child}")
+        log.debug("Compartment extraído do grupo '%s' -> %s", group, child)
 
     if not child:
-        # se nenhum child, usa fallback do oc.list_buckets (COMPARTMENT_OCID ou TENANCY)
-        buckets = oc.list_buckets(compartment=None)
-        return {"buckets": buckets}
+        # se nenhum child, usa fallback do aoc.list_buckets (COMPARTMENT_OCID ou TENANCY)
+        buckets = await aoc.list_buckets(compartment=None)
+        if buckets is None:
+            raise HTTPException(status_code=502, detail="Erro ao listar buckets no Object Storage")
+        return {"buckets": _allowed_buckets(buckets, grants)}
+
+    creds = compartment_credentials(child)
 
     # resolve ocid se necessário
     if child.startswith("ocid1.compartment"):
         child_ocid = child
     else:
-        child_ocid = oc.resolve_compartment_ocid(child)
+        child_ocid = await aoc.resolve_compartment_ocid(child)
         if not child_ocid:
             return {"buckets": [], "warning": f"Compartment '{child}' não encontrado"}
 
-    buckets = oc.list_buckets(compartment=child_ocid) or []
-    return {"buckets": buckets}
+    buckets = await aoc.list_buckets(compartment=child_ocid, creds=creds)
+    if buckets is None:
+        raise HTTPException(status_code=502, detail=f"Erro ao listar buckets de '{child}' no Object Storage")
+    return {"buckets": _allowed_buckets(buckets, grants)}
+
+def _progress_stream(run):
+    """
+    Executa 'run(on_progress)' e devolve NDJSON: uma linha {"event": "progress", ...} a cada
+    lote de itens processados e uma linha final {"event": "done", ...} com o resultado.
+    """
+    async def _lines():
+        events = asyncio.Queue()
+
+        async def _job():
+            try:
+                result = await run(lambda p: events.put_nowait({"event": "progress", **p}))
+                events.put_nowait({"event": "done", **result})
+            except Exception as e:
+                events.put_nowait({"event": "error", "error": str(e)})
+            finally:
+                events.put_nowait(None)
+
+        task = asyncio.create_task(_job())
+        try:
+            while (event := await events.get()) is not None:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        finally:
+            task.cancel()
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
 
 @app.delete("/buckets/{bucket}")
-def api_delete_bucket(bucket: str):
-    ok = oc.delete_bucket(bucket)
-    return {"deleted": bool(ok), "bucket": bucket}
+async def api_delete_bucket(
+    bucket: str,
+    purge: bool = Query(False, description="Remove antes objetos, versões e multipart uploads em andamento"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson = progresso do purge em stream"),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Sem purge o bucket precisa estar vazio. Com purge=true ele é esvaziado em paralelo
+    (BULK_DELETE_CONCURRENCY) e deletado em seguida; falhas parciais vêm em 'purge'.
+    """
+    user = _audit_user(authorization)
+
+    async def _run(on_progress=None):
+        response = {"bucket": bucket}
+        if purge:
+            result = await aoc.purge_bucket(bucket, creds=creds, on_progress=on_progress)
+            app_logger.log_delete_objects(user, bucket, result["deleted"], purge=True)
+            response["purge"] = result
+            if not result["ok"]:
+                return {**response, "deleted": False}
+        ok = await aoc.delete_bucket(bucket, creds=creds)
+        if ok:
+            oc.BUCKET_CACHE.invalidate(bucket)
+            app_logger.log_delete_bucket(user, bucket)
+        return {**response, "deleted": bool(ok)}
+
+    if format == "ndjson":
+        return _progress_stream(_run)
+    return await _run()
 
 # ---------- Objetos ----------
 @app.get("/buckets/{bucket}/objects")
-def api_list_objects(bucket: str):
-    # Se seu oci_client.list_objects ainda só imprimir, caímos em [].
-    objects = oc.list_objects(bucket)
-    if objects is None:
-        objects = []
-    return {"bucket": bucket, "objects": objects}
+async def api_list_objects(
+    bucket: str,
+    prefix: Optional[str] = Query(None, description="Lista apenas objetos com este prefixo"),
+    start: Optional[str] = Query(None, description="Cursor: 'next_start' da página anterior"),
+    limit: int = Query(oc.LIST_OBJECTS_PAGE_SIZE, ge=1, le=oc.LIST_OBJECTS_PAGE_SIZE, description="Objetos por página"),
+    delimiter: Optional[str] = Query(None, description="Agrupa chaves em 'prefixes' (apenas '/')"),
+    fields: Optional[str] = Query(None, description="Campos extras, ex: name,size,md5,timeCreated,timeModified"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json = uma página + cursor; ndjson = todas as páginas em stream"),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+):
+    """
+    format=json (padrão): devolve uma página e 'next_start' (null na última); repita com ?start=<next_start>.
+    format=ndjson: percorre todas as páginas e envia um objeto JSON por linha, sem acumular a lista no servidor.
+    """
+    prefix = sanitize_input(prefix)
+    start = sanitize_input(start)
+    delimiter = sanitize_input(delimiter)
+    fields = sanitize_input(fields)
+
+    if format == "ndjson":
+        async def _lines():
+            try:
+                async for page in aoc.iter_object_pages(bucket, prefix, start, delimiter, fields, limit, creds=creds):
+                    for obj in page["objects"]:
+                        yield json.dumps(obj, ensure_ascii=False) + "\n"
+                    for p in page["prefixes"]:
+                        yield json.dumps({"prefix": p}, ensure_ascii=False) + "\n"
+            except aoc.ListObjectsError as e:
+                # o status 200 já foi enviado: a última linha diz que a listagem foi cortada e de onde retomar
+                yield json.dumps({"error": str(e), "next_start": e.next_start}, ensure_ascii=False) + "\n"
+        return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+    page = await aoc.list_objects_page(bucket, prefix, start, limit, delimiter, fields, creds=creds)
+    if page is None:
+        raise HTTPException(status_code=502, detail=f"Erro ao listar objetos de '{bucket}' na OCI")
+    return {
+        "bucket": bucket,
+        "objects": page["objects"],
+        "prefixes": page["prefixes"],
+        "next_start": page["nextStartWith"],
+    }
+
+# Headers do cliente repassados ao GetObject (leituras parciais e condicionais)
+_DOWNLOAD_REQUEST_HEADERS = ("range", "if-none-match", "if-modified-since", "if-match", "if-unmodified-since")
+# Headers da resposta da OCI devolvidos ao cliente
+_DOWNLOAD_RESPONSE_HEADERS = (
+    "content-type", "content-length", "content-range", "content-encoding", "content-disposition",
+    "content-md5", "accept-ranges", "etag", "last-modified", "cache-control",
+)
+
+async def _count_download(chunks):
+    async for chunk in chunks:
+        metrics.DOWNLOAD_BYTES.inc(amount=len(chunk))
+        yield chunk
+
+@app.get("/buckets/{bucket}/objects/{object_name:path}")
+async def api_get_object(bucket: str, object_name: str, request: Request,
+                         creds: oc.OCICredentials = Depends(bucket_credentials)):
+    """
+    Faz download do objeto em stream (bloco a bloco, sem carregar em memória).
+    Suporta Range (206), If-None-Match / If-Modified-Since (304) e If-Match (412).
+    """
+    passthrough = {h: request.headers[h] for h in _DOWNLOAD_REQUEST_HEADERS if h in request.headers}
+    upstream = await aoc.open_object(bucket, object_name, passthrough, creds=creds)
+    if upstream is None:
+        raise HTTPException(status_code=502, detail="Erro ao consultar o Object Storage")
+
+    headers = {h: upstream.headers[h] for h in _DOWNLOAD_RESPONSE_HEADERS if h in upstream.headers}
+    for h, v in upstream.headers.items():
+        if h.startswith("opc-meta-"):
+            headers[h] = v
+
+    if upstream.status_code in (200, 206):
+        return StreamingResponse(
+            _count_download(upstream.aiter_raw()),
+            status_code=upstream.status_code,
+            headers=headers,
+            background=BackgroundTask(upstream.aclose),
+        )
+
+    body = await upstream.aread()
+    await upstream.aclose()
+    if upstream.status_code in (304, 412, 416):
+        return Response(status_code=upstream.status_code, headers=headers)
+    if upstream.status_code == 404:
+        raise HTTPException(status_code=404, detail=f"Objeto '{object_name}' não encontrado no bucket '{bucket}'")
+    raise HTTPException(status_code=upstream.status_code, detail=body.decode("utf-8", "replace"))
 
 @app.delete("/buckets/{bucket}/objects/{object_name:path}")
-def api_delete_object(bucket: str, object_name: str):
-    ok = oc.delete_object(bucket, object_name)
+async def api_delete_object(bucket: str, object_name: str, creds: oc.OCICredentials = Depends(bucket_credentials),
+                            authorization: Optional[str] = Header(None)):
+    ok = await aoc.delete_object(bucket, object_name, creds=creds)
+    if ok:
+        app_logger.log_delete_object(_audit_user(authorization), bucket, object_name)
     return {"deleted": bool(ok), "bucket": bucket, "object": object_name}
 
-@app.post("/buckets/{bucket}/upload")
+@app.post("/buckets/{bucket}/objects/delete")
+async def api_delete_objects(
+    bucket: str,
+    payload: dict = Body(..., examples=[{"objects": ["a.txt", "logs/b.txt"]}, {"prefix": "logs/", "versions": True}]),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson = progresso em stream"),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Exclusão em lote, com BULK_DELETE_CONCURRENCY deleções em paralelo.
+    Recebe JSON: {"objects": ["nome", ...]} ou {"prefix": "logs/"}; "versions": true remove
+    também as versões antigas. Resposta: contadores + 'errors' com as falhas individuais.
+    """
+    names = payload.get("objects")
+    prefix = sanitize_input(payload.get("prefix"))
+    versions = bool(payload.get("versions", False))
+    if names is not None:
+        if not isinstance(names, list) or not all(isinstance(n, str) and n for n in names):
+            raise HTTPException(status_code=422, detail="'objects' deve ser uma lista de nomes")
+    elif not prefix:
+        # bucket inteiro é com DELETE /buckets/{bucket}?purge=true
+        raise HTTPException(status_code=422, detail="Envie 'objects' (lista de nomes) ou 'prefix' (não vazio)")
+    user = _audit_user(authorization)
+
+    async def _run(on_progress=None):
+        result = await aoc.delete_objects(bucket, names=names, prefix=prefix, versions=versions,
+                                          creds=creds, on_progress=on_progress)
+        if result["deleted"]:
+            app_logger.log_delete_objects(user, bucket, result["deleted"], prefix=prefix)
+        return result
+
+    if format == "ndjson":
+        return _progress_stream(_run)
+    return await _run()
+
+_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "object_name": {"type": "string"},
+                    },
+                }
+            },
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "content_b64": {"type": "string"},
+                        "object_name": {"type": "string"},
+                    },
+                }
+            },
+            "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+        }
+    }
+}
+
+async def _upload_in_flight():
+    metrics.UPLOADS_IN_FLIGHT.inc()
+    try:
+        yield
+    finally:
+        metrics.UPLOADS_IN_FLIGHT.dec()
+
+@app.post("/buckets/{bucket}/upload", openapi_extra=_UPLOAD_OPENAPI)
 async def api_upload(
     bucket: str,
     request: Request,
-    # multipart "padrão"
-    file: UploadFile = File(None),
-    object_name_form: Optional[str] = Form(None),
-
-    # alternativas
     object_name_q: Optional[str] = Query(None, alias="object_name"),
     x_object_name: Optional[str] = Header(None, convert_underscores=False, alias="X-Object-Name"),
-    json_body: Optional[dict] = Body(None),
+    skip_unchanged: bool = Query(True, description="Não reenvia se o objeto já tem o mesmo conteúdo (HEAD + hash)"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    content_md5: Optional[str] = Header(None, alias="Content-MD5"),
+    x_content_sha256: Optional[str] = Header(None, alias="X-Content-SHA256"),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+    authorization: Optional[str] = Header(None),
+    _in_flight: None = Depends(_upload_in_flight),
 ):
     """
     Aceita:
       1) multipart/form-data: file=<arquivo>, [object_name=<nome>]
       2) JSON: {"content_b64": "<base64>", "object_name": "<nome>"}
       3) Corpo binário: Body (binary) e object_name via query (?object_name=) ou header X-Object-Name
+
+    O corpo é lido pela própria rota (sem parâmetros Body/Form/File), para que o
+    FastAPI não o carregue inteiro em memória antes: os bytes seguem para a OCI em blocos.
+
+    Deduplicação: se o objeto já existe com o mesmo conteúdo o envio é pulado
+    ("written": false, "skipped": true). Form-data e JSON são hasheados aqui; no corpo
+    binário informe Content-MD5 (base64) ou X-Content-SHA256 (hex) para aproveitar.
+    If-None-Match: * (ou o ETag atual) pula o envio se o objeto existir (ou não mudou).
     """
     # Nome do objeto pode vir de vários lugares
-    object_name = object_name_q or x_object_name or object_name_form
+    object_name = object_name_q or x_object_name
+    content_type = (request.headers.get("content-type") or "").lower()
+    source = None
+    mode = "raw"
+
+    # (1) multipart/form-data — o Starlette faz spool do arquivo (disco acima de 1 MB)
+    if content_type.startswith("multipart/form-data"):
+        mode = "form"
+        form = await request.form()
+        for k, v in form.items():
+            if isinstance(v, StarletteUploadFile):
+                object_name = object_name or form.get("object_name") or v.filename or "upload.bin"
+                source = await UploadSource.from_upload_file(v)
+                break
 
-    # (1) multipart/form-data
-    if file is None:
-        # Se o campo tiver outro nome, pega o primeiro UploadFile do form
+    # (2) JSON com base64
+    elif content_type.startswith("application/json"):
+        mode = "json"
         try:
-            form = await request.form()
-            for k, v in form.items():
-                if isinstance(v, UploadFile):
-                    file = v
-                    if not object_name:
-                        object_name = form.get("object_name") or v.filename
-                    break
+            json_body = await request.json()
         except Exception:
-            pass
-
-    if file is not None:
-        data = await file.read()
-        if not object_name:
-            object_name = file.filename or "upload.bin"
-        with tempfile.NamedTemporaryFile(delete=True) as tmp:
-            tmp.write(data)
-            tmp.flush()
-            ok = oc.upload_file(bucket, tmp.name, object_name)
-        return {"uploaded": bool(ok), "bucket": bucket, "object": object_name}
-
-    # (2) JSON com base64
-    if json_body:
-        b64 = json_body.get("content_b64")
+            json_body = None
+        b64 = json_body.get("content_b64") if isinstance(json_body, dict) else None
         if b64:
             try:
                 data = base64.b64decode(b64, validate=True)
             except Exception:
                 raise HTTPException(status_code=422, detail="content_b64 inválido (base64 esperado)")
-            if not object_name:
-                object_name = json_body.get("object_name")
+            object_name = object_name or json_body.get("object_name")
             if not object_name:
                 raise HTTPException(status_code=422, detail="Defina 'object_name' no JSON ou via ?object_name=/X-Object-Name")
-            with tempfile.NamedTemporaryFile(delete=True) as tmp:
-                tmp.write(data)
-                tmp.flush()
-                ok = oc.upload_file(bucket, tmp.name, object_name)
-            return {"uploaded": bool(ok), "bucket": bucket, "object": object_name}
-
-    # (3) Corpo binário bruto
-    raw = await request.body()
-    if raw:
+            source = UploadSource.from_bytes(data)
+
+    # (3) Corpo binário bruto — repassado em stream
+    else:
         if not object_name:
             raise HTTPException(status_code=422, detail="Envie 'object_name' via query (?object_name=) ou header X-Object-Name")
-        with tempfile.NamedTemporaryFile(delete=True) as tmp:
-            tmp.write(raw)
-            tmp.flush()
-            ok = oc.upload_file(bucket, tmp.name, object_name)
-        return {"uploaded": bool(ok), "bucket": bucket, "object": object_name}
+        source = await UploadSource.from_request(request)
+        if source is not None and not source.seekable:
+            # stream direto: só dá para comparar com os hashes declarados pelo cliente
+            source.md5 = content_md5
+            source.sha256 = x_content_sha256.lower() if x_content_sha256 else None
+
+    if source is None:
+        raise HTTPException(
+            status_code=422,
+            detail="Envie o arquivo como form-data (file), JSON (content_b64 + object_name) ou corpo binário (+ object_name por query/header)."
+        )
+
+    # objetos grandes vão em partes paralelas (MULTIPART_THRESHOLD)
+    multipart = source.size >= oc.MULTIPART_THRESHOLD
+    skipped = None
+    try:
+        if skip_unchanged or if_none_match:
+            skipped = await aoc.find_unchanged(bucket, object_name, source, if_none_match, creds=creds)
+        if skipped:
+            result = {"ok": True, "size": source.size}
+        elif multipart:
+            result = await aoc.upload_stream_multipart(bucket, object_name, source, creds=creds)
+        else:
+            result = await aoc.upload_stream(bucket, object_name, source, creds=creds)
+    finally:
+        await source.aclose()
+    if not result.get("ok"):
+        # falha da OCI não é "uploaded: false" com 200: repassa o status (502 sem resposta)
+        raise HTTPException(status_code=result.get("status_code") or 502,
+                            detail=f"Erro no upload de '{object_name}': {result.get('error')}")
+    written = not skipped
+    if written:
+        aoc.DEDUP_STATS.record_written(result.get("size"))
+        metrics.UPLOAD_BYTES.inc(mode, amount=result.get("size") or 0)
+        app_logger.log_upload_object(_audit_user(authorization), bucket, object_name, result.get("size"))
+    return {
+        "uploaded": True,
+        "written": written,
+        "skipped": bool(skipped),
+        "skip_reason": skipped,
+        "bucket": bucket,
+        "object": object_name,
+        "size": result.get("size"),
+        "multipart": multipart and not skipped,
+    }
+
+# ---------- Cópia / renomeação ----------
+@app.post("/buckets/{bucket}/copy", status_code=202)
+async def api_copy_object(
+    bucket: str,
+    payload: dict = Body(..., examples=[{"object": "a.txt", "destination_bucket": "outro-bucket",
+                                         "destination_object": "b.txt", "overwrite": False}]),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+    grants: Optional[UserGrants] = Depends(current_user_grants),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Copia um objeto no próprio Object Storage (mesma região; o destino pode ser outro
+    bucket/compartment), sem passar os bytes pela API. A cópia roda em background na OCI:
+    acompanhe em GET /work-requests/{work_request_id}. Sem overwrite, falha se o destino existir.
+    """
+    object_name = sanitize_input(payload.get("object"))
+    destination_bucket = sanitize_input(payload.get("destination_bucket")) or bucket
+    destination_object = sanitize_input(payload.get("destination_object")) or object_name
+    if not object_name:
+        raise HTTPException(status_code=422, detail="Envie 'object'")
+    if destination_bucket == bucket and destination_object == object_name:
+        raise HTTPException(status_code=422, detail="Origem e destino são o mesmo objeto")
+    # o usuário precisa de acesso também ao bucket de destino
+    dest_creds = await bucket_credentials(destination_bucket, grants)
+    if dest_creds.env != creds.env:
+        # mesma tenancy e namespace, mas o CopyObject é assinado pelo usuário da API do ambiente de
+        # origem, e as policies de IAM de cada usuário só cobrem os compartments do próprio ambiente
+        raise HTTPException(status_code=422,
+                            detail=(f"Cópia entre ambientes não suportada ({creds.env} -> {dest_creds.env}): "
+                                    f"o usuário de {creds.env} não tem permissão de escrita nos "
+                                    f"compartments de {dest_creds.env}"))
+
+    result = await aoc.copy_object(bucket, object_name, destination_bucket, destination_object,
+                                   overwrite=bool(payload.get("overwrite")), creds=creds)
+    if not result["ok"]:
+        raise HTTPException(status_code=result.get("status_code", 502), detail=result.get("error"))
+    work_request_id = result["work_request_id"]
+    app_logger.log_copy_object(_audit_user(authorization), bucket, object_name, destination_bucket,
+                               destination_object, work_request_id)
+    return {
+        "bucket": bucket,
+        "object": object_name,
+        "destination_bucket": destination_bucket,
+        "destination_object": destination_object,
+        "work_request_id": work_request_id,
+        "status_url": f"/work-requests/{work_request_id}",
+    }
 
-    raise HTTPException(
-        status_code=422,
-        detail="Envie o arquivo como form-data (file), JSON (content_b64 + object_name) ou corpo binário (+ object_name por query/header)."
-    )
+@app.post("/buckets/{bucket}/rename")
+async def api_rename_object(
+    bucket: str,
+    payload: dict = Body(..., examples=[{"object": "a.txt", "new_name": "arquivo/a.txt", "overwrite": False}]),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+    authorization: Optional[str] = Header(None),
+):
+    """Renomeia um objeto dentro do bucket (operação de metadados, síncrona). Sem overwrite, falha se 'new_name' existir."""
+    object_name = sanitize_input(payload.get("object"))
+    new_name = sanitize_input(payload.get("new_name"))
+    if not object_name or not new_name:
+        raise HTTPException(status_code=422, detail="Envie 'object' e 'new_name'")
+    result = await aoc.rename_object(bucket, object_name, new_name, overwrite=bool(payload.get("overwrite")),
+                                     creds=creds)
+    if not result["ok"]:
+        raise HTTPException(status_code=result.get("status_code", 502), detail=result.get("error"))
+    app_logger.log_rename_object(_audit_user(authorization), bucket, object_name, new_name)
+    return {"renamed": True, "bucket": bucket, "object": object_name, "new_name": new_name}
+
+@app.get("/work-requests/{work_request_id}")
+async def api_work_request(
+    work_request_id: str,
+    wait: float = Query(0, ge=0, le=60, description="Aguarda até N segundos por um status final"),
+    grants: Optional[UserGrants] = Depends(current_user_grants),
+):
+    """
+    Status de uma cópia (ACCEPTED, IN_PROGRESS, COMPLETED, FAILED, ...). O usuário precisa de
+    acesso a todos os buckets do work request.
+    Com ?wait=N a API consulta a OCI até a cópia terminar ou N segundos passarem.
+    """
+    info = await aoc.work_request_info(work_request_id)
+    if not info or not info.get("buckets"):
+        raise HTTPException(status_code=404, detail=f"Work request '{work_request_id}' não encontrado")
+    for bucket in info["buckets"]:
+        await bucket_credentials(bucket, grants)
+
+    work_request = await aoc.wait_work_request(work_request_id, timeout=wait,
+                                               creds=oc.credentials_for_env(info["env"]))
+    if work_request is None:
+        raise HTTPException(status_code=502, detail="Erro ao consultar o work request na OCI")
+    return {
+        "id": work_request_id,
+        "status": work_request.get("status"),
+        "percent_complete": work_request.get("percentComplete"),
+        "operation": work_request.get("operationType"),
+        "time_accepted": work_request.get("timeAccepted"),
+        "time_finished": work_request.get("timeFinished"),
+        "errors": [e.get("message") for e in work_request.get("errors", [])],
+        **{k: v for k, v in info.items() if k != "env"},
+    }
 
+# ---------- URLs pré-autenticadas (PAR) ----------
+@app.post("/buckets/{bucket}/par")
+async def api_create_par(
+    bucket: str,
+    payload: dict = Body(..., examples=[{"object": "dist/app.tar.gz", "access": "read", "expires_in": 900},
+                                        {"prefix": "uploads/", "access": "write"}]),
+    creds: oc.OCICredentials = Depends(bucket_credentials),
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Emite uma URL pré-autenticada da OCI para o cliente transferir objetos grandes direto
+    com o Object Storage (os bytes não passam pela API). A API só autoriza e audita.
+    Recebe JSON: {"object": "<nome>"} ou {"prefix": "<prefixo>"}, "access": read|write|readwrite,
+    "expires_in": segundos (padrão PAR_DEFAULT_EXPIRES_IN). Pedidos repetidos reaproveitam
+    um PAR recente ("cached": true). Para prefixo, acrescente o nome do objeto à 'url'.
+    """
+    object_name = sanitize_input(payload.get("object"))
+    prefix = sanitize_input(payload.get("prefix"))
+    if bool(object_name) == (prefix is not None):
+        raise HTTPException(status_code=422, detail="Envie 'object' ou 'prefix' (apenas um)")
+    access = (payload.get("access") or "read").lower()
+    try:
+        expires_in = int(payload.get("expires_in") or aoc.PAR_DEFAULT_EXPIRES_IN)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="'expires_in' deve ser um número de segundos")
+    if not 60 <= expires_in <= aoc.PAR_MAX_EXPIRES_IN:
+        raise HTTPException(status_code=422, detail=f"'expires_in' deve estar entre 60 e {aoc.PAR_MAX_EXPIRES_IN}")
+
+    result = await aoc.create_par(bucket, object_name=object_name or None, prefix=prefix, access=access,
+                                  expires_in=expires_in, creds=creds)
+    if not result["ok"]:
+        raise HTTPException(status_code=result.get("status_code", 502), detail=result.get("error"))
+    par = result["par"]
+    app_logger.log_create_par(_audit_user(authorization), bucket, object_name or prefix, par["access_type"],
+                              par["id"], par["expires_at"], cached=result["cached"])
+    return {"bucket": bucket, **par, "cached": result["cached"]}
+
+@app.delete("/buckets/{bucket}/par/{par_id}")
+async def api_revoke_par(bucket: str, par_id: str, creds: oc.OCICredentials = Depends(bucket_credentials),
+                         authorization: Optional[str] = Header(None)):
+    result = await aoc.revoke_par(bucket, par_id, creds=creds)
+    if result.get("status_code") == 404:
+        raise HTTPException(status_code=404, detail=f"PAR '{par_id}' não encontrado no bucket '{bucket}'")
+    if not result["ok"]:
+        # o link continua valendo até expirar: quem chamou precisa ver a falha no status
+        raise HTTPException(status_code=result.get("status_code") or 502,
+                            detail=f"Erro ao revogar o PAR '{par_id}': {result.get('error')}")
+    app_logger.log_revoke_par(_audit_user(authorization), bucket, par_id)
+    return {"revoked": True, "bucket": bucket, "id": par_id}
+
+# ---------- Auditoria ----------
+# Emails (separados por vírgula) que podem consultar eventos de qualquer usuário em GET /audit
+AUDIT_ADMINS = {e.strip().lower() for e in os.getenv("AUDIT_ADMINS", "").split(",") if e.strip()}
+
+@app.get("/audit")
+def api_audit(
+    user: Optional[str] = Query(None, description="Email do usuário"),
+    action: Optional[str] = Query(None, description="Ex: create_bucket, delete_object"),
+    bucket: Optional[str] = Query(None),
+    since: Optional[str] = Query(None, description="ISO 8601 UTC, inclusivo (ex: 2024-05-01T00:00:00Z)"),
+    until: Optional[str] = Query(None, description="ISO 8601 UTC, exclusivo"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    current_email: str = Depends(get_current_email_from_auth),
+):
+    """
+    Consulta o log de auditoria pelo índice (audit_index), mais recentes primeiro.
+    Quem não está em AUDIT_ADMINS só enxerga os próprios eventos.
+    """
+    if current_email.lower() not in AUDIT_ADMINS:
+        if user and user.lower() != current_email.lower():
+            raise HTTPException(status_code=403, detail="Sem permissão para consultar eventos de outros usuários")
+        user = current_email
+    try:
+        return AUDIT_INDEX.query(user=user, action=action, bucket=bucket, since=since, until=until,
+                                 limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
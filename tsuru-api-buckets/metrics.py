@@ -0,0 +1,326 @@
+# metrics.py
+"""
+Métricas da API no formato texto do Prometheus (GET /metrics), sem dependências externas.
+
+- por rota (MetricsMiddleware): contagem por método/rota/status e histograma de latência,
+  com a rota em template (/buckets/{bucket}/objects), nunca o caminho real;
+- por chamada externa (http_pool): histograma de latência e contagem por status para cada
+  operação da OCI (Object Storage / Identity), do Graph e do token do Azure AD;
+- bytes enviados/baixados, uploads em andamento e os caches/filas já existentes
+  (coletados na hora do scrape a partir dos stats() de cada um).
+
+Cada observação é um bisect e um incremento sob lock: barato o bastante para ficar ligado
+em produção. METRICS_ENABLED=false desliga a coleta (e o /metrics responde vazio).
+"""
+import os
+import re
+import time
+import bisect
+import threading
+from typing import Callable
+from urllib.parse import urlsplit
+
+import log_setup
+
+log = log_setup.get_logger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Limites (s) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._values.items())
+        lines = self._header()
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {round(total, 6)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list]):
+        """'collector' devolve [(nome, tipo, ajuda, [(labels dict, valor), ...]), ...] na hora do scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        if not METRICS_ENABLED:
+            return ""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                log.warning("⚠️ Coletor de métricas falhou: %s", e)
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ====== MÉTRICAS ======
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "tsuru_http_requests_total", "Requisições atendidas pela API", ("method", "route", "status")))
+HTTP_LATENCY = REGISTRY.register(Histogram(
+    "tsuru_http_request_duration_seconds", "Latência das rotas da API (até o fim do corpo)", ("method", "route")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "tsuru_http_requests_in_flight", "Requisições em andamento na API"))
+
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "tsuru_upstream_requests_total", "Chamadas a serviços externos por operação e status ('error' = sem resposta)",
+    ("upstream", "operation", "status")))
+UPSTREAM_LATENCY = REGISTRY.register(Histogram(
+    "tsuru_upstream_request_duration_seconds", "Latência das chamadas externas (até os headers da resposta)",
+    ("upstream", "operation")))
+
+UPLOAD_BYTES = REGISTRY.register(Counter(
+    "tsuru_upload_bytes_total", "Bytes gravados no Object Storage pelos uploads da API", ("mode",)))
+DOWNLOAD_BYTES = REGISTRY.register(Counter(
+    "tsuru_download_bytes_total", "Bytes entregues pelos downloads da API"))
+UPLOADS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "tsuru_uploads_in_flight", "Uploads em andamento na API"))
+
+
+# ====== CLASSIFICAÇÃO DAS CHAMADAS EXTERNAS ======
+# (regex do path, {método: operação}) avaliados em ordem; o primeiro que casar vale
+_OBJECT_STORAGE_ROUTES = [
+    (r"/n/?", {"GET": "get_namespace"}),
+    (r"/n/[^/]+/b/?", {"GET": "list_buckets", "POST": "create_bucket"}),
+    (r"/n/[^/]+/b/[^/]+/?", {"GET": "get_bucket", "HEAD": "head_bucket", "DELETE": "delete_bucket"}),
+    (r"/n/[^/]+/b/[^/]+/o/?", {"GET": "list_objects"}),
+    (r"/n/[^/]+/b/[^/]+/o/.+", {"GET": "get_object", "HEAD": "head_object", "PUT": "put_object",
+                                "DELETE": "delete_object"}),
+    (r"/n/[^/]+/b/[^/]+/objectversions/?", {"GET": "list_object_versions"}),
+    (r"/n/[^/]+/b/[^/]+/u/?", {"GET": "list_multipart_uploads", "POST": "create_multipart_upload"}),
+    (r"/n/[^/]+/b/[^/]+/u/.+", {"PUT": "upload_part", "GET": "list_parts", "POST": "commit_multipart_upload",
+                                "DELETE": "abort_multipart_upload"}),
+    (r"/n/[^/]+/b/[^/]+/p/?", {"GET": "list_pars", "POST": "create_par"}),
+    (r"/n/[^/]+/b/[^/]+/p/[^/]+", {"GET": "get_par", "DELETE": "delete_par"}),
+    (r"/n/[^/]+/b/[^/]+/actions/copyObject", {"POST": "copy_object"}),
+    (r"/n/[^/]+/b/[^/]+/actions/renameObject", {"POST": "rename_object"}),
+    (r"/workRequests/[^/]+(/errors)?", {"GET": "get_work_request"}),
+    (r"/p/.+", {"GET": "par_get_object", "HEAD": "par_head_object", "PUT": "par_put_object"}),
+]
+_OBJECT_STORAGE_ROUTES = [(re.compile(p), ops) for p, ops in _OBJECT_STORAGE_ROUTES]
+_IDENTITY = re.compile(r"/\d{8}/compartments/?")
+_GRAPH_MEMBER_OF = re.compile(r"/v1\.0/users/[^/]+/memberOf/?")
+
+
+def classify_upstream(method: str, url: str) -> tuple:
+    """(upstream, operation) de uma chamada externa, com cardinalidade fixa (sem nomes de bucket/objeto)."""
+    parts = urlsplit(url)
+    host, path, method = parts.netloc.lower(), parts.path, method.upper()
+    if path.endswith("/oauth2/v2.0/token"):
+        return "azure_ad", "token"
+    if "login.microsoftonline.com" in host:
+        return "azure_ad", "discovery"
+    if path.startswith("/v1.0/"):
+        if _GRAPH_MEMBER_OF.fullmatch(path):
+            return "graph", "member_of"
+        return "graph", "batch" if path == "/v1.0/$batch" else "other"
+    if _IDENTITY.fullmatch(path):
+        return "identity", "list_compartments"
+    for pattern, operations in _OBJECT_STORAGE_ROUTES:
+        if pattern.fullmatch(path):
+            return "object_storage", operations.get(method, method.lower())
+    return "other", method.lower()
+
+
+def observe_upstream(upstream: str, operation: str, status, seconds: float):
+    """Registra uma tentativa de chamada externa (já classificada por classify_upstream)."""
+    if not METRICS_ENABLED:
+        return
+    UPSTREAM_REQUESTS.inc(upstream, operation, str(status))
+    UPSTREAM_LATENCY.observe(seconds, upstream, operation)
+
+
+# ====== MIDDLEWARE DAS ROTAS ======
+class MetricsMiddleware:
+    """
+    Middleware ASGI (sem BaseHTTPMiddleware, que envolve cada resposta numa task extra).
+    A latência vai até a última parte do corpo, então inclui o stream de downloads e ndjson.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._endpoint_paths = None
+
+    def _route(self, scope) -> str:
+        route = scope.get("route")
+        if route is not None and getattr(route, "path", None):
+            return route.path
+        # Starlette antigo não expõe scope["route"]: mapeia pelo endpoint resolvido
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._endpoint_paths is None:
+            app = scope.get("app")
+            self._endpoint_paths = {getattr(r, "endpoint", None): r.path for r in getattr(app, "routes", [])}
+        return self._endpoint_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        HTTP_IN_FLIGHT.inc()
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = self._route(scope)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], route)
+
+
+# ====== COLETORES ======
+def cache_collector(caches: dict) -> Callable[[], list]:
+    """Expõe os stats() de TTLCache (nome -> cache) como famílias tsuru_cache_*."""
+
+    def _collect() -> list:
+        stats = {name: cache.stats() for name, cache in caches.items()}
+        families = [
+            ("tsuru_cache_hits_total", "counter", "Acertos do cache (frescos, negativos e stale)",
+             [({"cache": n}, s["hits"] + s["negative_hits"] + s["stale_hits"]) for n, s in stats.items()]),
+            ("tsuru_cache_misses_total", "counter", "Faltas do cache",
+             [({"cache": n}, s["misses"]) for n, s in stats.items()]),
+            ("tsuru_cache_hit_ratio", "gauge", "Fração de consultas atendidas pelo cache",
+             [({"cache": n}, s["hit_ratio"]) for n, s in stats.items()]),
+            ("tsuru_cache_entries", "gauge", "Entradas no cache",
+             [({"cache": n}, s["size"]) for n, s in stats.items()]),
+            ("tsuru_cache_evictions_total", "counter", "Entradas removidas por tamanho máximo",
+             [({"cache": n}, s["evictions"]) for n, s in stats.items()]),
+        ]
+        return families
+
+    return _collect
+
+
+def stats_collector(prefix: str, documentation: str, source: Callable[[], dict],
+                    counters: tuple = (), gauges: tuple = ()) -> Callable[[], list]:
+    """Transforma chaves numéricas de um stats() em métricas <prefix>_<chave>."""
+
+    def _collect() -> list:
+        stats = source()
+        families = [(f"{prefix}_{key}_total", "counter", f"{documentation}: {key}", [({}, stats.get(key))])
+                    for key in counters]
+        families += [(f"{prefix}_{key}", "gauge", f"{documentation}: {key}", [({}, stats.get(key))])
+                     for key in gauges]
+        return families
+
+    return _collect
+
+
+def render() -> str:
+    return REGISTRY.render()
+
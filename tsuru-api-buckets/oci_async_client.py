@@ -0,0 +1,1323 @@
+# oci_async_client.py
+"""
+Versão assíncrona (httpx) da superfície do oci_client, usada pelas rotas FastAPI.
+
+Reaproveita a configuração e o assinador (oc.SIGNER) do oci_client; apenas o I/O
+HTTP muda, passando pelo cliente assíncrono compartilhado de http_pool para não
+bloquear o event loop do worker. Cada chamada recebe as OCICredentials do seu
+ambiente ('creds'), então requisições DEV e PRD rodam em paralelo no mesmo processo.
+"""
+import os
+import re
+import json
+import base64
+import asyncio
+import hashlib
+import mimetypes
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import quote, unquote, urlsplit
+
+import httpx
+
+import oci_client as oc
+import log_setup
+from http_pool import BYPASS_CIRCUIT, get_async_client
+from ttl_cache import NOT_FOUND, TTLCache
+
+log = log_setup.get_logger(__name__)
+
+# Compartments consultados ao mesmo tempo na listagem de buckets em lote
+BUCKET_FANOUT_CONCURRENCY = int(os.getenv("BUCKET_FANOUT_CONCURRENCY", "8"))
+
+
+async def _request(method: str, request_target: str, endpoint: str = None,
+                   body: Optional[bytes] = None, content_type: str = "application/json",
+                   creds: Optional[oc.OCICredentials] = None, bypass_circuit: bool = False) -> httpx.Response:
+    endpoint = endpoint or oc.OBJECT_STORAGE_ENDPOINT
+    headers = oc._signed_headers(method, request_target, host=urlsplit(endpoint).netloc, body=body,
+                                 content_type=content_type, creds=creds)
+    return await get_async_client().request(
+        method.upper(), f"{endpoint}{request_target}", headers=headers, content=body,
+        extensions={BYPASS_CIRCUIT: True} if bypass_circuit else None,
+    )
+
+
+# ====== NAMESPACE ======
+async def get_namespace(creds: Optional[oc.OCICredentials] = None):
+    if oc.NAMESPACE:
+        return oc.NAMESPACE
+
+    log.debug("🔍 Buscando namespace...")
+
+    try:
+        response = await _request("get", "/n/", creds=creds)
+        response.raise_for_status()
+        oc.NAMESPACE = response.text.strip('"')  # remove aspas da resposta
+        log.debug("✅ Namespace encontrado: %s", oc.NAMESPACE)
+        return oc.NAMESPACE
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao obter namespace: %s", e)
+        return None
+
+
+# ====== CREDENCIAIS POR BUCKET ======
+async def bucket_info(bucket_name: str) -> Optional[dict]:
+    """
+    {"env": "DEV"|"PRD", "compartment_id": "<ocid>"} do bucket, ou None se nenhum ambiente
+    o enxergar. Rotas que só recebem o nome do bucket não sabem o compartment: ele é
+    descoberto uma vez (GetBucket com as credenciais de cada ambiente) e fica em cache.
+    """
+    return await oc.BUCKET_CACHE.aget_or_load(bucket_name, lambda: _probe_bucket(bucket_name))
+
+
+async def credentials_for_bucket(bucket_name: str) -> oc.OCICredentials:
+    """Credenciais do ambiente dono do bucket (ou as do ambiente padrão, se desconhecido)."""
+    info = await bucket_info(bucket_name)
+    return oc.credentials_for_env(info["env"]) if info else oc.default_credentials()
+
+
+async def _probe_bucket(bucket_name: str):
+    """Retorna o bucket_info, NOT_FOUND (nenhum ambiente enxerga o bucket) ou None (erro)."""
+    namespace = await get_namespace()
+    if not namespace:
+        return None
+
+    async def _get(creds):
+        try:
+            return await _request("get", f"/n/{namespace}/b/{bucket_name}", creds=creds)
+        except (httpx.HTTPError, RuntimeError) as e:
+            log.warning("⚠️ GetBucket '%s' (%s) falhou: %s", bucket_name, creds.env, e)
+            return None
+
+    creds_list = list(oc.CREDENTIALS.values())
+    responses = await asyncio.gather(*(_get(c) for c in creds_list))
+    for creds, resp in zip(creds_list, responses):
+        if resp is not None and resp.status_code == 200:
+            return {"env": creds.env, "compartment_id": resp.json().get("compartmentId")}
+    if all(resp is not None and resp.status_code in (401, 403, 404) for resp in responses):
+        return NOT_FOUND
+    return None
+
+
+def _remember_buckets(buckets: list, creds: oc.OCICredentials):
+    for b in buckets:
+        if b.get("name"):
+            oc.BUCKET_CACHE.set(b["name"], {"env": creds.env, "compartment_id": b.get("compartmentId")})
+
+
+# ====== COMPARTMENTS ======
+async def resolve_compartment_ocid(name: str) -> Optional[str]:
+    if not name:
+        return None
+
+    creds = oc.credentials_for_compartment(name)
+    if not oc.check_credentials(creds):
+        return None
+
+    ocid = await oc.COMPARTMENT_CACHE.aget_or_load(name, lambda: _lookup_compartment_ocid(name, creds))
+    if ocid:
+        oc.COMPARTMENT_ENVS[ocid] = creds.env
+    return ocid
+
+
+async def _lookup_compartment_ocid(name: str, creds: oc.OCICredentials):
+    """Consulta o Identity. Retorna o OCID, NOT_FOUND (nome inexistente) ou None (erro)."""
+    request_target = (
+        f"/20160918/compartments?"
+        f"compartmentId={oc.TENANCY_OCID}&compartmentIdInSubtree=true&name={quote(name)}"
+    )
+
+    try:
+        resp = await _request("get", request_target, endpoint=oc.IDENTITY_ENDPOINT, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro HTTP ao buscar compartment '%s': %s", name, e)
+        return None
+    if not resp.is_success:
+        log.error("❌ Erro ao buscar compartment '%s': %s %s", name, resp.status_code, resp.text)
+        return None
+
+    payload = resp.json()
+    compartments = payload if isinstance(payload, list) else payload.get("data", [])
+    if not compartments:
+        log.warning("⚠️ Compartment '%s' não encontrado na tenancy.", name)
+        return NOT_FOUND
+
+    ocid = compartments[0]["id"]
+    log.debug("📁 Compartment '%s' -> %s", name, ocid)
+    return ocid
+
+
+async def preload_compartments() -> int:
+    """
+    Carrega no cache todos os compartments ativos da tenancy, consultando com as
+    credenciais de cada ambiente (em paralelo) os nomes que pertencem a ele (sufixo -dev / -prd).
+    Retorna quantos nomes foram carregados.
+    """
+
+    async def _preload(creds):
+        loaded = 0
+        page = None
+        while True:
+            request_target = (
+                f"/20160918/compartments?compartmentId={oc.TENANCY_OCID}"
+                f"&compartmentIdInSubtree=true&accessLevel=ANY&lifecycleState=ACTIVE&limit={oc.LIST_PAGE_LIMIT}"
+            )
+            if page:
+                request_target += f"&page={quote(page, safe='')}"
+            try:
+                resp = await _request("get", request_target, endpoint=oc.IDENTITY_ENDPOINT, creds=creds)
+            except (httpx.HTTPError, RuntimeError) as e:
+                log.warning("⚠️ Preload de compartments (%s) falhou: %s", creds.env, e)
+                return loaded
+            if not resp.is_success:
+                log.warning("⚠️ Preload de compartments (%s) falhou: %s %s", creds.env, resp.status_code, resp.text)
+                return loaded
+            payload = resp.json()
+            for comp in payload if isinstance(payload, list) else payload.get("data", []):
+                try:
+                    comp_env = oc.resolve_environment_from_compartment_name(comp.get("name", ""))
+                except ValueError:
+                    continue
+                if comp_env == creds.env:
+                    oc.COMPARTMENT_CACHE.set(comp["name"], comp["id"])
+                    oc.COMPARTMENT_ENVS[comp["id"]] = creds.env
+                    loaded += 1
+            page = resp.headers.get("opc-next-page")
+            if not page:
+                return loaded
+
+    loaded = sum(await asyncio.gather(*(_preload(c) for c in oc.CREDENTIALS.values())))
+    log.info("📁 %s compartment(s) pré-carregados no cache", loaded)
+    return loaded
+
+
+# ====== BUCKETS ======
+async def create_bucket(bucket_name: str, compartment: str, creds: Optional[oc.OCICredentials] = None):
+    """
+    Cria bucket no compartment especificado (OCID ou nome). Sem 'creds', usa as do
+    ambiente do compartment.
+    Retorna dict: {"ok": True, "compartment_id": "<ocid>"} ou {"ok": False, "error": "..."}
+    """
+    creds = creds or oc.credentials_for_compartment(compartment)
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {"ok": False, "error": "namespace not found"}
+
+    if not oc._is_ocid_compartment(compartment):
+        compartment_ocid = await resolve_compartment_ocid(compartment)
+        if not compartment_ocid:
+            return {"ok": False, "error": f"Compartment '{compartment}' não encontrado"}
+    else:
+        compartment_ocid = compartment
+
+    payload = {
+        "name": bucket_name,
+        "compartmentId": compartment_ocid,
+        "publicAccessType": "NoPublicAccess",
+        "storageTier": "Standard",
+        "versioning": "Disabled",
+        "objectEventsEnabled": False
+    }
+    body_bytes = json.dumps(payload, separators=(',', ':')).encode("utf-8")
+
+    log.debug("📦 Criando bucket: %s, Compartment OCID: %s (%s)", bucket_name, compartment_ocid, creds.env)
+
+    try:
+        resp = await _request("post", f"/n/{namespace}/b/", body=body_bytes, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro HTTP ao criar bucket: %s", e)
+        return {"ok": False, "error": str(e)}
+
+    if resp.status_code in (200, 201):
+        log.info("✅ Bucket '%s' criado com sucesso em %s.", bucket_name, compartment_ocid)
+        oc.BUCKET_CACHE.set(bucket_name, {"env": creds.env, "compartment_id": compartment_ocid})
+        return {"ok": True, "compartment_id": compartment_ocid}
+    log.error("❌ Erro ao criar bucket (%s): %s", resp.status_code, resp.text)
+    return {"ok": False, "status_code": resp.status_code, "error": resp.text}
+
+
+async def list_buckets(compartment: Optional[str] = None, creds: Optional[oc.OCICredentials] = None):
+    """
+    Lista buckets dentro de 'compartment' (OCID ou nome). Se None usa COMPARTMENT_OCID ou a tenancy.
+    Retorna lista de buckets ([] se o compartment não existe) ou None se a OCI falhou.
+    """
+    if creds is None:
+        creds = oc.credentials_for_compartment(compartment) if compartment else oc.default_credentials()
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return None
+
+    target = compartment
+    if target:
+        if not oc._is_ocid_compartment(target):
+            resolved = await resolve_compartment_ocid(target)
+            if not resolved:
+                log.warning("⚠️ Não encontrei compartment '%s' para listar buckets.", target)
+                return []
+            target = resolved
+    else:
+        target = oc.COMPARTMENT_OCID or oc.TENANCY_OCID
+
+    return await _list_bucket_pages(namespace, target, creds)
+
+
+async def _list_bucket_pages(namespace: str, compartment_ocid: str,
+                             creds: Optional[oc.OCICredentials] = None) -> Optional[list]:
+    """Todas as páginas do ListBuckets (opc-next-page) de um compartment; None em caso de erro."""
+    creds = creds or oc.default_credentials()
+    buckets = []
+    page = None
+    while True:
+        try:
+            resp = await _request("get", oc._list_buckets_target(namespace, compartment_ocid, page), creds=creds)
+        except httpx.HTTPError as e:
+            log.error("❌ Erro HTTP ao listar buckets: %s", e)
+            return None
+        if not resp.is_success:
+            log.error("❌ Erro ao listar buckets: %s %s", resp.status_code, resp.text)
+            return None
+        try:
+            buckets.extend(resp.json())
+        except ValueError as e:
+            log.error("❌ Erro ao decodificar JSON da listagem de buckets: %s", e)
+            return None
+        page = resp.headers.get("opc-next-page")
+        if not page:
+            _remember_buckets(buckets, creds)
+            return buckets
+
+
+async def list_buckets_in(compartments: list, concurrency: int = BUCKET_FANOUT_CONCURRENCY) -> dict:
+    """
+    Lista buckets de vários compartments (nomes ou OCIDs, de qualquer ambiente) em paralelo
+    e junta o resultado. Cada compartment usa as credenciais do seu ambiente.
+    Retorna {"buckets": [...], "errors": [{"compartment": "...", "error": "..."}]}.
+    """
+    namespace = await get_namespace()
+    if not namespace:
+        return {"buckets": [], "errors": [{"compartment": None, "error": "namespace not found"}]}
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+    buckets = []
+    errors = []
+
+    async def _one(compartment):
+        async with slots:
+            try:
+                creds = oc.credentials_for_compartment(compartment)
+                target = compartment
+                if not oc._is_ocid_compartment(compartment):
+                    target = await resolve_compartment_ocid(compartment)
+            except ValueError as e:
+                errors.append({"compartment": compartment, "error": str(e)})
+                return
+            if not target:
+                errors.append({"compartment": compartment, "error": "compartment não encontrado"})
+                return
+            found = await _list_bucket_pages(namespace, target, creds)
+            if found is None:
+                errors.append({"compartment": compartment, "error": "falha ao listar buckets"})
+                return
+            buckets.extend(found)
+
+    await asyncio.gather(*(_one(c) for c in dict.fromkeys(compartments)))
+
+    buckets.sort(key=lambda b: b.get("name", ""))
+    return {"buckets": buckets, "errors": errors}
+
+
+async def _list_child_compartments(parent_ocid: str, creds: oc.OCICredentials) -> Optional[list]:
+    children = []
+    page = None
+    while True:
+        request_target = (
+            f"/20160918/compartments?compartmentId={parent_ocid}"
+            f"&lifecycleState=ACTIVE&limit={oc.LIST_PAGE_LIMIT}"
+        )
+        if page:
+            request_target += f"&page={quote(page, safe='')}"
+        try:
+            resp = await _request("get", request_target, endpoint=oc.IDENTITY_ENDPOINT, creds=creds)
+        except httpx.HTTPError as e:
+            log.error("❌ Erro HTTP ao listar compartments de %s: %s", parent_ocid, e)
+            return None
+        if not resp.is_success:
+            log.error("❌ Erro ao listar compartments de %s: %s %s", parent_ocid, resp.status_code, resp.text)
+            return None
+        payload = resp.json()
+        children.extend(payload if isinstance(payload, list) else payload.get("data", []))
+        page = resp.headers.get("opc-next-page")
+        if not page:
+            return children
+
+
+async def list_compartment_subtree(root: str, creds: Optional[oc.OCICredentials] = None) -> Optional[list]:
+    """
+    Compartment 'root' (nome ou OCID) e todos os seus descendentes ativos, nível a nível
+    (os filhos de um mesmo nível são consultados em paralelo). Retorna lista de OCIDs;
+    os descendentes herdam o ambiente do 'root'.
+    """
+    creds = creds or oc.credentials_for_compartment(root)
+    root_ocid = root if oc._is_ocid_compartment(root) else await resolve_compartment_ocid(root)
+    if not root_ocid:
+        return None
+
+    subtree = [root_ocid]
+    level = [root_ocid]
+    while level:
+        pages = await asyncio.gather(*(_list_child_compartments(parent, creds) for parent in level))
+        level = [c["id"] for children in pages if children for c in children]
+        for ocid in level:
+            oc.COMPARTMENT_ENVS[ocid] = creds.env
+        subtree.extend(level)
+    return subtree
+
+
+async def delete_bucket(bucket_name, creds: Optional[oc.OCICredentials] = None):
+    log.debug("🗑️  Deletando bucket '%s'...", bucket_name)
+
+    namespace = await get_namespace(creds)
+    if not namespace:
+        log.error("❌ Namespace não encontrado.")
+        return False
+
+    try:
+        response = await _request("delete", f"/n/{namespace}/b/{bucket_name}", creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro de requisição: %s", e)
+        return False
+
+    if response.status_code in [200, 204]:
+        log.info("✅ Bucket '%s' deletado com sucesso.", bucket_name)
+        return True
+    if response.status_code == 409:
+        log.error("❌ Erro: Bucket não está vazio.")
+        return False
+    log.error("❌ Erro ao deletar bucket (HTTP %s): %s", response.status_code, response.text)
+    return False
+
+
+# ====== OBJETOS ======
+async def upload_bytes(bucket_name: str, object_name: str, data: bytes, content_type: Optional[str] = None,
+                       creds: Optional[oc.OCICredentials] = None):
+    namespace = await get_namespace(creds)
+    if not namespace:
+        log.error("❌ Namespace não encontrado.")
+        return False
+
+    if not content_type:
+        content_type, _ = mimetypes.guess_type(object_name)
+    content_type = content_type or "application/octet-stream"
+
+    request_target = f"/n/{namespace}/b/{bucket_name}/o/{quote(object_name)}"
+    try:
+        response = await _request("put", request_target, body=data, content_type=content_type, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Falha ao fazer upload: %s", e)
+        return False
+
+    if response.status_code in [200, 201]:
+        log.debug("✅ Upload de '%s' concluído com sucesso.", object_name)
+        return True
+    log.error("❌ Erro no upload (HTTP %s): %s", response.status_code, response.text)
+    return False
+
+
+def _object_content_type(source, object_name: str) -> str:
+    content_type = source.content_type
+    if not content_type or content_type.startswith("application/x-www-form-urlencoded"):
+        content_type, _ = mimetypes.guess_type(object_name)
+    return content_type or "application/octet-stream"
+
+
+# ====== DEDUPLICAÇÃO DE UPLOAD ======
+# Confere (HEAD) se o objeto já tem o mesmo conteúdo antes de enviar; UPLOAD_DEDUP=false desliga
+UPLOAD_DEDUP = os.getenv("UPLOAD_DEDUP", "true").lower() in ("1", "true", "yes")
+
+
+class UploadDedupStats:
+    def __init__(self):
+        self.checked = 0
+        self.skipped = 0
+        self.written = 0
+        self.bytes_saved = 0
+        self.bytes_written = 0
+
+    def record_written(self, size: int):
+        self.written += 1
+        self.bytes_written += size or 0
+
+    def stats(self) -> dict:
+        total = self.skipped + self.written
+        return {
+            "enabled": UPLOAD_DEDUP,
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "written": self.written,
+            "bytes_saved": self.bytes_saved,
+            "bytes_written": self.bytes_written,
+            "skip_ratio": round(self.skipped / total, 3) if total else 0.0,
+        }
+
+
+DEDUP_STATS = UploadDedupStats()
+
+
+def _content_hash_headers(source) -> dict:
+    """
+    Content-MD5 (a OCI rejeita o PUT se o corpo não bater) e o SHA-256 como metadado,
+    usado pelas próximas comparações. O SHA-256 só é gravado se foi calculado aqui.
+    """
+    headers = {}
+    if source.md5:
+        headers["Content-MD5"] = source.md5
+    if source.sha256_verified:
+        headers["opc-meta-sha256"] = source.sha256
+    return headers
+
+
+async def head_object(bucket_name: str, object_name: str,
+                      creds: Optional[oc.OCICredentials] = None) -> Optional[httpx.Headers]:
+    """Headers do HeadObject, ou None se o objeto não existe (ou a consulta falhou)."""
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return None
+    try:
+        response = await _request("head", f"/n/{namespace}/b/{bucket_name}/o/{quote(object_name)}", creds=creds)
+    except httpx.HTTPError as e:
+        log.warning("⚠️ Erro no HEAD de '%s': %s", object_name, e)
+        return None
+    if response.status_code != 200:
+        return None
+    return response.headers
+
+
+def _etag_matches(if_none_match: str, etag: Optional[str]) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    if not etag:
+        return False
+    tags = {t.strip().removeprefix("W/").strip('"') for t in if_none_match.split(",")}
+    return etag.strip('"') in tags
+
+
+async def find_unchanged(bucket_name: str, object_name: str, source, if_none_match: Optional[str] = None,
+                         creds: Optional[oc.OCICredentials] = None) -> Optional[str]:
+    """
+    Decide se o upload pode ser pulado. Retorna o motivo ("if-none-match" / "unchanged")
+    ou None para enviar normalmente.
+
+    Compara o objeto atual (HEAD) com os hashes da origem: o opc-meta-sha256 gravado
+    por nós ou, para objetos de PUT simples, o content-md5 da OCI. Origens relíveis
+    (spool/bytes) são hasheadas aqui; streams diretos dependem de Content-MD5 /
+    X-Content-SHA256 informados pelo cliente.
+    """
+    if not if_none_match:
+        if not UPLOAD_DEDUP:
+            return None
+        if not source.md5 and not source.sha256:
+            await source.digest()
+        if not source.md5 and not source.sha256:
+            return None
+
+    DEDUP_STATS.checked += 1
+    headers = await head_object(bucket_name, object_name, creds=creds)
+    if headers is None:
+        return None
+
+    reason = None
+    if if_none_match:
+        if _etag_matches(if_none_match, headers.get("etag")):
+            reason = "if-none-match"
+    elif str(source.size) == headers.get("content-length"):
+        remote_sha256 = headers.get("opc-meta-sha256")
+        remote_md5 = headers.get("content-md5")
+        if source.sha256 and remote_sha256:
+            reason = "unchanged" if remote_sha256 == source.sha256 else None
+        elif source.md5 and remote_md5:
+            reason = "unchanged" if remote_md5 == source.md5 else None
+
+    if reason:
+        DEDUP_STATS.skipped += 1
+        DEDUP_STATS.bytes_saved += source.size
+        log.debug("⏭️  Upload de '%s' pulado (%s): conteúdo já presente no bucket '%s'.", object_name, reason, bucket_name)
+    return reason
+
+
+async def upload_stream(bucket_name: str, object_name: str, source,
+                        creds: Optional[oc.OCICredentials] = None) -> dict:
+    """
+    Envia um UploadSource (upload_source.py) em blocos, sem carregar o objeto em memória.
+    PutObject dispensa x-content-sha256 na assinatura, então o corpo não precisa ser
+    lido antes do envio; o MD5 é calculado durante o stream e conferido com o
+    opc-content-md5 devolvido pela OCI.
+    Retorna dict: {"ok": True, "size": n, "md5": "<b64>", "etag": "..."} ou {"ok": False, "error": "..."}
+    """
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {"ok": False, "error": "namespace not found"}
+
+    content_type = _object_content_type(source, object_name)
+    request_target = f"/n/{namespace}/b/{bucket_name}/o/{quote(object_name)}"
+    headers = oc._signed_headers("put", request_target, creds=creds)
+    headers["Content-Type"] = content_type
+    headers["Content-Length"] = str(source.size)
+    headers.update(_content_hash_headers(source))
+
+    md5 = hashlib.md5()
+    sent = 0
+
+    async def _body():
+        nonlocal sent
+        async for chunk in source.chunks():
+            md5.update(chunk)
+            sent += len(chunk)
+            yield chunk
+
+    try:
+        response = await get_async_client().put(
+            f"{oc.OBJECT_STORAGE_ENDPOINT}{request_target}", headers=headers, content=_body()
+        )
+    except httpx.HTTPError as e:
+        log.error("❌ Falha ao fazer upload: %s", e)
+        return {"ok": False, "error": str(e)}
+
+    if response.status_code not in [200, 201]:
+        log.error("❌ Erro no upload (HTTP %s): %s", response.status_code, response.text)
+        return {"ok": False, "status_code": response.status_code, "error": response.text}
+
+    local_md5 = base64.b64encode(md5.digest()).decode()
+    remote_md5 = response.headers.get("opc-content-md5")
+    if remote_md5 and remote_md5 != local_md5:
+        log.error("❌ MD5 divergente no upload de '%s': local=%s remoto=%s", object_name, local_md5, remote_md5)
+        return {"ok": False, "status_code": 502, "error": "MD5 divergente entre o enviado e o gravado"}
+
+    log.debug("✅ Upload de '%s' concluído com sucesso (%s bytes).", object_name, sent)
+    return {"ok": True, "size": sent, "md5": local_md5, "etag": response.headers.get("etag")}
+
+
+async def upload_file(bucket_name, file_path, object_name=None, creds: Optional[oc.OCICredentials] = None):
+    if not os.path.isfile(file_path):
+        log.error("❌ Arquivo não encontrado: %s", file_path)
+        return False
+
+    if object_name is None:
+        object_name = os.path.basename(file_path)
+
+    def _read():
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    content_type, _ = mimetypes.guess_type(file_path)
+    data = await asyncio.to_thread(_read)
+    return await upload_bytes(bucket_name, object_name, data, content_type, creds=creds)
+
+
+async def open_object(bucket_name: str, object_name: str, headers: Optional[dict] = None,
+                      creds: Optional[oc.OCICredentials] = None) -> Optional[httpx.Response]:
+    """
+    Abre um GetObject em modo stream (o corpo ainda não foi lido). 'headers' permite
+    repassar Range / If-None-Match / If-Modified-Since. Quem chama deve fechar a resposta
+    (response.aclose()) depois de consumir o corpo.
+    """
+    namespace = await get_namespace(creds)
+    if not namespace:
+        log.error("❌ Namespace não encontrado.")
+        return None
+
+    request_target = f"/n/{namespace}/b/{bucket_name}/o/{quote(object_name)}"
+    request_headers = oc._signed_headers("get", request_target, creds=creds)
+    request_headers.update(headers or {})
+
+    client = get_async_client()
+    request = client.build_request("GET", f"{oc.OBJECT_STORAGE_ENDPOINT}{request_target}", headers=request_headers)
+    try:
+        return await client.send(request, stream=True)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao abrir objeto '%s': %s", object_name, e)
+        return None
+
+
+async def list_objects_page(bucket_name, prefix=None, start=None, limit=oc.LIST_OBJECTS_PAGE_SIZE,
+                            delimiter=None, fields=None, creds: Optional[oc.OCICredentials] = None) -> Optional[dict]:
+    """
+    Uma página do ListObjects: {"objects": [...], "prefixes": [...], "nextStartWith": "..."|None}.
+    Retorna None em caso de erro.
+    """
+    namespace = await get_namespace(creds)
+    if not namespace:
+        log.error("❌ Namespace não encontrado.")
+        return None
+
+    request_target = oc._list_objects_target(namespace, bucket_name, prefix, start, limit, delimiter, fields)
+    try:
+        response = await _request("get", request_target, creds=creds)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao listar objetos: %s", e)
+        return None
+
+    payload = response.json()
+    return {
+        "objects": payload.get("objects", []),
+        "prefixes": payload.get("prefixes", []),
+        "nextStartWith": payload.get("nextStartWith"),
+    }
+
+
+class ListObjectsError(Exception):
+    """Uma página do ListObjects falhou no meio da listagem; 'next_start' é de onde retomar."""
+
+    def __init__(self, bucket_name: str, next_start: Optional[str]):
+        super().__init__(f"falha ao listar objetos de '{bucket_name}'")
+        self.next_start = next_start
+
+
+async def iter_object_pages(bucket_name, prefix=None, start=None, delimiter=None, fields=None,
+                            page_size=oc.LIST_OBJECTS_PAGE_SIZE, creds: Optional[oc.OCICredentials] = None):
+    """
+    Percorre todas as páginas seguindo nextStartWith (uma página em memória por vez).
+    Levanta ListObjectsError se uma página falhar: a listagem não termina "limpa" pela metade.
+    """
+    while True:
+        page = await list_objects_page(bucket_name, prefix, start, page_size, delimiter, fields, creds=creds)
+        if page is None:
+            raise ListObjectsError(bucket_name, start)
+        yield page
+        start = page["nextStartWith"]
+        if not start:
+            return
+
+
+async def iter_objects(bucket_name, prefix=None, start=None, delimiter=None, fields=None,
+                       page_size=oc.LIST_OBJECTS_PAGE_SIZE, creds: Optional[oc.OCICredentials] = None):
+    async for page in iter_object_pages(bucket_name, prefix, start, delimiter, fields, page_size, creds=creds):
+        for obj in page["objects"]:
+            yield obj
+
+
+async def list_objects(bucket_name, prefix=None, delimiter=None, fields=None, creds: Optional[oc.OCICredentials] = None):
+    return [obj async for obj in iter_objects(bucket_name, prefix=prefix, delimiter=delimiter, fields=fields,
+                                              creds=creds)]
+
+
+async def delete_object(bucket_name, object_name, creds: Optional[oc.OCICredentials] = None):
+    namespace = await get_namespace(creds)
+    if not namespace:
+        log.error("❌ Namespace não encontrado.")
+        return False
+
+    try:
+        response = await _request("delete", f"/n/{namespace}/b/{bucket_name}/o/{quote(object_name)}", creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro de requisição: %s", e)
+        return False
+
+    if response.status_code in [200, 204]:
+        log.debug("✅ Objeto '%s' deletado com sucesso.", object_name)
+        return True
+    log.error("❌ Erro ao deletar objeto (HTTP %s): %s", response.status_code, response.text)
+    return False
+
+
+# ====== MULTIPART UPLOAD ======
+async def create_multipart_upload(bucket_name, object_name, content_type=None, metadata: Optional[dict] = None,
+                                  creds: Optional[oc.OCICredentials] = None) -> Optional[str]:
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return None
+
+    payload = {"object": object_name}
+    if content_type:
+        payload["contentType"] = content_type
+    if metadata:
+        payload["metadata"] = metadata
+    body_bytes = json.dumps(payload, separators=(',', ':')).encode("utf-8")
+
+    try:
+        response = await _request("post", f"/n/{namespace}/b/{bucket_name}/u", body=body_bytes, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao iniciar multipart upload: %s", e)
+        return None
+    if not response.is_success:
+        log.error("❌ Erro ao iniciar multipart upload (HTTP %s): %s", response.status_code, response.text)
+        return None
+    return response.json().get("uploadId")
+
+
+async def upload_part(bucket_name, object_name, upload_id, part_num, data,
+                      creds: Optional[oc.OCICredentials] = None) -> Optional[str]:
+    """
+    Envia uma parte e retorna o ETag, ou None se falhar. As novas tentativas (5xx, 429,
+    conexão) ficam com o http_pool, como nas demais chamadas.
+    """
+    namespace = await get_namespace(creds)
+    request_target = oc._multipart_target(namespace, bucket_name, object_name, upload_id, part_num)
+
+    headers = oc._signed_headers("put", request_target, creds=creds)
+    headers["Content-Length"] = str(len(data))
+    headers["Content-MD5"] = base64.b64encode(hashlib.md5(data).digest()).decode()
+    try:
+        response = await get_async_client().put(
+            f"{oc.OBJECT_STORAGE_ENDPOINT}{request_target}", headers=headers, content=data
+        )
+    except httpx.HTTPError as e:
+        log.warning("⚠️ Parte %s falhou: %s", part_num, e)
+        return None
+    if response.status_code in (200, 201):
+        return response.headers.get("etag")
+    log.warning("⚠️ Parte %s falhou (HTTP %s): %s", part_num, response.status_code, response.text)
+    return None
+
+
+async def commit_multipart_upload(bucket_name, object_name, upload_id, parts,
+                                  creds: Optional[oc.OCICredentials] = None) -> bool:
+    """'parts' é uma lista de (part_num, etag)."""
+    namespace = await get_namespace(creds)
+    payload = {"partsToCommit": [{"partNum": n, "etag": etag} for n, etag in sorted(parts)]}
+    body_bytes = json.dumps(payload, separators=(',', ':')).encode("utf-8")
+
+    request_target = oc._multipart_target(namespace, bucket_name, object_name, upload_id)
+    try:
+        response = await _request("post", request_target, body=body_bytes, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao concluir multipart upload: %s", e)
+        return False
+    if response.status_code in (200, 201):
+        return True
+    log.error("❌ Erro ao concluir multipart upload (HTTP %s): %s", response.status_code, response.text)
+    return False
+
+
+async def abort_multipart_upload(bucket_name, object_name, upload_id,
+                                 creds: Optional[oc.OCICredentials] = None) -> bool:
+    namespace = await get_namespace(creds)
+    request_target = oc._multipart_target(namespace, bucket_name, object_name, upload_id)
+    try:
+        # limpeza: tenta mesmo com o circuit breaker aberto (falha no meio de um upload)
+        response = await _request("delete", request_target, creds=creds, bypass_circuit=True)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao abortar multipart upload: %s", e)
+        return False
+    return response.status_code in (200, 204)
+
+
+async def upload_stream_multipart(bucket_name: str, object_name: str, source,
+                                  part_size: Optional[int] = None, parallel: Optional[int] = None,
+                                  creds: Optional[oc.OCICredentials] = None) -> dict:
+    """
+    Envia um UploadSource em partes paralelas. As partes são lidas em sequência do stream
+    e no máximo 'parallel' ficam em memória/voo ao mesmo tempo. Como o stream de entrada
+    não pode ser relido, uma falha definitiva de parte aborta o upload.
+    """
+    if not await get_namespace(creds):
+        return {"ok": False, "error": "namespace not found"}
+
+    part_size = oc.multipart_part_size(source.size, part_size or oc.MULTIPART_PART_SIZE)
+    parallel = max(1, parallel or oc.MULTIPART_PARALLEL)
+
+    metadata = {"opc-meta-sha256": source.sha256} if source.sha256_verified else None
+    upload_id = await create_multipart_upload(bucket_name, object_name, _object_content_type(source, object_name),
+                                              metadata=metadata, creds=creds)
+    if not upload_id:
+        return {"ok": False, "error": "falha ao iniciar multipart upload"}
+
+    slots = asyncio.Semaphore(parallel)
+    failed = []
+
+    async def _send(part_num, data):
+        try:
+            etag = await upload_part(bucket_name, object_name, upload_id, part_num, data, creds=creds)
+            if not etag:
+                failed.append(part_num)
+            return part_num, etag
+        except BaseException:
+            # ex: CircuitOpenError; para a leitura e sobe no gather abaixo, que aborta o upload
+            failed.append(part_num)
+            raise
+        finally:
+            slots.release()
+
+    tasks = []
+    size = 0
+    part_num = 0
+    try:
+        while not failed:
+            await slots.acquire()
+            data = await source.read(part_size)
+            if not data:
+                slots.release()
+                break
+            part_num += 1
+            size += len(data)
+            tasks.append(asyncio.create_task(_send(part_num, data)))
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # cliente desconectou / erro lendo a entrada / parte com exceção (ex: circuito aberto):
+        # descarta as partes já enviadas
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await abort_multipart_upload(bucket_name, object_name, upload_id, creds=creds)
+        raise
+
+    if failed or not results:
+        await abort_multipart_upload(bucket_name, object_name, upload_id, creds=creds)
+        log.error("❌ Multipart upload de '%s' abortado (partes com falha: %s)", object_name, sorted(failed))
+        return {"ok": False, "status_code": 502, "error": f"partes com falha: {sorted(failed)}"}
+
+    if not await commit_multipart_upload(bucket_name, object_name, upload_id, results, creds=creds):
+        await abort_multipart_upload(bucket_name, object_name, upload_id, creds=creds)
+        return {"ok": False, "status_code": 502, "error": "falha ao concluir multipart upload"}
+
+    log.debug("✅ Multipart upload de '%s' concluído (%s bytes em %s partes).", object_name, size, part_num)
+    return {"ok": True, "size": size, "parts": part_num, "upload_id": upload_id}
+
+
+# ====== EXCLUSÃO EM LOTE / PURGE ======
+# Exclusões (ou aborts de multipart) em voo ao mesmo tempo
+BULK_DELETE_CONCURRENCY = int(os.getenv("BULK_DELETE_CONCURRENCY", "16"))
+# A cada quantos itens processados o callback de progresso é chamado
+BULK_DELETE_PROGRESS_EVERY = int(os.getenv("BULK_DELETE_PROGRESS_EVERY", "500"))
+# Quantas falhas individuais são devolvidas no resultado (o total fica em 'failed')
+BULK_DELETE_MAX_ERRORS = 100
+
+
+async def list_object_versions_page(bucket_name, prefix=None, page=None,
+                                    creds: Optional[oc.OCICredentials] = None) -> Optional[dict]:
+    """
+    Uma página do ListObjectVersions (versões antigas e delete markers incluídos):
+    {"items": [...], "nextPage": "..."|None}. Retorna None em caso de erro.
+    """
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return None
+    try:
+        response = await _request("get", oc._object_versions_target(namespace, bucket_name, prefix, page), creds=creds)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao listar versões de objetos: %s", e)
+        return None
+    return {"items": response.json().get("items", []), "nextPage": response.headers.get("opc-next-page")}
+
+
+async def list_multipart_uploads_page(bucket_name, page=None,
+                                      creds: Optional[oc.OCICredentials] = None) -> Optional[dict]:
+    """Uma página dos multipart uploads em andamento: {"items": [...], "nextPage": ...}, ou None em erro."""
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return None
+    try:
+        response = await _request("get", oc._multipart_uploads_target(namespace, bucket_name, page), creds=creds)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao listar multipart uploads: %s", e)
+        return None
+    return {"items": response.json(), "nextPage": response.headers.get("opc-next-page")}
+
+
+async def _try_delete(request_target: str, creds: Optional[oc.OCICredentials]) -> Optional[str]:
+    """DELETE de um objeto/versão/upload. Retorna None se removeu (ou já não existia), senão o erro."""
+    try:
+        response = await _request("delete", request_target, creds=creds)
+    except httpx.HTTPError as e:
+        return str(e)
+    if response.status_code in (200, 204, 404):
+        return None
+    return f"HTTP {response.status_code}: {response.text[:200]}"
+
+
+def _new_bulk_result(bucket_name: str) -> dict:
+    return {"ok": True, "bucket": bucket_name, "listed": 0, "deleted": 0, "aborted_uploads": 0,
+            "failed": 0, "errors": []}
+
+
+def _progress_of(result: dict) -> dict:
+    return {k: result[k] for k in ("listed", "deleted", "aborted_uploads", "failed")}
+
+
+async def _run_bulk(items, action, result: dict, counter: str, concurrency: int, on_progress=None):
+    """
+    Consome 'items' (async iterator de dicts) e aplica 'action(item) -> erro|None' com no
+    máximo 'concurrency' chamadas em voo. A fila limitada segura a listagem enquanto os
+    workers não dão conta, então a memória não cresce com o tamanho do bucket.
+    """
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    every = max(1, BULK_DELETE_PROGRESS_EVERY)
+
+    async def _worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            error = await action(item)
+            if error is None:
+                result[counter] += 1
+            else:
+                result["failed"] += 1
+                result["ok"] = False
+                if len(result["errors"]) < BULK_DELETE_MAX_ERRORS:
+                    result["errors"].append({**item, "error": error})
+            if on_progress and (result[counter] + result["failed"]) % every == 0:
+                on_progress(_progress_of(result))
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, concurrency))]
+    try:
+        async for item in items:
+            result["listed"] += 1
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    except BaseException:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+
+
+async def _paged(fetch, result: dict, what: str):
+    """Gera os itens de todas as páginas de 'fetch(page)'; falha de listagem marca o resultado."""
+    page = None
+    while True:
+        data = await fetch(page)
+        if data is None:
+            result["ok"] = False
+            result["error"] = f"falha ao listar {what}"
+            return
+        for item in data["items"]:
+            yield item
+        page = data["nextPage"]
+        if not page:
+            return
+
+
+async def delete_objects(bucket_name: str, names: Optional[list] = None, prefix: Optional[str] = None,
+                         versions: bool = False, concurrency: Optional[int] = None,
+                         creds: Optional[oc.OCICredentials] = None, on_progress=None) -> dict:
+    """
+    Deleta em paralelo uma lista de objetos ('names') ou tudo sob 'prefix'.
+    Com versions=True remove todas as versões (e delete markers) em vez de só a atual.
+    Retorna {"ok", "listed", "deleted", "failed", "errors": [...], ...}; 'on_progress'
+    recebe contadores parciais a cada BULK_DELETE_PROGRESS_EVERY itens.
+    """
+    result = _new_bulk_result(bucket_name)
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {**result, "ok": False, "error": "namespace not found"}
+
+    async def _version_items(prefix, exact=None):
+        async for v in _paged(lambda page: list_object_versions_page(bucket_name, prefix, page, creds=creds),
+                              result, "versões"):
+            if exact is None or v.get("name") == exact:
+                yield {"name": v.get("name"), "versionId": v.get("versionId")}
+
+    async def _object_page(start):
+        page = await list_objects_page(bucket_name, prefix, start, fields="name", creds=creds)
+        return None if page is None else {"items": page["objects"], "nextPage": page["nextStartWith"]}
+
+    async def _items():
+        if names is not None:
+            for name in names:
+                if versions:
+                    async for item in _version_items(name, exact=name):
+                        yield item
+                else:
+                    yield {"name": name}
+        elif versions:
+            async for item in _version_items(prefix):
+                yield item
+        else:
+            # falha no meio da listagem marca ok=False (exclusão parcial), como nas versões
+            async for obj in _paged(_object_page, result, "objetos"):
+                yield {"name": obj["name"]}
+
+    async def _delete(item):
+        return await _try_delete(oc._object_target(namespace, bucket_name, item["name"], item.get("versionId")), creds)
+
+    await _run_bulk(_items(), _delete, result, "deleted", concurrency or BULK_DELETE_CONCURRENCY, on_progress)
+    log.debug("🗑️  Bucket '%s': %s objeto(s) deletado(s), %s falha(s).", bucket_name, result["deleted"], result["failed"])
+    return result
+
+
+async def purge_bucket(bucket_name: str, concurrency: Optional[int] = None,
+                       creds: Optional[oc.OCICredentials] = None, on_progress=None) -> dict:
+    """
+    Esvazia o bucket para que possa ser deletado: aborta os multipart uploads em andamento
+    e remove todas as versões de todos os objetos (delete markers incluídos).
+    """
+    result = _new_bulk_result(bucket_name)
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {**result, "ok": False, "error": "namespace not found"}
+    concurrency = concurrency or BULK_DELETE_CONCURRENCY
+
+    async def _abort(item):
+        return await _try_delete(oc._multipart_target(namespace, bucket_name, item["name"], item["uploadId"]), creds)
+
+    async def _uploads():
+        async for u in _paged(lambda page: list_multipart_uploads_page(bucket_name, page, creds=creds),
+                              result, "multipart uploads"):
+            yield {"name": u.get("object"), "uploadId": u.get("uploadId")}
+
+    async def _delete(item):
+        return await _try_delete(oc._object_target(namespace, bucket_name, item["name"], item["versionId"]), creds)
+
+    async def _versions():
+        async for v in _paged(lambda page: list_object_versions_page(bucket_name, None, page, creds=creds),
+                              result, "versões"):
+            yield {"name": v.get("name"), "versionId": v.get("versionId")}
+
+    await _run_bulk(_uploads(), _abort, result, "aborted_uploads", concurrency, on_progress)
+    await _run_bulk(_versions(), _delete, result, "deleted", concurrency, on_progress)
+    log.info("🧹 Purge de '%s': %s versão(ões) deletada(s), %s upload(s) abortado(s), %s falha(s).",
+             bucket_name, result["deleted"], result["aborted_uploads"], result["failed"])
+    return result
+
+
+# ====== PRE-AUTHENTICATED REQUESTS (PAR) ======
+# Validade padrão / máxima (s) das URLs pré-autenticadas emitidas pela API
+PAR_DEFAULT_EXPIRES_IN = int(os.getenv("PAR_DEFAULT_EXPIRES_IN", "900"))
+PAR_MAX_EXPIRES_IN = int(os.getenv("PAR_MAX_EXPIRES_IN", str(7 * 24 * 3600)))
+# Pedidos repetidos (mesmo objeto/prefixo, acesso e validade) reaproveitam o PAR por este tempo,
+# desde que ainda reste pelo menos metade da validade pedida
+PAR_CACHE = TTLCache(ttl=float(os.getenv("PAR_CACHE_TTL", "300")), max_size=4096)
+
+# (acesso, é prefixo?) -> accessType da OCI
+PAR_ACCESS_TYPES = {
+    ("read", False): "ObjectRead",
+    ("write", False): "ObjectWrite",
+    ("readwrite", False): "ObjectReadWrite",
+    ("read", True): "AnyObjectRead",
+    ("write", True): "AnyObjectWrite",
+    ("readwrite", True): "AnyObjectReadWrite",
+}
+
+
+def _par_view(par: dict, prefix: bool) -> dict:
+    full_path = par.get("fullPath") or f"{oc.OBJECT_STORAGE_ENDPOINT}{par.get('accessUri', '')}"
+    return {
+        "id": par.get("id"),
+        "access_type": par.get("accessType"),
+        "object": None if prefix else par.get("objectName"),
+        "prefix": par.get("objectName") if prefix else None,
+        # para prefixo, o cliente acrescenta o nome do objeto ao fim da URL
+        "url": full_path,
+        "expires_at": par.get("timeExpires"),
+    }
+
+
+async def _issue_par(bucket_name: str, target: Optional[str], access_type: str, expires_in: int,
+                     prefix: bool, creds: Optional[oc.OCICredentials]) -> dict:
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {"ok": False, "status_code": 502, "error": "namespace not found"}
+
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+    payload = {
+        "name": f"tsuru-api-{access_type}-{target or '*'}"[:200],
+        "accessType": access_type,
+        "timeExpires": expires_at.isoformat(timespec="seconds").replace("+00:00", "Z"),
+    }
+    if target:
+        payload["objectName"] = target
+    body_bytes = json.dumps(payload, separators=(',', ':')).encode("utf-8")
+
+    try:
+        response = await _request("post", f"/n/{namespace}/b/{bucket_name}/p/", body=body_bytes, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao criar PAR: %s", e)
+        return {"ok": False, "status_code": 502, "error": str(e)}
+    if response.status_code not in (200, 201):
+        log.error("❌ Erro ao criar PAR (HTTP %s): %s", response.status_code, response.text)
+        return {"ok": False, "status_code": response.status_code, "error": response.text}
+    return {"ok": True, "par": _par_view(response.json(), prefix)}
+
+
+async def create_par(bucket_name: str, object_name: Optional[str] = None, prefix: Optional[str] = None,
+                     access: str = "read", expires_in: int = PAR_DEFAULT_EXPIRES_IN,
+                     creds: Optional[oc.OCICredentials] = None) -> dict:
+    """
+    Cria (ou reaproveita do PAR_CACHE) uma URL pré-autenticada para ler/gravar 'object_name'
+    ou qualquer objeto sob 'prefix', para que o cliente transfira os bytes direto com o
+    Object Storage. Retorna {"ok": True, "par": {...}, "cached": bool} ou {"ok": False, "error": ...}.
+    """
+    is_prefix = object_name is None
+    access_type = PAR_ACCESS_TYPES.get((access, is_prefix))
+    if access_type is None:
+        return {"ok": False, "status_code": 422, "error": f"acesso inválido: {access}"}
+    target = prefix if is_prefix else object_name
+    creds = creds or oc.default_credentials()
+    key = (creds.env, bucket_name, target, access_type, expires_in)
+
+    hit, par = PAR_CACHE.lookup(key)
+    if hit and par:
+        remaining = datetime.fromisoformat(par["expires_at"].replace("Z", "+00:00")) - datetime.now(timezone.utc)
+        if remaining.total_seconds() >= expires_in / 2:
+            return {"ok": True, "par": par, "cached": True}
+
+    result = await _issue_par(bucket_name, target, access_type, expires_in, is_prefix, creds)
+    if result["ok"]:
+        PAR_CACHE.set(key, result["par"])
+        log.info("🔗 PAR %s criado para '%s/%s' (expira em %ss)", access_type, bucket_name, target or '', expires_in)
+    return {**result, "cached": False}
+
+
+async def revoke_par(bucket_name: str, par_id: str, creds: Optional[oc.OCICredentials] = None) -> dict:
+    """Revoga um PAR (DeletePreauthenticatedRequest) e o tira do cache."""
+    PAR_CACHE.invalidate_where(lambda key, par: key[1] == bucket_name and par.get("id") == par_id)
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {"ok": False, "status_code": 502, "error": "namespace not found"}
+    try:
+        response = await _request("delete", f"/n/{namespace}/b/{bucket_name}/p/{quote(par_id, safe='')}",
+                                  creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao revogar PAR: %s", e)
+        return {"ok": False, "status_code": 502, "error": str(e)}
+    if response.status_code in (200, 204):
+        log.info("✅ PAR '%s' revogado.", par_id)
+        return {"ok": True}
+    log.error("❌ Erro ao revogar PAR (HTTP %s): %s", response.status_code, response.text)
+    return {"ok": False, "status_code": response.status_code, "error": response.text}
+
+
+# ====== CÓPIA / RENOMEAÇÃO ======
+# Work requests de cópia: id -> {"env", "buckets", ...}. Permite consultar o status com as
+# credenciais certas e checar a autorização do usuário pelos buckets envolvidos. Os emitidos
+# por esta réplica já entram no cache; os demais (outra réplica, restart) vêm da OCI.
+WORK_REQUESTS = TTLCache(ttl=float(os.getenv("WORK_REQUEST_CACHE_TTL", str(24 * 3600))), max_size=10000,
+                         negative_ttl=oc.COMPARTMENT_CACHE_NEGATIVE_TTL)
+
+_ENTITY_URI_BUCKET = re.compile(r"/b/([^/]+)")
+
+
+async def copy_object(bucket_name: str, object_name: str, destination_bucket: str,
+                      destination_object: Optional[str] = None, overwrite: bool = False,
+                      creds: Optional[oc.OCICredentials] = None) -> dict:
+    """
+    CopyObject no servidor: os bytes não passam pela API. Assíncrono na OCI.
+    Retorna {"ok": True, "work_request_id": "..."} ou {"ok": False, "status_code", "error"}.
+    """
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {"ok": False, "status_code": 502, "error": "namespace not found"}
+
+    body_bytes = oc._copy_object_payload(namespace, object_name, destination_bucket, destination_object, overwrite)
+    try:
+        response = await _request("post", f"/n/{namespace}/b/{bucket_name}/actions/copyObject",
+                                  body=body_bytes, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao copiar objeto: %s", e)
+        return {"ok": False, "status_code": 502, "error": str(e)}
+    if response.status_code != 202:
+        log.error("❌ Erro ao copiar objeto (HTTP %s): %s", response.status_code, response.text)
+        return {"ok": False, "status_code": response.status_code, "error": response.text}
+
+    work_request_id = response.headers.get("opc-work-request-id")
+    WORK_REQUESTS.set(work_request_id, {
+        "env": (creds or oc.default_credentials()).env,
+        "buckets": sorted({bucket_name, destination_bucket}),
+        "bucket": bucket_name,
+        "object": object_name,
+        "destination_bucket": destination_bucket,
+        "destination_object": destination_object or object_name,
+    })
+    return {"ok": True, "work_request_id": work_request_id}
+
+
+async def rename_object(bucket_name: str, object_name: str, new_name: str, overwrite: bool = False,
+                        creds: Optional[oc.OCICredentials] = None) -> dict:
+    namespace = await get_namespace(creds)
+    if not namespace:
+        return {"ok": False, "status_code": 502, "error": "namespace not found"}
+
+    body_bytes = oc._rename_object_payload(object_name, new_name, overwrite)
+    try:
+        response = await _request("post", f"/n/{namespace}/b/{bucket_name}/actions/renameObject",
+                                  body=body_bytes, creds=creds)
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao renomear objeto: %s", e)
+        return {"ok": False, "status_code": 502, "error": str(e)}
+    if response.status_code in (200, 204):
+        log.debug("✅ Objeto '%s' renomeado para '%s'.", object_name, new_name)
+        return {"ok": True}
+    log.error("❌ Erro ao renomear objeto (HTTP %s): %s", response.status_code, response.text)
+    return {"ok": False, "status_code": response.status_code, "error": response.text}
+
+
+async def work_request_info(work_request_id: str) -> Optional[dict]:
+    """
+    {"env": ..., "buckets": [...], ...} do work request, ou None se nenhum ambiente o enxergar.
+    Fora do cache, é procurado na OCI (GetWorkRequest com as credenciais de cada ambiente).
+    """
+    return await WORK_REQUESTS.aget_or_load(work_request_id, lambda: _probe_work_request(work_request_id))
+
+
+def _work_request_buckets(work_request: dict) -> list:
+    """Buckets dos recursos do work request (metadata BUCKET ou /b/<bucket> no entityUri)."""
+    buckets = set()
+    for resource in work_request.get("resources") or []:
+        name = (resource.get("metadata") or {}).get("BUCKET")
+        if not name:
+            match = _ENTITY_URI_BUCKET.search(resource.get("entityUri") or "")
+            name = unquote(match.group(1)) if match else None
+        if not name and resource.get("entityType") == "bucket":
+            name = resource.get("identifier")
+        if name:
+            buckets.add(name)
+    return sorted(buckets)
+
+
+async def _probe_work_request(work_request_id: str):
+    """Retorna o info do work request, NOT_FOUND (nenhum ambiente o enxerga) ou None (erro)."""
+    request_target = f"/workRequests/{quote(work_request_id, safe='')}"
+
+    async def _get(creds):
+        try:
+            return await _request("get", request_target, creds=creds)
+        except (httpx.HTTPError, RuntimeError) as e:
+            log.warning("⚠️ GetWorkRequest '%s' (%s) falhou: %s", work_request_id, creds.env, e)
+            return None
+
+    creds_list = list(oc.CREDENTIALS.values())
+    responses = await asyncio.gather(*(_get(c) for c in creds_list))
+    for creds, resp in zip(creds_list, responses):
+        if resp is not None and resp.status_code == 200:
+            work_request = resp.json()
+            return {"env": creds.env, "buckets": _work_request_buckets(work_request),
+                    "operation": work_request.get("operationType")}
+    if all(resp is not None and resp.status_code in (401, 403, 404) for resp in responses):
+        return NOT_FOUND
+    return None
+
+
+async def get_work_request(work_request_id: str, creds: Optional[oc.OCICredentials] = None) -> Optional[dict]:
+    """Estado do work request (status, percentComplete, ...); inclui 'errors' se falhou."""
+    request_target = f"/workRequests/{quote(work_request_id, safe='')}"
+    try:
+        response = await _request("get", request_target, creds=creds)
+        response.raise_for_status()
+        work_request = response.json()
+        if work_request.get("status") == "FAILED":
+            errors = await _request("get", f"{request_target}/errors", creds=creds)
+            if errors.is_success:
+                work_request["errors"] = errors.json()
+    except httpx.HTTPError as e:
+        log.error("❌ Erro ao consultar work request: %s", e)
+        return None
+    return work_request
+
+
+async def wait_work_request(work_request_id: str, timeout: float = 0, interval: float = 1,
+                            creds: Optional[oc.OCICredentials] = None) -> Optional[dict]:
+    """Consulta até um status final ou até 'timeout' segundos (0 = uma consulta só)."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        work_request = await get_work_request(work_request_id, creds=creds)
+        if work_request is None or work_request.get("status") in oc.WORK_REQUEST_TERMINAL:
+            return work_request
+        if asyncio.get_running_loop().time() + interval > deadline:
+            return work_request
+        await asyncio.sleep(interval)
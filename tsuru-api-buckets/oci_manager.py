@@ -1,12 +1,26 @@
+import os
 import argparse
+import log_setup
 from oci_client import (
+    MULTIPART_THRESHOLD,
+    MULTIPART_PART_SIZE,
+    MULTIPART_PARALLEL,
+    SYNC_PARALLEL,
+    OCI_ENVIRONMENTS,
+    DEFAULT_ENV,
+    apply_oci_environment,
     get_namespace,
     create_bucket,
     list_buckets,
     upload_file,
+    upload_file_multipart,
     list_objects,
     delete_object,
-    delete_bucket
+    delete_bucket,
+    sync_directory,
+    copy_object,
+    rename_object,
+    wait_work_request
 )
 
 def main():
@@ -15,6 +29,9 @@ def main():
         epilog="Exemplo: python oci_manager.py create meu-bucket"
     )
 
+    parser.add_argument("--env", choices=sorted(OCI_ENVIRONMENTS), default=DEFAULT_ENV,
+                        help=f"Ambiente OCI (credenciais) usado pelos comandos (padrão: {DEFAULT_ENV})")
+
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Comando: list
@@ -29,10 +46,19 @@ def main():
     upload_parser.add_argument("bucket_name")
     upload_parser.add_argument("file_path")
     upload_parser.add_argument("object_name", nargs="?")
+    upload_parser.add_argument("--multipart", action="store_true",
+                               help=f"Força multipart upload (automático a partir de {MULTIPART_THRESHOLD // (1024 * 1024)} MB)")
+    upload_parser.add_argument("--part-size", type=int, default=MULTIPART_PART_SIZE // (1024 * 1024),
+                               help="Tamanho de cada parte em MB")
+    upload_parser.add_argument("--parallel", type=int, default=MULTIPART_PARALLEL,
+                               help="Partes enviadas em paralelo")
+    upload_parser.add_argument("--resume", metavar="UPLOAD_ID",
+                               help="Retoma um multipart upload interrompido (reenvia só as partes faltantes)")
 
     # Comando: list-objects <bucket_name>
     list_objects_parser = subparsers.add_parser("list-objects", help="Listar objetos de um bucket")
     list_objects_parser.add_argument("bucket_name")
+    list_objects_parser.add_argument("--prefix", help="Lista apenas objetos com este prefixo")
 
     # Comando: delete-object <bucket_name> <object_name>
     delete_object_parser = subparsers.add_parser("delete-object", help="Deletar objeto de um bucket")
@@ -43,7 +69,36 @@ def main():
     delete_bucket_parser = subparsers.add_parser("delete-bucket", help="Deletar bucket (precisa estar vazio)")
     delete_bucket_parser.add_argument("bucket_name")
 
+    # Comando: sync <local_dir> <bucket_name> [--prefix]
+    sync_parser = subparsers.add_parser("sync", help="Sincronizar um diretório local com um bucket (só envia o que mudou)")
+    sync_parser.add_argument("local_dir")
+    sync_parser.add_argument("bucket_name")
+    sync_parser.add_argument("--prefix", default="", help="Prefixo dos objetos no bucket (ex: builds/v1)")
+    sync_parser.add_argument("--parallel", type=int, default=SYNC_PARALLEL, help="Arquivos enviados em paralelo")
+    sync_parser.add_argument("--delete", action="store_true",
+                             help="Remove do bucket objetos (sob o prefixo) sem arquivo local correspondente")
+    sync_parser.add_argument("--dry-run", action="store_true", help="Só mostra o que seria enviado/deletado")
+    sync_parser.add_argument("--checksum", action="store_true",
+                             help="Compara sempre pelo MD5 (mais lento), em vez de confiar em tamanho + mtime")
+
+    # Comando: copy <bucket_name> <object_name> <destination_bucket> [destination_object]
+    copy_parser = subparsers.add_parser("copy", help="Copiar objeto no servidor (mesmo ou outro bucket)")
+    copy_parser.add_argument("bucket_name")
+    copy_parser.add_argument("object_name")
+    copy_parser.add_argument("destination_bucket")
+    copy_parser.add_argument("destination_object", nargs="?")
+    copy_parser.add_argument("--overwrite", action="store_true", help="Sobrescreve o destino se já existir")
+    copy_parser.add_argument("--wait", action="store_true", help="Aguarda a cópia terminar")
+
+    # Comando: rename <bucket_name> <object_name> <new_name>
+    rename_parser = subparsers.add_parser("rename", help="Renomear objeto dentro do bucket")
+    rename_parser.add_argument("bucket_name")
+    rename_parser.add_argument("object_name")
+    rename_parser.add_argument("new_name")
+    rename_parser.add_argument("--overwrite", action="store_true", help="Sobrescreve 'new_name' se já existir")
+
     args = parser.parse_args()
+    apply_oci_environment(args.env)
 
     # Sempre tenta obter o namespace antes de executar o comando
     namespace = get_namespace()
@@ -60,10 +115,23 @@ def main():
             create_bucket(args.bucket_name)
 
         case "upload":
-            upload_file(args.bucket_name, args.file_path, args.object_name)
+            use_multipart = (
+                args.multipart
+                or args.resume
+                or (os.path.isfile(args.file_path) and os.path.getsize(args.file_path) >= MULTIPART_THRESHOLD)
+            )
+            if use_multipart:
+                upload_file_multipart(
+                    args.bucket_name, args.file_path, args.object_name,
+                    part_size=args.part_size * 1024 * 1024,
+                    parallel=args.parallel,
+                    upload_id=args.resume,
+                )
+            else:
+                upload_file(args.bucket_name, args.file_path, args.object_name)
 
         case "list-objects":
-            list_objects(args.bucket_name)
+            list_objects(args.bucket_name, prefix=args.prefix)
 
         case "delete-object":
             delete_object(args.bucket_name, args.object_name)
@@ -71,9 +139,35 @@ def main():
         case "delete-bucket":
             delete_bucket(args.bucket_name)
 
+        case "sync":
+            summary = sync_directory(
+                args.local_dir, args.bucket_name, prefix=args.prefix,
+                delete=args.delete, dry_run=args.dry_run, checksum=args.checksum,
+                parallel=args.parallel,
+            )
+            if not summary["ok"]:
+                exit(1)
+
+        case "copy":
+            work_request_id = copy_object(args.bucket_name, args.object_name, args.destination_bucket,
+                                          args.destination_object, overwrite=args.overwrite)
+            if not work_request_id:
+                exit(1)
+            if args.wait:
+                work_request = wait_work_request(work_request_id)
+                status = work_request.get("status") if work_request else "desconhecido"
+                print(f"{'✅' if status == 'COMPLETED' else '❌'} Cópia {status}")
+                if status != "COMPLETED":
+                    exit(1)
+
+        case "rename":
+            if not rename_object(args.bucket_name, args.object_name, args.new_name, overwrite=args.overwrite):
+                exit(1)
+
         case _:
             print("❌ Comando não reconhecido.")
 
 
 if __name__ == "__main__":
+    log_setup.setup_cli()
     main()
\ No newline at end of file
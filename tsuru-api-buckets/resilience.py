@@ -0,0 +1,200 @@
+# resilience.py
+"""
+Retries e circuit breaker das chamadas externas (OCI Object Storage / Identity, Graph, Azure AD),
+aplicados pelo http_pool nos dois clientes (requests e httpx).
+
+Retry (exponencial com full jitter, até RETRY_MAX_ATTEMPTS tentativas e RETRY_BUDGET segundos):
+- 429: qualquer método (a OCI/Graph recusaram antes de processar); respeita Retry-After;
+- 500/502/503/504 e conexão caída no meio: só métodos idempotentes (GET, HEAD, PUT, DELETE, OPTIONS);
+- falha ao conectar: qualquer método (nada foi enviado);
+- timeout de leitura não é repetido: só prenderia o worker por mais tempo.
+Corpos que não dá para reenviar (streams) nunca são repetidos.
+
+Circuit breaker por upstream: CB_FAILURE_THRESHOLD falhas seguidas (5xx, timeout, conexão)
+abrem o circuito por CB_OPEN_SECONDS; nesse intervalo as chamadas falham na hora com
+CircuitOpenError (a API responde 503 + Retry-After). Depois, uma chamada de teste (half-open)
+decide se fecha de novo ou reabre.
+"""
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+RETRY_MAX_ATTEMPTS = max(1, int(os.getenv("RETRY_MAX_ATTEMPTS", "3")))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.2"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "5"))
+# Retry-After maior que isso não é aguardado: a resposta (429/503) volta para quem chamou
+RETRY_AFTER_MAX = float(os.getenv("RETRY_AFTER_MAX", "10"))
+# Tempo total (s) de uma chamada, somando tentativas e esperas, a partir do qual não se tenta de novo
+RETRY_BUDGET = float(os.getenv("RETRY_BUDGET", "15"))
+
+CB_ENABLED = os.getenv("CB_ENABLED", "true").lower() in ("1", "true", "yes")
+CB_FAILURE_THRESHOLD = max(1, int(os.getenv("CB_FAILURE_THRESHOLD", "5")))
+CB_OPEN_SECONDS = float(os.getenv("CB_OPEN_SECONDS", "30"))
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Upstream degradado: a chamada nem foi feita."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} indisponível (circuit breaker aberto); tente em {int(retry_after) + 1}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+# ====== CIRCUIT BREAKER ======
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = CB_FAILURE_THRESHOLD, open_seconds: float = CB_OPEN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+        self.failures = 0
+        self.retries = 0
+
+    def before_call(self):
+        """Levanta CircuitOpenError se o circuito estiver aberto (ou com o teste half-open em andamento)."""
+        if not CB_ENABLED:
+            return
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(self.name, max(0.0, remaining))
+
+    def record(self, failed: bool):
+        with self._lock:
+            self._probe_in_flight = False
+            if not failed:
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def release_probe(self):
+        """Chamada de teste terminou sem resultado que conte (ex: 429, exceção local)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failures": self.failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "retries": self.retries,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(upstream: str) -> CircuitBreaker:
+    found = _breakers.get(upstream)
+    if found is None:
+        with _breakers_lock:
+            found = _breakers.setdefault(upstream, CircuitBreaker(upstream))
+    return found
+
+
+# ====== POLÍTICA DE RETRY ======
+def is_failure_status(status: int) -> bool:
+    """Respostas que contam como falha do upstream no circuit breaker."""
+    return status >= 500
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Retry-After em segundos ('120') ou data HTTP; None se ausente/inválido."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def retry_delay(method: str, attempt: int, started: float, status: Optional[int] = None,
+                retry_after: Optional[str] = None, connect_error: bool = False,
+                replayable: bool = True) -> Optional[float]:
+    """
+    Espera (s) antes da tentativa attempt+1, ou None se não deve repetir.
+    'status' = resposta recebida; sem status, a falha foi de conexão (connect_error = nada foi enviado).
+    """
+    if attempt >= RETRY_MAX_ATTEMPTS or not replayable:
+        return None
+    method = method.upper()
+    if status is not None:
+        if status not in RETRYABLE_STATUS or (status != 429 and method not in IDEMPOTENT_METHODS):
+            return None
+    elif not connect_error and method not in IDEMPOTENT_METHODS:
+        return None
+
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** (attempt - 1))))
+    hinted = retry_after_seconds(retry_after)
+    if hinted is not None:
+        if hinted > RETRY_AFTER_MAX:
+            return None
+        delay = max(delay, hinted)
+    if time.monotonic() - started + delay > RETRY_BUDGET:
+        return None
+    return delay
+
+
+def stats() -> dict:
+    return {
+        "retry": {"max_attempts": RETRY_MAX_ATTEMPTS, "base_delay": RETRY_BASE_DELAY,
+                  "max_delay": RETRY_MAX_DELAY, "budget": RETRY_BUDGET},
+        "circuit_breakers": {name: b.stats() for name, b in sorted(_breakers.items())},
+    }
+
+
+def metrics_collector() -> list:
+    """Famílias para o /metrics (metrics.REGISTRY.add_collector)."""
+    breakers = {name: b.stats() for name, b in sorted(_breakers.items())}
+    return [
+        ("tsuru_circuit_state", "gauge", "Estado do circuit breaker (0 fechado, 1 half-open, 2 aberto)",
+         [({"upstream": n}, _STATE_VALUES[s["state"]]) for n, s in breakers.items()]),
+        ("tsuru_circuit_opened_total", "counter", "Vezes que o circuito abriu",
+         [({"upstream": n}, s["opened"]) for n, s in breakers.items()]),
+        ("tsuru_circuit_rejected_total", "counter", "Chamadas recusadas com o circuito aberto",
+         [({"upstream": n}, s["rejected"]) for n, s in breakers.items()]),
+        ("tsuru_upstream_retries_total", "counter", "Novas tentativas de chamadas externas",
+         [({"upstream": n}, s["retries"]) for n, s in breakers.items()]),
+    ]
@@ -0,0 +1,35 @@
+# tests/test_app_logger.py
+import gzip
+import json
+import threading
+
+import app_logger
+
+
+def test_writer_archives_previous_days_at_startup(tmp_path):
+    (tmp_path / "app_2020-01-01.log").write_text(
+        json.dumps({"timestamp": "2020-01-01T00:00:00.000Z", "action": "login"}) + "\n", encoding="utf-8")
+    writer = app_logger.AuditWriter(logs_dir=tmp_path, flush_interval=0.01)
+    writer.start()
+    writer.close()
+    assert not (tmp_path / "app_2020-01-01.log").exists()
+    with gzip.open(tmp_path / "app_2020-01-01.1.log.gz", "rt") as f:
+        assert json.loads(f.readline())["action"] == "login"
+
+
+def test_counters_add_up_under_concurrent_submits(tmp_path):
+    writer = app_logger.AuditWriter(logs_dir=tmp_path, queue_size=50, flush_interval=0.01)
+    threads, per_thread = 8, 500
+
+    def _submit():
+        for i in range(per_thread):
+            writer.submit({"action": "login", "n": i}, "2024-05-01")
+
+    workers = [threading.Thread(target=_submit) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    writer.close()
+    assert writer.enqueued + writer.dropped == threads * per_thread
+    assert writer.written == writer.enqueued
@@ -0,0 +1,104 @@
+# tests/test_audit_index.py
+import json
+import time
+
+import pytest
+
+from audit_index import AuditIndex
+from conftest import auth
+
+
+def _write_log(path, entries):
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries), encoding="utf-8")
+
+
+@pytest.fixture
+def index(tmp_path):
+    _write_log(tmp_path / "app_2024-05-01.log", [
+        {"timestamp": "2024-05-01T09:59:59.999Z", "action": "login", "user": "a@example.com", "details": {}},
+        {"timestamp": "2024-05-01T10:00:00.000Z", "action": "create_bucket", "user": "a@example.com",
+         "details": {"bucket_name": "b1"}},
+        {"timestamp": "2024-05-01T12:30:00.500Z", "action": "delete_bucket", "user": "b@example.com",
+         "details": {"bucket_name": "b1"}},
+    ])
+    idx = AuditIndex(db_path=str(tmp_path / "index.sqlite3"), logs_dir=tmp_path)
+    idx.catch_up()
+    return idx
+
+
+def _actions(result):
+    return [e["action"] for e in result["events"]]
+
+
+def test_query_filters_and_orders_newest_first(index):
+    assert _actions(index.query()) == ["delete_bucket", "create_bucket", "login"]
+    assert _actions(index.query(user="a@example.com")) == ["create_bucket", "login"]
+    assert _actions(index.query(bucket="b1", action="delete_bucket")) == ["delete_bucket"]
+
+
+@pytest.mark.parametrize("since, until, expected", [
+    ("2024-05-01T10:00:00Z", None, ["delete_bucket", "create_bucket"]),
+    # mesmo instante com outra precisão/fuso
+    ("2024-05-01T10:00:00.000+00:00", None, ["delete_bucket", "create_bucket"]),
+    ("2024-05-01T07:00:00-03:00", None, ["delete_bucket", "create_bucket"]),
+    # sem fuso = UTC; 'until' é exclusivo
+    (None, "2024-05-01T10:00:00", ["login"]),
+    ("2024-05-01", "2024-05-01T12:30:00.5Z", ["create_bucket", "login"]),
+])
+def test_query_parses_time_bounds(index, since, until, expected):
+    assert _actions(index.query(since=since, until=until)) == expected
+
+
+@pytest.mark.parametrize("bound", ["since", "until"])
+def test_query_rejects_invalid_bounds(index, bound):
+    with pytest.raises(ValueError):
+        index.query(**{bound: "ontem"})
+
+
+def test_query_paginates_with_cursor(index):
+    first = index.query(limit=2)
+    assert _actions(first) == ["delete_bucket", "create_bucket"]
+    second = index.query(limit=2, cursor=first["next_cursor"])
+    assert _actions(second) == ["login"]
+    assert second["next_cursor"] is None
+
+
+def test_legacy_lines_are_converted_from_local_time(tmp_path, monkeypatch):
+    monkeypatch.setenv("TZ", "America/Sao_Paulo")
+    time.tzset()
+    try:
+        _write_log(tmp_path / "app_2023-01-10.log", [
+            {"timestamp": "2023-01-10 21:30:00", "action": "login", "user": "a@example.com", "details": {}},
+        ])
+        idx = AuditIndex(db_path=str(tmp_path / "index.sqlite3"), logs_dir=tmp_path)
+        idx.catch_up()
+    finally:
+        monkeypatch.delenv("TZ")
+        time.tzset()
+    [event] = idx.query()["events"]
+    assert event["timestamp"] == "2023-01-11T00:30:00.000Z"
+
+
+def _wait_for_events(api, headers, params, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        r = api.get("/audit", headers=headers, params=params)
+        assert r.status_code == 200
+        if len(r.json()["events"]) >= count or time.monotonic() > deadline:
+            return r.json()["events"]
+        time.sleep(0.05)
+
+
+def test_audit_route_against_fake(api):
+    user = auth("auditor@example.com")
+    r = api.post("/buckets/bench-dev/copy", headers=user,
+                 json={"object": "seed/00000001.bin", "destination_object": "audit/copy.bin"})
+    assert r.status_code == 202
+
+    events = _wait_for_events(api, user, {"action": "copy_object", "since": "2000-01-01T00:00:00Z"}, 1)
+    assert [e["user"] for e in events] == ["auditor@example.com"]
+    assert api.get("/audit", headers=user, params={"since": "ontem"}).status_code == 422
+    # só admins consultam eventos de outros usuários
+    assert api.get("/audit", headers=user, params={"user": "admin@example.com"}).status_code == 403
+    events = _wait_for_events(api, auth("admin@example.com"), {"user": "auditor@example.com"}, 1)
+    assert events
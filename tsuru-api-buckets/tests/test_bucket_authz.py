@@ -0,0 +1,57 @@
+# tests/test_bucket_authz.py
+import pytest
+
+from bucket_authz import AuthzIndex, extract_child_from_group_label
+from conftest import auth
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("OCI-Administrators-cp-infra-ddw3-dev", "cp-infra-ddw3-dev"),
+    ("cp_infra_ddw3_prd", "cp_infra_ddw3_prd"),
+    ("CP-Infra-DDW3-DEV", "CP-Infra-DDW3-DEV"),
+    ("Grupo-scp-infra", None),
+    ("xcp_infra", None),
+    ("s3-access-team-alpha", None),
+    ("", None),
+    (None, None),
+])
+def test_extract_child_from_group_label(label, expected):
+    assert extract_child_from_group_label(label) == expected
+
+
+def test_grants_for_combines_mapping_and_compartments():
+    index = AuthzIndex.compile({
+        "groups_by_name": {"S3-Access-Team-Alpha": ["bucket-alpha"]},
+        "groups_by_id": {"group-id-1": ["bucket-by-id"]},
+        "default": ["bucket-public"],
+    })
+    grants = index.grants_for([
+        {"displayName": "s3-access-team-alpha", "id": "x"},
+        {"displayName": "Outro", "id": "group-id-1"},
+        {"displayName": "OCI-Administrators-cp-infra-ddw3-DEV", "id": "y"},
+        {"displayName": "Grupo-scp-infra-ddw3-prd", "id": "z"},
+    ])
+    assert grants.buckets == {"bucket-alpha", "bucket-by-id", "bucket-public"}
+    assert grants.compartments == {"cp-infra-ddw3-dev"}
+    assert grants.allows_bucket("bucket-alpha")
+    assert not grants.allows_bucket("bench-dev", "ocid1.compartment.oc1..outro")
+
+
+def test_compartment_group_grants_its_buckets(api, fake_oci):
+    fake_oci.graph_users["dev-admin@example.com"] = [
+        {"@odata.type": "#microsoft.graph.group", "id": "g-dev", "displayName": "OCI-Administrators-cp-infra-ddw3-dev"},
+    ]
+    r = api.get("/buckets/bench-dev/objects", headers=auth("dev-admin@example.com"), params={"prefix": "seed/"})
+    assert r.status_code == 200
+    assert "seed/00000000.bin" in [o["name"] for o in r.json()["objects"]]
+
+    r = api.get("/buckets/bench-prd/objects", headers=auth("dev-admin@example.com"))
+    assert r.status_code == 403
+
+
+def test_unanchored_cp_token_grants_nothing(api, fake_oci):
+    fake_oci.graph_users["lookalike@example.com"] = [
+        {"@odata.type": "#microsoft.graph.group", "id": "g-scp", "displayName": "Grupo-scp-infra-ddw3-dev"},
+    ]
+    r = api.get("/buckets/bench-dev/objects", headers=auth("lookalike@example.com"))
+    assert r.status_code == 403
@@ -0,0 +1,32 @@
+# tests/test_copy_object.py
+from conftest import auth
+
+
+def test_copy_to_other_environment_is_rejected(api):
+    # o usuário padrão do fake é admin dos compartments dos dois ambientes
+    r = api.post("/buckets/bench-dev/copy", headers=auth("copy@example.com"),
+                 json={"object": "seed/00000000.bin", "destination_bucket": "bench-prd"})
+    assert r.status_code == 422
+    assert "permissão de escrita" in r.json()["detail"]
+
+
+def test_work_request_is_found_by_another_replica(api, fake_oci):
+    import oci_async_client as aoc
+
+    headers = auth("copy@example.com")
+    r = api.post("/buckets/bench-dev/copy", headers=headers,
+                 json={"object": "seed/00000001.bin", "destination_object": "copy/00000001.bin"})
+    assert r.status_code == 202
+    status_url = r.json()["status_url"]
+    assert "copy/00000001.bin" in fake_oci.buckets["bench-dev"].objects
+
+    aoc.WORK_REQUESTS.invalidate()              # outra réplica: nada em cache
+    r = api.get(status_url, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["status"] == "COMPLETED"
+    assert r.json()["buckets"] == ["bench-dev"]
+
+
+def test_unknown_work_request_is_not_found(api, fake_oci):
+    r = api.get("/work-requests/ocid1.objectstorageworkrequest.oc1..naoexiste", headers=auth("copy@example.com"))
+    assert r.status_code == 404
@@ -0,0 +1,26 @@
+# tests/test_delete_objects.py
+import oci_async_client as aoc
+from conftest import auth
+
+
+def test_prefix_delete_reports_listing_failure(api, fake_oci, monkeypatch):
+    bucket = fake_oci.buckets["bench-dev"]
+    fake_oci.fill_bucket(bucket, 5, 4, prefix="bulk/")
+    list_objects_page = aoc.list_objects_page
+    calls = []
+
+    async def _failing_second_page(bucket_name, prefix=None, start=None, limit=None, delimiter=None, fields=None,
+                                   creds=None):
+        calls.append(start)
+        if len(calls) > 1:
+            return None
+        return await list_objects_page(bucket_name, prefix, start, 2, delimiter, fields, creds=creds)
+
+    monkeypatch.setattr(aoc, "list_objects_page", _failing_second_page)
+    r = api.post("/buckets/bench-dev/objects/delete", json={"prefix": "bulk/"}, headers=auth("bulk@example.com"))
+    assert r.status_code == 200
+    result = r.json()
+    assert result["ok"] is False
+    assert result["error"] == "falha ao listar objetos"
+    assert result["deleted"] == 2
+    assert sum(name.startswith("bulk/") for name in bucket.objects) == 3
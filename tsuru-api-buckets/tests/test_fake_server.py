@@ -0,0 +1,24 @@
+# tests/test_fake_server.py
+import httpx
+
+from conftest import FAKE_URL, auth
+
+
+def test_fake_rejects_unsigned_requests(fake_oci):
+    r = httpx.get(f"{FAKE_URL}/n/")
+    assert r.status_code == 401
+    assert r.json()["code"] == "NotAuthenticated"
+
+
+def test_api_reaches_fake_with_signed_requests(api, fake_oci):
+    failures = fake_oci.signature_failures
+    r = api.get("/buckets/bench-dev/objects", params={"prefix": "seed/"}, headers=auth("harness@example.com"))
+    assert r.status_code == 200
+    assert len(r.json()["objects"]) == 3
+    assert fake_oci.signature_failures == failures
+
+
+def test_fail_next_fails_exactly_n_requests(fake_oci):
+    fake_oci.config.update({"fail_next": 2})
+    codes = [httpx.get(f"{FAKE_URL}/n/").status_code for _ in range(3)]
+    assert codes == [503, 503, 401]
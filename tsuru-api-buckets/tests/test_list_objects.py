@@ -0,0 +1,47 @@
+# tests/test_list_objects.py
+import json
+
+import oci_async_client as aoc
+from conftest import auth
+
+
+def _fail_after(monkeypatch, pages: int):
+    """list_objects_page com páginas de 2 objetos que falha (None) depois de 'pages' páginas."""
+    list_objects_page = aoc.list_objects_page
+    calls = []
+
+    async def _page(bucket_name, prefix=None, start=None, limit=None, delimiter=None, fields=None, creds=None):
+        calls.append(start)
+        if len(calls) > pages:
+            return None
+        return await list_objects_page(bucket_name, prefix, start, 2, delimiter, fields, creds=creds)
+
+    monkeypatch.setattr(aoc, "list_objects_page", _page)
+
+
+def test_ndjson_listing_ends_with_resumable_error(api, fake_oci, monkeypatch):
+    fake_oci.fill_bucket(fake_oci.buckets["bench-dev"], 5, 4, prefix="ndjson/")
+    _fail_after(monkeypatch, 1)
+    r = api.get("/buckets/bench-dev/objects", params={"format": "ndjson", "prefix": "ndjson/"},
+                headers=auth("lister@example.com"))
+    assert r.status_code == 200
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line["name"] for line in lines[:-1]] == ["ndjson/00000000.bin", "ndjson/00000001.bin"]
+    assert lines[-1]["error"]
+    assert lines[-1]["next_start"] == "ndjson/00000002.bin"
+
+
+def test_ndjson_listing_without_failure_has_no_error_line(api, fake_oci):
+    fake_oci.fill_bucket(fake_oci.buckets["bench-dev"], 3, 4, prefix="ndjson-ok/")
+    r = api.get("/buckets/bench-dev/objects", params={"format": "ndjson", "prefix": "ndjson-ok/", "limit": 2},
+                headers=auth("lister@example.com"))
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 3
+    assert all("error" not in line for line in lines)
+
+
+def test_page_listing_failure_is_502(api, monkeypatch):
+    api.get("/buckets/bench-dev/objects", headers=auth("lister@example.com"))   # bucket e grants já em cache
+    _fail_after(monkeypatch, 0)
+    r = api.get("/buckets/bench-dev/objects", headers=auth("lister@example.com"))
+    assert r.status_code == 502
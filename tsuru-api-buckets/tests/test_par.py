@@ -0,0 +1,21 @@
+# tests/test_par.py
+import resilience
+from conftest import auth
+
+
+def test_revoke_failure_is_not_reported_as_success(api, fake_oci):
+    headers = auth("par@example.com")
+    r = api.post("/buckets/bench-dev/par", json={"object": "seed/00000000.bin"}, headers=headers)
+    assert r.status_code == 200
+    par_id = r.json()["id"]
+
+    # DELETE é repetido pelo http_pool: todas as tentativas falham
+    fake_oci.config.update({"fail_next": resilience.RETRY_MAX_ATTEMPTS})
+    r = api.delete(f"/buckets/bench-dev/par/{par_id}", headers=headers)
+    assert r.status_code == 503
+    assert par_id in fake_oci.buckets["bench-dev"].pars
+
+    r = api.delete(f"/buckets/bench-dev/par/{par_id}", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["revoked"] is True
+    assert api.delete(f"/buckets/bench-dev/par/{par_id}", headers=headers).status_code == 404
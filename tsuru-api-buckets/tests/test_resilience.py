@@ -0,0 +1,118 @@
+# tests/test_resilience.py
+import time
+
+import pytest
+
+import resilience
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, retry_delay
+from conftest import auth
+
+
+def _delay(method, status=None, attempt=1, **kw):
+    return retry_delay(method, attempt, time.monotonic(), status=status, **kw)
+
+
+@pytest.mark.parametrize("method, status, connect_error, retried", [
+    ("GET", 503, False, True),
+    ("PUT", 500, False, True),
+    ("DELETE", 504, False, True),
+    ("POST", 503, False, False),      # não idempotente: a OCI pode ter processado
+    ("POST", 429, False, True),       # 429 foi recusado antes de processar
+    ("GET", 404, False, False),
+    ("GET", 400, False, False),
+    ("POST", None, True, True),       # falha ao conectar: nada foi enviado
+    ("POST", None, False, False),     # conexão caiu no meio
+    ("GET", None, False, True),
+])
+def test_retry_classification(method, status, connect_error, retried):
+    assert (_delay(method, status, connect_error=connect_error) is not None) is retried
+
+
+def test_retry_stops_after_max_attempts_and_for_streams():
+    assert _delay("GET", 503, attempt=resilience.RETRY_MAX_ATTEMPTS) is None
+    assert _delay("PUT", 503, replayable=False) is None
+
+
+def test_retry_after_is_honored_up_to_the_limit():
+    assert _delay("GET", 429, retry_after="0.3") >= 0.3
+    assert _delay("GET", 429, retry_after=str(resilience.RETRY_AFTER_MAX + 1)) is None
+    assert _delay("GET", 429, retry_after="não é número") is not None
+
+
+def test_retry_respects_budget():
+    started = time.monotonic() - resilience.RETRY_BUDGET
+    assert retry_delay("GET", 1, started, status=503) is None
+
+
+def test_circuit_breaker_opens_and_recovers():
+    cb = CircuitBreaker("teste", failure_threshold=2, open_seconds=0.05)
+    cb.before_call()
+    cb.record(failed=True)
+    cb.record(failed=True)
+    assert cb.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()
+
+    time.sleep(0.06)
+    cb.before_call()                  # chamada de teste (half-open)
+    assert cb.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        cb.before_call()              # só uma chamada de teste por vez
+    cb.record(failed=False)
+    assert cb.state == CLOSED
+    assert cb.stats()["opened"] == 1
+
+
+def test_transient_errors_are_retried_against_fake(api, fake_oci):
+    headers = auth("retry@example.com")
+    api.get("/buckets/bench-dev/objects", headers=headers)   # grupos do Graph e bucket já em cache
+    breaker = resilience.breaker("object_storage")
+    retries = breaker.stats()["retries"]
+    fake_oci.config.update({"fail_next": resilience.RETRY_MAX_ATTEMPTS - 1})
+    r = api.get("/buckets/bench-dev/objects", headers=headers)
+    assert r.status_code == 200
+    assert breaker.stats()["retries"] >= retries + resilience.RETRY_MAX_ATTEMPTS - 1
+
+
+def test_non_idempotent_call_is_not_retried_against_fake(api, fake_oci):
+    # copyObject é POST: um 503 volta para quem chamou, sem nova tentativa
+    headers = auth("retry@example.com")
+    api.get("/buckets/bench-dev/objects", headers=headers)   # bucket e grants já em cache
+    calls = fake_oci.calls.get("copy_object", 0)
+    fake_oci.config.update({"fail_next": 1})
+    r = api.post("/buckets/bench-dev/copy", headers=headers,
+                 json={"object": "seed/00000002.bin", "destination_object": "retry/copy.bin"})
+    assert r.status_code == 503
+    assert fake_oci.calls.get("copy_object", 0) == calls + 1
+
+
+def test_upload_is_aborted_when_circuit_opens_midway(api, fake_oci, monkeypatch):
+    import oci_async_client as aoc
+    import oci_client as oc
+
+    monkeypatch.setattr(oc, "MULTIPART_THRESHOLD", 1024)
+    monkeypatch.setattr(oc, "MULTIPART_PART_SIZE", 256)
+    monkeypatch.setattr(oc, "MULTIPART_PARALLEL", 1)
+    breaker = resilience.breaker("object_storage")
+    upload_part = aoc.upload_part
+
+    async def _tripping_upload_part(bucket_name, object_name, upload_id, part_num, data, creds=None):
+        if part_num == 2:
+            # upstream degradou no meio do upload: o circuito abre antes da parte 2
+            for _ in range(breaker.failure_threshold):
+                breaker.record(failed=True)
+        return await upload_part(bucket_name, object_name, upload_id, part_num, data, creds=creds)
+
+    monkeypatch.setattr(aoc, "upload_part", _tripping_upload_part)
+    headers = {**auth("retry@example.com"), "Content-Type": "application/octet-stream"}
+    api.get("/buckets/bench-dev/objects", headers=headers)   # bucket e grants já em cache
+    try:
+        r = api.post("/buckets/bench-dev/upload", params={"object_name": "circuit/big.bin"},
+                     content=b"x" * 2048, headers=headers)
+        assert r.status_code == 503
+        assert r.headers.get("retry-after")
+        bucket = fake_oci.buckets["bench-dev"]
+        assert not bucket.uploads                  # AbortMultipartUpload passou mesmo com o circuito aberto
+        assert "circuit/big.bin" not in bucket.objects
+    finally:
+        breaker.record(failed=False)
@@ -0,0 +1,10 @@
+# tests/test_users_groups.py
+from conftest import auth
+
+
+def test_users_groups_requires_admin(api):
+    payload = {"users": ["someone@example.com"]}
+    assert api.post("/users/groups", json=payload, headers=auth("both@example.com")).status_code == 403
+    r = api.post("/users/groups", json=payload, headers=auth("admin@example.com"))
+    assert r.status_code == 200
+    assert "someone@example.com" in r.json()["users"]
@@ -0,0 +1,201 @@
+# ttl_cache.py
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+import log_setup
+
+log = log_setup.get_logger(__name__)
+
+# Valor que o loader devolve para "não existe": fica em cache (TTL negativo) e é lido como None.
+# Se o loader devolver None (erro transitório), nada é guardado.
+NOT_FOUND = object()
+
+
+class TTLCache:
+    """
+    Cache em memória com TTL, limite de tamanho (LRU), cache negativo e coalescência
+    de requisições: chamadas simultâneas para a mesma chave compartilham um único
+    loader, tanto entre threads (get_or_load) quanto no event loop (aget_or_load).
+
+    Com 'stale_ttl', uma entrada vencida continua sendo servida por mais 'stale_ttl'
+    segundos (stale-while-revalidate) enquanto um único reload roda em background.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1024, negative_ttl: Optional[float] = None,
+                 stale_ttl: float = 0):
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        # chave -> (expira_em, fresco_até, valor)
+        self._data: "OrderedDict[Any, Tuple[float, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_async = {}
+        # referências fortes às tasks de load (o event loop só guarda referências fracas)
+        self._tasks = set()
+        self.hits = 0
+        self.negative_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    # ====== ACESSO DIRETO ======
+    def lookup(self, key) -> Tuple[bool, Any]:
+        """(True, valor) se a chave está em cache e válida (ainda que stale); (False, None) caso contrário."""
+        with self._lock:
+            hit, value, _ = self._lookup(key)
+            return hit, value
+
+    def _lookup(self, key) -> Tuple[bool, Any, bool]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None, False
+        expires_at, fresh_until, value = entry
+        now = time.monotonic()
+        if expires_at < now:
+            del self._data[key]
+            self.misses += 1
+            return False, None, False
+        self._data.move_to_end(key)
+        if value is NOT_FOUND:
+            self.negative_hits += 1
+            return True, None, False
+        stale = fresh_until < now
+        if stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return True, value, stale
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        if value is None:
+            return
+        if ttl is None:
+            ttl = self.negative_ttl if value is NOT_FOUND else self.ttl
+        stale_ttl = 0 if value is NOT_FOUND else self.stale_ttl
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (now + ttl + stale_ttl, now + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any, Any], bool]) -> int:
+        """Remove as entradas em que predicate(chave, valor) é verdadeiro; retorna quantas saíram."""
+        with self._lock:
+            keys = [k for k, (_, _, v) in self._data.items() if v is not NOT_FOUND and predicate(k, v)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    # ====== SINGLE-FLIGHT ======
+    def get_or_load(self, key, loader: Callable[[], Any]):
+        with self._lock:
+            hit, value, stale = self._lookup(key)
+            if hit and not (stale and key not in self._inflight):
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+            elif not hit:
+                self.coalesced += 1
+
+        if hit:
+            # stale: devolve o valor atual e recarrega em background
+            self.refreshes += 1
+            threading.Thread(target=self._load, args=(key, loader, future, True), daemon=True).start()
+            return value
+
+        if not owner:
+            return future.result()
+        return self._load(key, loader, future)
+
+    def _load(self, key, loader, future: Future, background: bool = False):
+        try:
+            value = loader()
+            self.set(key, value)
+            result = None if value is NOT_FOUND else value
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            if background:
+                log.warning("⚠️ Falha ao recarregar '%s' em background: %s", key, e)
+                return None
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_load(self, key, loader: Callable[[], Awaitable[Any]]):
+        with self._lock:
+            hit, value, stale = self._lookup(key)
+        if hit and not (stale and key not in self._inflight_async):
+            return value
+
+        task = self._inflight_async.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        # o load roda numa task própria: cancelar quem a criou não cancela os demais aguardantes
+        task = asyncio.get_running_loop().create_task(self._aload(key, loader, background=hit))
+        self._inflight_async[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        if hit:
+            self.refreshes += 1
+            return value
+        return await asyncio.shield(task)
+
+    def _task_done(self, task: "asyncio.Task"):
+        self._tasks.discard(task)
+        if not task.cancelled():
+            task.exception()  # evita "exception was never retrieved" sem aguardantes
+
+    async def _aload(self, key, loader, background: bool = False):
+        try:
+            value = await loader()
+            self.set(key, value)
+            return None if value is NOT_FOUND else value
+        except Exception as e:
+            if background:
+                log.warning("⚠️ Falha ao recarregar '%s' em background: %s", key, e)
+                return None
+            raise
+        finally:
+            self._inflight_async.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.hits + self.negative_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            }
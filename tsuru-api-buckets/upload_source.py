@@ -0,0 +1,140 @@
+# upload_source.py
+"""
+Origem de bytes de um upload, lida sequencialmente em blocos.
+
+Permite enviar o corpo recebido pela API ao Object Storage sem montar o
+arquivo inteiro em memória: o corpo bruto é repassado direto do socket,
+arquivos de multipart/form-data são lidos do spool do Starlette e corpos
+sem Content-Length vão para um SpooledTemporaryFile limitado em memória.
+
+Origens relíveis (spool, bytes) podem ter o hash calculado antes do envio
+(digest), o que permite pular uploads de conteúdo já presente no bucket.
+"""
+import os
+import base64
+import hashlib
+import tempfile
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import Request, UploadFile
+
+# Tamanho dos blocos lidos/enviados (memória por upload fica em poucos blocos)
+CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# Acima disso o spool de corpos sem Content-Length vai para disco
+SPOOL_MAX_MEMORY = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", str(4 * 1024 * 1024)))
+
+
+class UploadSource:
+    def __init__(self, size: int, stream: AsyncIterator[bytes], content_type: Optional[str] = None,
+                 upload: Optional[UploadFile] = None,
+                 reopen: Optional[Callable[[], AsyncIterator[bytes]]] = None):
+        self.size = size
+        self.content_type = content_type
+        self._stream = stream
+        self._buffer = bytearray()
+        self._upload = upload
+        self._reopen = reopen
+        # hashes do conteúdo, quando conhecidos antes do envio (digest() ou informados pelo cliente)
+        self.md5: Optional[str] = None       # base64, como no Content-MD5
+        self.sha256: Optional[str] = None    # hex
+        self.sha256_verified = False         # True se calculado aqui (não apenas declarado)
+
+    @property
+    def seekable(self) -> bool:
+        return self._reopen is not None
+
+    async def digest(self) -> bool:
+        """
+        Calcula MD5 e SHA-256 lendo a origem inteira e volta ao início.
+        Retorna False (sem ler nada) se a origem não puder ser relida.
+        """
+        if not self.seekable:
+            return False
+        md5, sha256 = hashlib.md5(), hashlib.sha256()
+        async for chunk in self.chunks():
+            md5.update(chunk)
+            sha256.update(chunk)
+        self._stream = self._reopen()
+        self._buffer.clear()
+        self.md5 = base64.b64encode(md5.digest()).decode()
+        self.sha256 = sha256.hexdigest()
+        self.sha256_verified = True
+        return True
+
+    async def read(self, n: int) -> bytes:
+        """Lê até n bytes (menos apenas no fim do stream)."""
+        while len(self._buffer) < n:
+            try:
+                chunk = await self._stream.__anext__()
+            except StopAsyncIteration:
+                break
+            self._buffer.extend(chunk)
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    async def chunks(self, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    async def aclose(self):
+        if self._upload is not None:
+            await self._upload.close()
+
+    # ====== CONSTRUTORES ======
+    @classmethod
+    def from_bytes(cls, data: bytes, content_type: Optional[str] = None) -> "UploadSource":
+        view = memoryview(data)
+
+        async def _iter():
+            for i in range(0, len(view), CHUNK_SIZE):
+                yield view[i:i + CHUNK_SIZE]
+
+        return cls(len(data), _iter(), content_type, reopen=_iter)
+
+    @classmethod
+    async def from_upload_file(cls, upload: UploadFile) -> "UploadSource":
+        size = upload.size
+        if size is None:
+            await upload.seek(0, os.SEEK_END)
+            size = upload.file.tell()
+
+        async def _iter():
+            await upload.seek(0)
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+        return cls(size, _iter(), upload.content_type, upload=upload, reopen=_iter)
+
+    @classmethod
+    async def from_request(cls, request: Request) -> Optional["UploadSource"]:
+        """
+        Corpo bruto da requisição. Com Content-Length o stream é repassado direto;
+        sem ele (chunked), o corpo é copiado para um spool limitado em memória.
+        Retorna None se o corpo estiver vazio.
+        """
+        content_type = request.headers.get("content-type")
+        length = request.headers.get("content-length")
+        if length is not None and length.isdigit():
+            if int(length) == 0:
+                return None
+            return cls(int(length), request.stream(), content_type)
+
+        spool = UploadFile(file=tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY))
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            await spool.write(chunk)
+        if not size:
+            await spool.close()
+            return None
+        spool.size = size
+        source = await cls.from_upload_file(spool)
+        source.content_type = content_type
+        return source